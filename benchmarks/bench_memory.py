@@ -0,0 +1,53 @@
+"""Measure the memory held by a loaded schema.
+
+    python benchmarks/bench_memory.py [DEFINITION_FILE ...] [--schemas N]
+
+Without definition files, a synthetic schema is generated into a temporary directory.
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gedcom_remastered_parser import Schema
+from synthetic import generate_files
+
+def load(file_paths):
+    schema = Schema.generate_from_files(file_paths)
+    # Include the lazily parsed option components, which long-lived processes end up holding too.
+    for primitive in schema.primitives.values():
+        for optional_value in primitive.optional_values:
+            optional_value.components
+    return schema
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("file_paths", nargs="*")
+    parser.add_argument("--schemas", type=int, default=5)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_paths = args.file_paths or generate_files(temp_dir)
+        # Load once first, so that module level caches such as compiled regexes are not counted.
+        load(file_paths)
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        schemas = [load(file_paths) for _ in range(args.schemas)]
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        schema = schemas[0]
+        rows = sum(len(rows) for structure in schema.structures.values() for rows in structure.definitions)
+        elements = len(schema.structures) + len(schema.primitives) + len(schema.tags)
+        per_schema = (after - before) / len(schemas)
+        print(f"elements per schema: {elements:10d}")
+        print(f"rows per schema:     {rows:10d}")
+        print(f"bytes per schema:    {per_schema:10.0f}")
+        print(f"bytes per element:   {per_schema / elements:10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Compare serial and parallel loading of several large definition files.
+
+    python benchmarks/bench_parallel.py [--bundles N] [--structures N] [--repeat N]
+
+Each bundle is a synthetic set of structures, primitives and tags files, as if loading several schema versions.
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gedcom_remastered_parser import Schema
+from synthetic import generate_files
+from timing import best_of
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bundles", type=int, default=4)
+    parser.add_argument("--structures", type=int, default=4000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_paths = []
+        for bundle in range(args.bundles):
+            file_paths += generate_files(os.path.join(temp_dir, str(bundle)), args.structures, args.structures, args.structures // 2, seed=bundle)
+        serial = Schema.generate_from_files(file_paths)
+        for parallel in ("thread", "process"):
+            schema = Schema.generate_from_files(file_paths, parallel=parallel)
+            for element_type in ("structures", "primitives", "tags"):
+                serial_elements = getattr(serial, element_type).values()
+                parallel_elements = getattr(schema, element_type).values()
+                if [e.txt_definition for e in serial_elements] != [e.txt_definition for e in parallel_elements]:
+                    raise AssertionError(f"The {parallel} load of the {element_type} differs from the serial load.")
+        print(f"files: {len(file_paths)}, {sum(os.path.getsize(f) for f in file_paths) / 1024 / 1024:.1f} MiB")
+        serial_time = best_of(args.repeat, lambda: Schema.generate_from_files(file_paths))
+        print(f"serial:  {serial_time * 1000:8.1f} ms")
+        for parallel in ("thread", "process"):
+            parallel_time = best_of(args.repeat, lambda: Schema.generate_from_files(file_paths, parallel=parallel))
+            print(f"{parallel + ':':8s} {parallel_time * 1000:8.1f} ms ({serial_time / parallel_time:.1f}x)")
+
+if __name__ == "__main__":
+    main()
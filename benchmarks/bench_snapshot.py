@@ -0,0 +1,35 @@
+"""Compare schema start-up time from the text definitions against a binary snapshot.
+
+    python benchmarks/bench_snapshot.py [DEFINITION_FILE ...] [--repeat N]
+
+Without definition files, a synthetic schema is generated into a temporary directory.
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gedcom_remastered_parser import Schema
+from synthetic import generate_files
+from timing import best_of
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("file_paths", nargs="*")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_paths = args.file_paths or generate_files(temp_dir)
+        cache_path = os.path.join(temp_dir, "schema.snapshot")
+        Schema.generate_from_files(file_paths, cache_path=cache_path)
+        text_time = best_of(args.repeat, lambda: Schema.generate_from_files(file_paths))
+        snapshot_time = best_of(args.repeat, lambda: Schema.generate_from_files(file_paths, cache_path=cache_path))
+        print(f"text parse:         {text_time * 1000:8.1f} ms")
+        print(f"snapshot (checked): {snapshot_time * 1000:8.1f} ms")
+        print(f"speed-up:           {text_time / snapshot_time:8.1f}x")
+        print(f"snapshot size:      {os.path.getsize(cache_path) / 1024:8.1f} KiB")
+
+if __name__ == "__main__":
+    main()
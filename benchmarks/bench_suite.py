@@ -0,0 +1,108 @@
+"""Run the benchmark suite over a synthetic schema, and write the timings to a JSON file.
+
+    python benchmarks/bench_suite.py [--output FILE] [--compare BASELINE] [--repeat N] [--structures N] ...
+
+Each benchmark reports the best of several runs, in seconds. With a baseline from an earlier run, the ratio of each
+timing to the baseline is printed, so regressions between releases stand out.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gedcom_remastered_parser import Schema
+from gedcom_remastered_parser.helpers import clear_cached
+from gedcom_remastered_parser.structure import SubstructureRow
+from synthetic import generate_files
+from timing import best_of
+
+def bench_generate(schema, file_paths):
+    Schema.generate_from_files(file_paths)
+
+def bench_round_trip(schema, file_paths):
+    # Render every element from scratch, as the renderings are otherwise cached.
+    for element_type in ("structures", "primitives", "tags"):
+        for element in getattr(schema, element_type).values():
+            element.invalidate()
+        "\n".join(element.txt_definition for element in getattr(schema, element_type).values())
+
+def bench_components(schema, file_paths):
+    # Parse the components of every option from scratch, as they are otherwise cached.
+    for primitive in schema.primitives.values():
+        for optional_value in primitive.optional_values:
+            clear_cached(optional_value, 'components')
+            optional_value.components
+
+def bench_substructure_lookups(schema, file_paths):
+    for structure in schema.structures.values():
+        for rows in structure.definitions:
+            for row in rows:
+                if isinstance(row, SubstructureRow):
+                    row.structure
+
+BENCHMARKS = {
+    "generate_from_files": bench_generate,
+    "txt_definition_round_trip": bench_round_trip,
+    "optional_value_components": bench_components,
+    "substructure_lookups": bench_substructure_lookups,
+}
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--compare", help="The results file of an earlier run, to compare against.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--structures", type=int, default=2000)
+    parser.add_argument("--primitives", type=int, default=2000)
+    parser.add_argument("--tags", type=int, default=1000)
+    parser.add_argument("--depth", type=int, default=50)
+    parser.add_argument("--alternatives", type=int, default=8)
+    parser.add_argument("--terms", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    scale = {name: getattr(args, name) for name in ("structures", "primitives", "tags", "depth", "alternatives", "terms", "seed")}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_paths = generate_files(temp_dir, **scale)
+        schema = Schema.generate_from_files(file_paths)
+        timings = {name: best_of(args.repeat, lambda: function(schema, file_paths)) for name, function in BENCHMARKS.items()}
+    results = {
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "scale": scale,
+        "timings": timings,
+    }
+    with open(args.output, 'w') as file_writer:
+        json.dump(results, file_writer, indent=2)
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as file_reader:
+            baseline = json.load(file_reader)
+        if baseline.get("scale") != scale:
+            print("warning: the baseline was run at a different scale")
+        baseline = baseline.get("timings", {})
+    for name, timing in timings.items():
+        line = f"{name:28} {timing * 1000:10.2f} ms"
+        if name in baseline:
+            line += f"  {timing / baseline[name]:6.2f}x baseline"
+        print(line)
+
+if __name__ == "__main__":
+    main()
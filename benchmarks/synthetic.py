@@ -0,0 +1,119 @@
+"""Generate synthetic GEDCOM Remastered definition files for benchmarking.
+
+    python benchmarks/synthetic.py OUTPUT_DIR [--structures N] [--primitives N] [--tags N]
+        [--depth N] [--alternatives N] [--terms N]
+
+The scale options control the number of elements, the length of the longest chain of `<<...>>` inclusions, the
+most tags in a `[A|B|C]` alternative, and the most terms in a `Where:` list. Every reference in the files is to an
+element that they define, so the schema passes `check_references`.
+"""
+import argparse
+import os
+import random
+from typing import List
+
+def _tag_name(i:int) -> str:
+    return f"T{i:04d}"
+
+def _xref_types(amount_tags:int) -> int:
+    # The number of record types that pointers can refer to, each with an `XREF:` primitive named after a tag.
+    return min(amount_tags, 16)
+
+def generate_tags(amount:int, rng:random.Random) -> List[str]:
+    lines = []
+    for i in range(amount):
+        lines.append(f"{_tag_name(i)} {{TAG_LABEL_{i}}}:=")
+        if rng.random() < 0.7:
+            lines.append(f"The description of synthetic tag number {i}.")
+    return lines
+
+def _tags(amount_tags:int, alternatives:int, rng:random.Random) -> str:
+    # A single tag, or sometimes a `[A|B|C]` alternative of several.
+    if alternatives > 1 and rng.random() < 0.15:
+        return "[" + "|".join(_tag_name(i) for i in rng.sample(range(amount_tags), min(amount_tags, rng.randint(2, alternatives)))) + "]"
+    return _tag_name(rng.randrange(amount_tags))
+
+def generate_primitives(amount:int, amount_tags:int, rng:random.Random, terms:int=5) -> List[str]:
+    lines = ["TEXT:= {Size=1:248}", "Any text."]
+    for i in range(_xref_types(amount_tags)):
+        lines.append(f"XREF:{_tag_name(i)}:= {{Size=1:22}}")
+    for i in range(amount):
+        size_min = rng.randint(1, 4)
+        lines.append(f"PRIM_{i}:= {{Size={size_min}:{size_min + rng.randint(0, 120)}}}")
+        kind = rng.random()
+        if kind < 0.3 and i:
+            # Composite values made from other primitives, literal strings, tags and terms.
+            other = rng.randrange(i)
+            lines.append(f"[<PRIM_{other}>|%{_tag_name(rng.randrange(amount_tags))}% <PRIM_{other}>|{{TERM_{i}}}]")
+        elif kind < 0.6:
+            options = [f"OPT{j}" for j in range(rng.randint(2, 8))]
+            lines.append("[" + "|".join(options) + "]")
+        lines.append(f"The description of synthetic primitive number {i}.")
+        if kind < 0.6:
+            lines.append("Where:")
+            lines.extend(f"TERM_{i}_{j} = Meaning of term {j}" for j in range(rng.randint(1, terms)))
+    return lines
+
+def generate_structures(amount:int, amount_primitives:int, amount_tags:int, rng:random.Random, depth:int=1, alternatives:int=1) -> List[str]:
+    lines = []
+    # The first structures form a chain, each including the next, which sets the depth of the deepest nesting.
+    chain = min(depth, amount)
+    for i in range(amount):
+        lines.append(f"STRUCT_{i}:=")
+        definitions = 2 if rng.random() < 0.2 else 1
+        if definitions > 1:
+            lines.append("[")
+        for d in range(definitions):
+            if d:
+                lines.append("|")
+            lines.append(f"n {_tags(amount_tags, alternatives, rng)} <PRIM_{rng.randrange(amount_primitives)}> {{1:1}}")
+            if i + 1 < chain:
+                lines.append(f"+1 <<STRUCT_{i + 1}>> {{0:1}}")
+            for _ in range(rng.randint(2, 12)):
+                roll = rng.random()
+                if roll < 0.25 and i + 1 < amount:
+                    # Only refer to later structures, so the inclusions never form a cycle.
+                    lines.append(f"+1 <<STRUCT_{rng.randrange(i + 1, amount)}>> {{0:M}}")
+                elif roll < 0.4:
+                    lines.append(f"+1 {_tag_name(rng.randrange(amount_tags))} @<XREF:{_tag_name(rng.randrange(_xref_types(amount_tags)))}>@ {{0:1}}")
+                else:
+                    lines.append(f"+1 {_tags(amount_tags, alternatives, rng)} <PRIM_{rng.randrange(amount_primitives)}> {{0:M}}")
+                    if roll > 0.8:
+                        lines.append(f"+2 {_tags(amount_tags, alternatives, rng)} {{0:1}}")
+        if definitions > 1:
+            lines.append("]")
+    return lines
+
+def generate_files(output_dir:str, structures:int=1000, primitives:int=1000, tags:int=500, seed:int=0,
+        depth:int=1, alternatives:int=1, terms:int=5) -> List[str]:
+    rng = random.Random(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    contents = {
+        "synthetic-structures.txt": generate_structures(structures, primitives, tags, rng, depth, alternatives),
+        "synthetic-primitives.txt": generate_primitives(primitives, tags, rng, terms),
+        "synthetic-tags.txt": generate_tags(tags, rng),
+    }
+    file_paths = []
+    for file_name, lines in contents.items():
+        file_path = os.path.join(output_dir, file_name)
+        with open(file_path, 'w') as file_writer:
+            file_writer.write("\n".join(lines) + "\n")
+        file_paths.append(file_path)
+    return file_paths
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("output_dir")
+    parser.add_argument("--structures", type=int, default=1000)
+    parser.add_argument("--primitives", type=int, default=1000)
+    parser.add_argument("--tags", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--depth", type=int, default=1)
+    parser.add_argument("--alternatives", type=int, default=1)
+    parser.add_argument("--terms", type=int, default=5)
+    args = parser.parse_args()
+    file_paths = generate_files(
+        args.output_dir, args.structures, args.primitives, args.tags, args.seed, args.depth, args.alternatives, args.terms
+    )
+    for file_path in file_paths:
+        print(file_path)
@@ -0,0 +1,11 @@
+"""Timing helpers shared by the benchmarks."""
+import time
+
+def best_of(repeat, function):
+    # The shortest of several runs, which is the least disturbed by the rest of the machine.
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
@@ -1 +1,4 @@
+from .reader import GedcomReader
+from .registry import SchemaRegistry
 from .schema import Schema
+from .writer import GedcomWriter
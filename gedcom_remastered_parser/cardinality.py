@@ -0,0 +1,166 @@
+from typing import Dict, List, Sequence, Tuple
+
+from .structure import MANY, Row, RowWithTags, Structure, SubstructureRow, count_max_larger
+
+# Checks the number of times each row occurs, for a whole batch of records at once.
+#
+# The columns are the lines directly within the Structure: the rows below its top row when every definition is a
+# single row with rows below it (as for a record), or otherwise its top rows (as for a substructure of sibling lines).
+# The same row in alternative definitions shares a column. Each definition gives the bounds of the columns it has,
+# and requires the others to be absent, and a record is valid when it is within the bounds of any definition.
+
+class CardinalityViolation(object):
+    __slots__ = ('record', 'column', 'row', 'count', 'count_min', 'count_max')
+
+    def __init__(self, record:int, column:int, row:Row, count:int, count_min:int, count_max):
+        self.record = record
+        self.column = column
+        self.row = row
+        self.count = count
+        self.count_min = count_min
+        self.count_max = count_max
+
+    def __repr__(self):
+        return f"CardinalityViolation<record {self.record}: `{self.row.txt_definition}` occurs {self.count} times, not {{{self.count_min}:{self.count_max}}}>"
+
+def _column_key(row:Row) -> Tuple:
+    # Rows that differ only in their bounds are the same line of data.
+    return (type(row), getattr(row, 'tags', None), getattr(row, 'xref', None), getattr(row, 'value', None))
+
+def _column_rows(rows:List[Row]) -> List[Row]:
+    base_level = rows[0].level if rows else 0
+    return [row for row in rows if row.level == base_level + 1]
+
+class CardinalityChecker(object):
+
+    def __init__(self, structure:Structure):
+        self.structure = structure
+        definitions = structure.definitions
+        nested = bool(definitions) and all(
+            rows and isinstance(rows[0], RowWithTags) and sum(1 for row in rows if row.level == rows[0].level) == 1
+            for rows in definitions
+        )
+        column_ids:Dict[Tuple, int] = {}
+        columns:List[Row] = []
+        definition_columns = []
+        for rows in definitions:
+            bounds = {}
+            for row in (_column_rows(rows) if nested else [row for row in rows if row.level == rows[0].level]):
+                key = _column_key(row)
+                column = column_ids.get(key)
+                if column is None:
+                    column = column_ids[key] = len(columns)
+                    columns.append(row)
+                bounds[column] = (row.count_min, row.count_max)
+            definition_columns.append(bounds)
+        self.columns:Tuple[Row] = tuple(columns)
+        # The (count_min, count_max) of each column, for each definition.
+        self.definition_bounds:List[List[Tuple[int, object]]] = [
+            [bounds.get(column, (0, 0)) for column in range(len(columns))] for bounds in definition_columns
+        ]
+        # The effective bounds of each column across all of the definitions.
+        self.bounds:List[Tuple[int, object]] = [
+            (min(b[column][0] for b in self.definition_bounds), _larger(b[column][1] for b in self.definition_bounds))
+            for column in range(len(columns))
+        ] if self.definition_bounds else []
+        self._numpy_bounds_cache = None
+
+    def __repr__(self):
+        return f"CardinalityChecker<{self.structure.label}, {len(self.columns)} columns>"
+
+    def column_of(self, tag_or_label:str) -> List[int]:
+        # The columns of the rows with a tag, or that include a Structure.
+        return [
+            column for column, row in enumerate(self.columns)
+            if (row.value == tag_or_label if isinstance(row, SubstructureRow) else tag_or_label in row.tags)
+        ]
+
+    def valid(self, counts):
+        # Whether each record is within the bounds of any definition. A NumPy array of counts gives a NumPy array.
+        if not self.definition_bounds:
+            return [True] * len(counts)
+        if _is_numpy(counts):
+            return self._numpy_fits(counts)[0]
+        return [self._best_definition(record)[1] == 0 for record in counts]
+
+    def check(self, counts) -> List[CardinalityViolation]:
+        # The violations of every record that is not within the bounds of any definition, against the definition it
+        # comes closest to. The counts are a matrix of records by columns, as nested lists or a 2D NumPy array.
+        if not self.definition_bounds:
+            return []
+        if _is_numpy(counts):
+            return self._check_numpy(counts)
+        violations = []
+        for index, record in enumerate(counts):
+            definition, amount = self._best_definition(record)
+            if amount:
+                violations.extend(self._violations(index, record, self.definition_bounds[definition]))
+        return violations
+
+    def _best_definition(self, record:Sequence[int]) -> Tuple[int, int]:
+        best = (0, len(self.columns) + 1)
+        for definition, bounds in enumerate(self.definition_bounds):
+            amount = sum(
+                1 for count, (count_min, count_max) in zip(record, bounds)
+                if count < count_min or (count_max is not MANY and count > count_max)
+            )
+            if amount < best[1]:
+                best = (definition, amount)
+                if not amount:
+                    break
+        return best
+
+    def _violations(self, index:int, record:Sequence[int], bounds) -> List[CardinalityViolation]:
+        return [
+            CardinalityViolation(index, column, self.columns[column], int(count), count_min, count_max)
+            for column, (count, (count_min, count_max)) in enumerate(zip(record, bounds))
+            if count < count_min or (count_max is not MANY and count > count_max)
+        ]
+
+    def _numpy_bounds(self):
+        import numpy
+        bounds = self._numpy_bounds_cache
+        if bounds is None:
+            minimums = numpy.array([[b[0] for b in bounds] for bounds in self.definition_bounds], dtype=numpy.int64)
+            # Unlimited is the largest count that fits, so that a single comparison covers it.
+            maximums = numpy.array(
+                [[numpy.iinfo(numpy.int64).max if b[1] is MANY else b[1] for b in bounds] for bounds in self.definition_bounds],
+                dtype=numpy.int64,
+            )
+            bounds = self._numpy_bounds_cache = (minimums, maximums)
+        return bounds
+
+    def _numpy_fits(self, counts):
+        import numpy
+        minimums, maximums = self._numpy_bounds()
+        counts = numpy.asarray(counts, dtype=numpy.int64)
+        # Records by definitions by columns, of whether each count is out of the bounds of each definition.
+        outside = (counts[:, None, :] < minimums[None, :, :]) | (counts[:, None, :] > maximums[None, :, :])
+        misses = outside.sum(axis=2)
+        return (misses == 0).any(axis=1), misses
+
+    def _check_numpy(self, counts) -> List[CardinalityViolation]:
+        import numpy
+        valid, misses = self._numpy_fits(counts)
+        invalid = numpy.flatnonzero(~valid)
+        if not len(invalid):
+            return []
+        minimums, maximums = self._numpy_bounds()
+        definitions = misses[invalid].argmin(axis=1)
+        records = numpy.asarray(counts, dtype=numpy.int64)[invalid]
+        outside = (records < minimums[definitions]) | (records > maximums[definitions])
+        violations = []
+        for position, column in zip(*numpy.nonzero(outside)):
+            index = int(invalid[position])
+            count_min, count_max = self.definition_bounds[definitions[position]][column]
+            violations.append(CardinalityViolation(index, int(column), self.columns[column], int(records[position, column]), count_min, count_max))
+        return violations
+
+def _larger(values):
+    larger = 0
+    for value in values:
+        larger = count_max_larger(larger, value)
+    return larger
+
+def _is_numpy(values) -> bool:
+    return type(values).__module__ == "numpy"
@@ -0,0 +1,263 @@
+import importlib.util
+import keyword
+import os
+import re
+import sys
+import tempfile
+import types
+from typing import Dict, List, Tuple
+
+from .helpers import content_hash
+from .structure import MANY, NewRecordRow, NewRecordWithValueRow, NoValueRow, PointerValueRow, PrimitiveValueRow, Row, Structure, SubstructureRow, count_max_larger, row_tree
+
+# Generates a module with one slotted class per Structure, to hold GEDCOM data in place of nested dicts.
+#
+# A Structure whose every definition is a single tag row becomes a node class, for a line of data, with `tag`, `xref`
+# and `value` slots and a slot per row below it. Any other Structure, such as one made of sibling rows, becomes a
+# group class, with a slot per row. A row below which other rows are nested gets a node class of its own.
+#
+# Each slot is described by a Field, of one of the kinds:
+#   primitive    The value of a line, of the Primitive named by the field type.
+#   pointer      The xref that a line points to, of the record named by the field type.
+#   flag         True for a line that has neither a value nor rows below it.
+#   node         An instance of the node class named by the field type.
+#   structure    An instance of the class of the Structure named by the field type.
+# A field that can occur more than once holds a list, or None rather than an empty list, which keeps records that
+# leave most of their fields unset small. A row of alternative tags, eg `[CONC|CONT]`, has a field per tag.
+
+# Bump this when the generated code changes, so that modules cached on disk are regenerated.
+CODEGEN_VERSION = 1
+
+_regex_word = re.compile('[^A-Za-z0-9]+')
+
+class FieldSpec(object):
+    __slots__ = ('name', 'tag', 'kind', 'type', 'count_min', 'count_max')
+
+    def __init__(self, name:str, tag:str, kind:str, type:str, count_min:int, count_max):
+        self.name = name
+        self.tag = tag
+        self.kind = kind
+        self.type = type
+        self.count_min = count_min
+        self.count_max = count_max
+
+    @property
+    def many(self) -> bool:
+        return self.count_max is MANY or self.count_max > 1
+
+class ClassSpec(object):
+
+    def __init__(self, name:str, structure:Structure, tags:Tuple[str]=None):
+        self.name = name
+        self.structure = structure
+        # The tags of a node class, or None for a group class.
+        self.tags = tags
+        self.xref = None
+        self.values:List[Tuple[str, str]] = []
+        self.fields:Dict[str, FieldSpec] = {}
+
+    def add_value(self, row:Row) -> None:
+        if isinstance(row, NewRecordRow):
+            self.xref = row.xref
+        if isinstance(row, (PrimitiveValueRow, NewRecordWithValueRow)):
+            value = ('primitive', row.primitive)
+        elif isinstance(row, PointerValueRow):
+            value = ('pointer', row.pointer)
+        else:
+            return
+        if value not in self.values:
+            self.values.append(value)
+
+    def add_field(self, name:str, tag:str, kind:str, type:str, count_min:int, count_max) -> None:
+        field = self.fields.get(name)
+        if field is not None and (field.kind, field.type) == (kind, type):
+            # The same row in alternative definitions, which may only occur in some of them.
+            field.count_min = min(field.count_min, count_min)
+            field.count_max = count_max_larger(field.count_max, count_max)
+            return
+        if field is not None:
+            # A row with the same tag but a different meaning, in alternative definitions.
+            suffix = 2
+            while f"{name}_{suffix}" in self.fields:
+                suffix += 1
+            name = f"{name}_{suffix}"
+        self.fields[name] = FieldSpec(name, tag, kind, type, count_min, count_max)
+
+def _class_name(text:str) -> str:
+    name = "".join(word.capitalize() for word in _regex_word.split(text) if word)
+    return name if name and not name[0].isdigit() else "S" + name
+
+def _field_name(text:str) -> str:
+    name = _regex_word.sub("_", text).strip("_").lower() or "field"
+    if name[0].isdigit():
+        name = "f_" + name
+    return name + "_" if keyword.iskeyword(name) or name in ('tag', 'xref', 'value') else name
+
+class RecordClassGenerator(object):
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.classes:List[ClassSpec] = []
+        self.class_names:Dict[str, str] = {}
+        self._used_names = {'Field'}
+
+    def _unique_name(self, name:str) -> str:
+        unique_name = name
+        suffix = 2
+        while unique_name in self._used_names:
+            unique_name = f"{name}{suffix}"
+            suffix += 1
+        self._used_names.add(unique_name)
+        return unique_name
+
+    def build(self) -> List[ClassSpec]:
+        # Name the classes of every Structure first, so that they can refer to each other in any order.
+        for label in self.schema.structures:
+            self.class_names[label] = self._unique_name(_class_name(label))
+        for label, structure in self.schema.structures.items():
+            self._build_structure(structure)
+        return self.classes
+
+    def _build_structure(self, structure:Structure) -> None:
+        trees = [row_tree(rows) for rows in structure.definitions]
+        name = self.class_names[structure.label]
+        if trees and all(len(tree) == 1 and not isinstance(tree[0][0], SubstructureRow) for tree in trees):
+            tags = []
+            for tree in trees:
+                tags.extend(tag for tag in tree[0][0].tags if tag not in tags)
+            spec = ClassSpec(name, structure, tuple(tags))
+            self.classes.append(spec)
+            for tree in trees:
+                row, children = tree[0]
+                spec.add_value(row)
+                self._add_fields(spec, children, len(trees) > 1)
+        else:
+            spec = ClassSpec(name, structure)
+            self.classes.append(spec)
+            for tree in trees:
+                self._add_fields(spec, tree, len(trees) > 1)
+
+    def _add_fields(self, spec:ClassSpec, nodes, alternative:bool) -> None:
+        for row, children in nodes:
+            count_min = 0 if alternative else row.count_min
+            if isinstance(row, SubstructureRow):
+                spec.add_field(_field_name(row.value), None, 'structure', row.value, count_min, row.count_max)
+                continue
+            if children:
+                # The rows below get a node class of their own, nested in name under this class.
+                node = ClassSpec(self._unique_name(spec.name + _class_name(row.tags[0])), spec.structure, row.tags)
+                self.classes.append(node)
+                node.add_value(row)
+                self._add_fields(node, children, False)
+            for tag in row.tags:
+                if children:
+                    spec.add_field(_field_name(tag), tag, 'node', node.name, count_min, row.count_max)
+                elif isinstance(row, PrimitiveValueRow):
+                    spec.add_field(_field_name(tag), tag, 'primitive', row.primitive, count_min, row.count_max)
+                elif isinstance(row, PointerValueRow):
+                    spec.add_field(_field_name(tag), tag, 'pointer', row.pointer, count_min, row.count_max)
+                elif isinstance(row, NoValueRow):
+                    spec.add_field(_field_name(tag), tag, 'flag', None, count_min, row.count_max)
+                else:
+                    # A record row below another row, which is not a valid definition, but keeps its value.
+                    spec.add_field(_field_name(tag), tag, 'primitive', getattr(row, 'value', None), count_min, row.count_max)
+
+_module_header = '''\
+# Generated by gedcom_remastered_parser.codegen from the structures of a schema. Do not edit.
+from collections import namedtuple
+
+Field = namedtuple('Field', 'name tag kind type count_min count_max many')
+
+class _Record(object):
+    __slots__ = ()
+    STRUCTURE = None
+    TAGS = None
+    XREF = None
+    VALUES = ()
+    FIELDS = ()
+
+    def __repr__(self):
+        if self.TAGS is None:
+            return f"{type(self).__name__}<>"
+        return f"{type(self).__name__}<{' '.join(str(s) for s in (self.xref, self.tag, self.value) if s is not None)}>"
+'''
+
+def _render_class(spec:ClassSpec) -> str:
+    slots = list(spec.fields)
+    if spec.tags is not None:
+        slots = ['tag', 'xref', 'value'] + slots
+    lines = [
+        "",
+        f"class {spec.name}(_Record):",
+        f"    __slots__ = {tuple(slots)!r}",
+        f"    STRUCTURE = {spec.structure.label!r}",
+        f"    TAGS = {spec.tags!r}",
+        f"    XREF = {spec.xref!r}",
+        f"    VALUES = {tuple(spec.values)!r}",
+        "    FIELDS = (",
+    ]
+    for field in spec.fields.values():
+        count_max = None if field.count_max is MANY else field.count_max
+        lines.append(f"        Field({field.name!r}, {field.tag!r}, {field.kind!r}, {field.type!r}, {field.count_min}, {count_max}, {field.many}),")
+    lines.append("    )")
+    lines.append("")
+    parameters = ["self"]
+    if spec.tags is not None:
+        parameters += [f"tag={spec.tags[0]!r}", "xref=None", "value=None"]
+    parameters += [f"{name}=None" for name in spec.fields]
+    lines.append(f"    def __init__({', '.join(parameters)}):")
+    if spec.tags is not None:
+        lines += ["        self.tag = tag", "        self.xref = xref", "        self.value = value"]
+    lines.extend(f"        self.{name} = {name}" for name in spec.fields)
+    if len(parameters) == 1:
+        lines.append("        pass")
+    return "\n".join(lines)
+
+def generate_record_source(schema) -> str:
+    generator = RecordClassGenerator(schema)
+    parts = [_module_header]
+    parts.extend(_render_class(spec) for spec in generator.build())
+    parts.append("")
+    parts.append("# The class of each Structure, by its label.")
+    parts.append("CLASSES = {")
+    parts.extend(f"    {label!r}: {name}," for label, name in generator.class_names.items())
+    parts.append("}")
+    return "\n".join(parts) + "\n"
+
+def _source_key(schema) -> str:
+    # A key from the content of the structures, so a cached module is found without generating its source.
+    fingerprints = "".join(structure.fingerprint for structure in schema.structures.values())
+    return content_hash(f"{CODEGEN_VERSION}:{fingerprints}")
+
+def load_record_module(schema, cache_dir:str=None) -> types.ModuleType:
+    # Generate and import the record classes of the schema. With a cache directory, the module is written there, and
+    # later imported from there when the structures are unchanged, without being generated again.
+    if cache_dir is None:
+        module = types.ModuleType("gedcom_records")
+        exec(compile(generate_record_source(schema), "<gedcom_records>", "exec"), module.__dict__)
+        return module
+    key = _source_key(schema)
+    module_name = f"gedcom_records_{key}"
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    module_path = os.path.join(cache_dir, module_name + ".py")
+    if not os.path.exists(module_path):
+        os.makedirs(cache_dir, exist_ok=True)
+        file_descriptor, temp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, 'w') as file_writer:
+                file_writer.write(generate_record_source(schema))
+            os.replace(temp_path, module_path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    # Registering the module lets the records it defines be pickled.
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[module_name]
+        raise
+    return module
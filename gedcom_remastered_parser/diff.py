@@ -0,0 +1,175 @@
+from difflib import SequenceMatcher
+from typing import Dict, List, Tuple
+
+from .lexer import parse_element
+from .primitive import Primitive
+from .sources import ELEMENT_TYPES
+from .structure import Structure
+from .tag import Tag
+
+# Elements are compared by their fingerprints, so identical elements are skipped without looking inside them, and
+# only the elements whose fingerprints differ are compared field by field.
+
+class RowChange(object):
+    # A run of rows in one definition of a structure that was inserted, deleted, or replaced.
+    __slots__ = ('definition', 'operation', 'old_rows', 'new_rows')
+
+    def __init__(self, definition:int, operation:str, old_rows, new_rows):
+        self.definition = definition
+        self.operation = operation
+        self.old_rows = old_rows
+        self.new_rows = new_rows
+
+    def __repr__(self):
+        return f"RowChange<{self.definition} {self.operation} -{len(self.old_rows)} +{len(self.new_rows)}>"
+
+class ElementDiff(object):
+    # An element that was added (old is None), removed (new is None), or changed. A changed element lists the fields
+    # that differ as (old, new) pairs, and for a structure, the rows that differ.
+
+    def __init__(self, element_type:str, element_id:str, old, new):
+        self.element_type = element_type
+        self.id = element_id
+        self.old = old
+        self.new = new
+        self.fields:Dict[str, Tuple[object, object]] = {}
+        self.rows:List[RowChange] = []
+        if old is not None and new is not None:
+            _compare_fields[element_type](self, old, new)
+
+    def __repr__(self):
+        return f"ElementDiff<{self.element_type} {self.id} {self.kind}>"
+
+    @property
+    def kind(self) -> str:
+        if self.old is None:
+            return "added"
+        if self.new is None:
+            return "removed"
+        return "changed"
+
+def _compare_field(element_diff:ElementDiff, name:str, old_value, new_value) -> None:
+    if old_value != new_value:
+        element_diff.fields[name] = (old_value, new_value)
+
+def _compare_structures(element_diff:ElementDiff, old:Structure, new:Structure) -> None:
+    _compare_field(element_diff, 'description', old.description, new.description)
+    _compare_field(element_diff, 'definitions', len(old.definitions), len(new.definitions))
+    for index in range(max(len(old.definitions), len(new.definitions))):
+        old_rows = old.definitions[index] if index < len(old.definitions) else []
+        new_rows = new.definitions[index] if index < len(new.definitions) else []
+        matcher = SequenceMatcher(None, [row.fingerprint for row in old_rows], [row.fingerprint for row in new_rows], autojunk=False)
+        for operation, old_start, old_end, new_start, new_end in matcher.get_opcodes():
+            if operation != "equal":
+                element_diff.rows.append(RowChange(index, operation, old_rows[old_start:old_end], new_rows[new_start:new_end]))
+
+def _compare_primitives(element_diff:ElementDiff, old:Primitive, new:Primitive) -> None:
+    _compare_field(element_diff, 'size', (old.size_min, old.size_max), (new.size_min, new.size_max))
+    _compare_field(element_diff, 'optional_values', [str(o) for o in old.optional_values], [str(o) for o in new.optional_values])
+    _compare_field(element_diff, 'description', old.description, new.description)
+    if old.terms is None or new.terms is None:
+        _compare_field(element_diff, 'terms', old.terms, new.terms)
+        return
+    for key in list(old.terms) + [key for key in new.terms if key not in old.terms]:
+        _compare_field(element_diff, f"terms[{key}]", old.terms.get(key), new.terms.get(key))
+
+def _compare_tags(element_diff:ElementDiff, old:Tag, new:Tag) -> None:
+    _compare_field(element_diff, 'label', old.label, new.label)
+    _compare_field(element_diff, 'description', old.description, new.description)
+
+_compare_fields = {
+    'structures': _compare_structures,
+    'primitives': _compare_primitives,
+    'tags': _compare_tags,
+}
+
+class SchemaDiff(object):
+
+    def __init__(self):
+        self.elements:List[ElementDiff] = []
+
+    def __bool__(self):
+        return bool(self.elements)
+
+    def __iter__(self):
+        return iter(self.elements)
+
+    def __len__(self):
+        return len(self.elements)
+
+    def __repr__(self):
+        kinds = [element_diff.kind for element_diff in self.elements]
+        return f"SchemaDiff<+{kinds.count('added')} -{kinds.count('removed')} ~{kinds.count('changed')}>"
+
+    def of_kind(self, kind:str, element_type:str=None) -> List[ElementDiff]:
+        return [
+            element_diff for element_diff in self.elements
+            if element_diff.kind == kind and element_type in (None, element_diff.element_type)
+        ]
+
+def diff_schemas(old, new) -> SchemaDiff:
+    schema_diff = SchemaDiff()
+    for element_type in ELEMENT_TYPES:
+        old_elements = getattr(old, element_type)
+        new_elements = getattr(new, element_type)
+        for element_id, old_element in old_elements.items():
+            new_element = new_elements.get(element_id)
+            if new_element is None:
+                schema_diff.elements.append(ElementDiff(element_type, element_id, old_element, None))
+            elif new_element.fingerprint != old_element.fingerprint:
+                schema_diff.elements.append(ElementDiff(element_type, element_id, old_element, new_element))
+        for element_id, new_element in new_elements.items():
+            if element_id not in old_elements:
+                schema_diff.elements.append(ElementDiff(element_type, element_id, None, new_element))
+    return schema_diff
+
+class MergeConflict(object):
+    # An element that both sides changed differently from the base. Any of the three may be None when it is missing.
+
+    def __init__(self, element_type:str, element_id:str, base, ours, theirs):
+        self.element_type = element_type
+        self.id = element_id
+        self.base = base
+        self.ours = ours
+        self.theirs = theirs
+
+    def __repr__(self):
+        return f"MergeConflict<{self.element_type} {self.id}>"
+
+def _fingerprint(element) -> str:
+    return None if element is None else element.fingerprint
+
+def _copy_element(element, schema):
+    # Elements refer to their schema, so an element is copied into the merged schema by parsing its definition again,
+    # in the same way as a definition file.
+    return parse_element(element.txt_definition.split("\n"), schema, f"<{element.id}>")
+
+def merge_schemas(base, ours, theirs) -> Tuple[object, List[MergeConflict]]:
+    # Merge the changes that ours and theirs each made to base. An element changed on only one side takes that change,
+    # and an element that both sides changed differently is a conflict, for which ours is kept.
+    schema = type(ours)()
+    conflicts = []
+    for element_type in ELEMENT_TYPES:
+        base_elements = getattr(base, element_type)
+        our_elements = getattr(ours, element_type)
+        their_elements = getattr(theirs, element_type)
+        merged = getattr(schema, element_type)
+        # Follow the order of ours, followed by the elements only theirs has.
+        element_ids = list(our_elements) + [element_id for element_id in their_elements if element_id not in our_elements]
+        for element_id in element_ids:
+            base_element = base_elements.get(element_id)
+            our_element = our_elements.get(element_id)
+            their_element = their_elements.get(element_id)
+            base_fingerprint = _fingerprint(base_element)
+            our_fingerprint = _fingerprint(our_element)
+            their_fingerprint = _fingerprint(their_element)
+            if our_fingerprint == their_fingerprint or their_fingerprint == base_fingerprint:
+                element = our_element
+            elif our_fingerprint == base_fingerprint:
+                element = their_element
+            else:
+                conflicts.append(MergeConflict(element_type, element_id, base_element, our_element, their_element))
+                element = our_element
+            if element is not None:
+                merged[element_id] = _copy_element(element, schema)
+    return schema, conflicts
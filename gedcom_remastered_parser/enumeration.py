@@ -0,0 +1,159 @@
+from typing import Dict, List, Set, Tuple
+
+from .primitive import DEFAULT_OPTIONS_DEFINITION, Primitive, PrimitiveComponent
+
+# A primitive is enumerated when every option is a single literal, eg `[M|F|U]` or `[{confidential}|{locked}]`, or
+# when it has only the default option and a `Where:` list of terms, which are then its values.
+
+def enumerated_values(primitive:Primitive) -> Tuple[str]:
+    # The closed set of values of the primitive, or None when its values are not enumerated.
+    options = primitive.optional_values
+    if len(options) == 1 and options[0].definition == DEFAULT_OPTIONS_DEFINITION:
+        return tuple(primitive.terms) if primitive.terms else None
+    values = []
+    for optional_value in options:
+        components = optional_value.components
+        if len(components) != 1 or isinstance(components[0], PrimitiveComponent):
+            return None
+        values.append(components[0].value)
+    return tuple(values)
+
+class EnumerationIndex(object):
+    # Maps values to the enumerated primitives that accept them, as is and casefolded. Each primitive that is added,
+    # replaced, removed, or edited is only re-indexed on its own, the next time the index is used.
+
+    def __init__(self, schema):
+        self.schema = schema
+        self._values_by_label:Dict[str, Tuple[str]] = {}
+        self._folded_by_label:Dict[str, Set[str]] = {}
+        # Dicts are used as ordered sets of labels.
+        self._labels_by_value:Dict[str, Dict[str, None]] = {}
+        self._labels_by_folded:Dict[str, Dict[str, None]] = {}
+        # The trie of the values, which is built on first use and then kept up to date value by value.
+        self._trie = None
+        self._dirty:Set[str] = set()
+        for primitive in schema.primitives.values():
+            self._add(primitive)
+
+    def __repr__(self):
+        self._refresh()
+        return f"EnumerationIndex<{len(self._values_by_label)} primitives, {len(self._labels_by_value)} values>"
+
+    def mark_changed(self, label:str) -> None:
+        self._dirty.add(label)
+
+    def _refresh(self) -> None:
+        if not self._dirty:
+            return
+        primitives = self.schema.primitives
+        for label in self._dirty:
+            self._remove(label)
+            primitive = primitives.get(label)
+            if primitive is not None:
+                self._add(primitive)
+        self._dirty.clear()
+
+    def _add(self, primitive:Primitive) -> None:
+        values = enumerated_values(primitive)
+        if values is None:
+            return
+        label = primitive.label
+        self._values_by_label[label] = values
+        self._folded_by_label[label] = {value.casefold() for value in values}
+        for value in values:
+            labels = self._labels_by_value.get(value)
+            if labels is None:
+                labels = self._labels_by_value[value] = {}
+                if self._trie is not None:
+                    self._trie_insert(self._trie, value)
+            labels[label] = None
+            self._labels_by_folded.setdefault(value.casefold(), {})[label] = None
+
+    def _remove(self, label:str) -> None:
+        values = self._values_by_label.pop(label, None)
+        if values is None:
+            return
+        del self._folded_by_label[label]
+        for value in values:
+            for index, key in ((self._labels_by_value, value), (self._labels_by_folded, value.casefold())):
+                labels = index.get(key)
+                if labels is not None:
+                    labels.pop(label, None)
+                    if not labels:
+                        del index[key]
+                        if index is self._labels_by_value and self._trie is not None:
+                            self._trie_remove(self._trie, value)
+
+    def __contains__(self, label:str) -> bool:
+        # Whether the primitive is enumerated.
+        self._refresh()
+        return label in self._values_by_label
+
+    def values_of(self, label:str) -> Tuple[str]:
+        self._refresh()
+        return self._values_by_label[label]
+
+    def accepts(self, label:str, value:str, casefold:bool=False) -> bool:
+        # Whether the enumerated primitive accepts the value. Raises a KeyError for a primitive that is not enumerated.
+        self._refresh()
+        folded = self._folded_by_label[label]
+        if casefold:
+            return value.casefold() in folded
+        return label in self._labels_by_value.get(value, ())
+
+    def primitives_accepting(self, value:str, casefold:bool=False) -> Tuple[str]:
+        self._refresh()
+        if casefold:
+            return tuple(self._labels_by_folded.get(value.casefold(), ()))
+        return tuple(self._labels_by_value.get(value, ()))
+
+    def values_with_prefix(self, prefix:str, label:str=None) -> List[str]:
+        # The values that start with the prefix, ignoring case, of one primitive or of all of them.
+        self._refresh()
+        if self._trie is None:
+            trie = {}
+            for value in self._labels_by_value:
+                self._trie_insert(trie, value)
+            self._trie = trie
+        node = self._trie
+        for character in prefix.casefold():
+            node = node.get(character)
+            if node is None:
+                return []
+        values = []
+        pending = [node]
+        while pending:
+            node = pending.pop()
+            for key, child in node.items():
+                if key is None:
+                    values.extend(value for value in child if label is None or label in self._labels_by_value[value])
+                else:
+                    pending.append(child)
+        return sorted(values)
+
+    # The trie is nested dicts by casefolded character, with the values under the key None where they end.
+
+    @staticmethod
+    def _trie_insert(trie:dict, value:str) -> None:
+        node = trie
+        for character in value.casefold():
+            node = node.setdefault(character, {})
+        node.setdefault(None, []).append(value)
+
+    @staticmethod
+    def _trie_remove(trie:dict, value:str) -> None:
+        # Remove the value, and the nodes that only led to it.
+        path = []
+        node = trie
+        for character in value.casefold():
+            path.append((node, character))
+            node = node[character]
+        ending = node[None]
+        ending.remove(value)
+        if ending:
+            return
+        del node[None]
+        for parent, character in reversed(path):
+            if parent[character]:
+                break
+            del parent[character]
@@ -0,0 +1,185 @@
+from array import array
+from typing import Dict, FrozenSet, List, Tuple
+
+from .primitive import DEFAULT_OPTIONS_DEFINITION, PrimitiveComponent, TagComponent
+from .sources import ELEMENT_TYPES
+from .structure import NewRecordRow, NewRecordWithValueRow, PointerValueRow, PrimitiveValueRow, RowWithTags, SubstructureRow
+
+# A graph of the references between the elements of a schema. Each element, and each id that is referred to but not
+# defined, is a node with an integer id. The edges are stored as compressed sparse rows: the targets of node n are
+# `targets[offsets[n]:offsets[n + 1]]`, and their kinds are the same slice of `kinds`.
+
+# The kinds of edge.
+EDGE_SUBSTRUCTURE = 0   # A Structure includes a `<<STRUCTURE>>`.
+EDGE_PRIMITIVE = 1      # A Structure row has a `<PRIMITIVE>` value, or a Primitive option nests one.
+EDGE_TAG = 2            # A Structure row has a tag, or a Primitive option has a `%TAG%`.
+EDGE_POINTER = 3        # A Structure row points to, or defines, an `@<XREF:TAG>@` record, whose xref is a Primitive.
+
+EDGE_NAMES = ('substructure', 'primitive', 'tag', 'pointer')
+
+class DanglingReference(object):
+    __slots__ = ('source_type', 'source_id', 'kind', 'target_type', 'target_id')
+
+    def __init__(self, source_type:str, source_id:str, kind:int, target_type:str, target_id:str):
+        self.source_type = source_type
+        self.source_id = source_id
+        self.kind = kind
+        self.target_type = target_type
+        self.target_id = target_id
+
+    def __repr__(self):
+        return f"DanglingReference<{self.source_type} {self.source_id} -{EDGE_NAMES[self.kind]}-> {self.target_type} {self.target_id}>"
+
+class SchemaGraph(object):
+
+    def __init__(self, schema):
+        self.nodes:List[Tuple[str, str]] = []
+        self._node_ids:Dict[Tuple[str, str], int] = {}
+        # Whether each node is defined in the schema, rather than only referred to.
+        self.defined = array('b')
+        for element_type in ELEMENT_TYPES:
+            for element_id in getattr(schema, element_type):
+                self._node(element_type, element_id, True)
+        self.offsets = array('l', [0])
+        self.targets = array('l')
+        self.kinds = array('b')
+        defined_nodes = len(self.nodes)
+        for node in range(defined_nodes):
+            element_type, element_id = self.nodes[node]
+            edges = self._edges(element_type, getattr(schema, element_type)[element_id])
+            for kind, target_type, target_id in edges:
+                self.targets.append(self._node(target_type, target_id, False))
+                self.kinds.append(kind)
+            self.offsets.append(len(self.targets))
+        # The nodes that are only referred to have no edges.
+        self.offsets.extend([len(self.targets)] * (len(self.nodes) - defined_nodes))
+        self._reachable:Dict[int, FrozenSet[int]] = {}
+
+    def __repr__(self):
+        return f"SchemaGraph<{len(self.nodes)} nodes, {len(self.targets)} edges>"
+
+    def _node(self, element_type:str, element_id:str, defined:bool) -> int:
+        key = (element_type, element_id)
+        node = self._node_ids.get(key)
+        if node is None:
+            node = self._node_ids[key] = len(self.nodes)
+            self.nodes.append(key)
+            self.defined.append(defined)
+        return node
+
+    @staticmethod
+    def _edges(element_type:str, element) -> List[Tuple[int, str, str]]:
+        edges = []
+        if element_type == 'structures':
+            for rows in element.definitions:
+                for row in rows:
+                    if isinstance(row, SubstructureRow):
+                        edges.append((EDGE_SUBSTRUCTURE, 'structures', row.value))
+                        continue
+                    if isinstance(row, RowWithTags):
+                        edges.extend((EDGE_TAG, 'tags', tag) for tag in row.tags)
+                    if isinstance(row, NewRecordRow):
+                        edges.append((EDGE_POINTER, 'primitives', row.xref))
+                    if isinstance(row, (PrimitiveValueRow, NewRecordWithValueRow)):
+                        edges.append((EDGE_PRIMITIVE, 'primitives', row.primitive))
+                    elif isinstance(row, PointerValueRow):
+                        edges.append((EDGE_POINTER, 'primitives', row.pointer))
+        elif element_type == 'primitives':
+            for optional_value in element.optional_values:
+                if optional_value.definition == DEFAULT_OPTIONS_DEFINITION:
+                    # The default option is any text, as the validators take it, rather than a reference to TEXT.
+                    continue
+                for component in optional_value.components:
+                    if isinstance(component, PrimitiveComponent):
+                        edges.append((EDGE_PRIMITIVE, 'primitives', component.value))
+                    elif isinstance(component, TagComponent):
+                        edges.append((EDGE_TAG, 'tags', component.value))
+        # Each reference is only kept once.
+        return list(dict.fromkeys(edges))
+
+    def node(self, element_type:str, element_id:str) -> int:
+        return self._node_ids[(element_type, element_id)]
+
+    def edges(self, node:int) -> List[Tuple[int, int]]:
+        # The (kind, target node) of each edge from the node.
+        start, end = self.offsets[node], self.offsets[node + 1]
+        return list(zip(self.kinds[start:end], self.targets[start:end]))
+
+    def dangling(self) -> List[DanglingReference]:
+        # Every reference to an element that the schema does not define, such as a misspelt `<<STRUCTURE>>`.
+        references = []
+        for node in range(len(self.nodes)):
+            for kind, target in self.edges(node):
+                if not self.defined[target]:
+                    source_type, source_id = self.nodes[node]
+                    target_type, target_id = self.nodes[target]
+                    references.append(DanglingReference(source_type, source_id, kind, target_type, target_id))
+        return references
+
+    def cycles(self) -> List[List[Tuple[str, str]]]:
+        # Each group of structures that include each other, or primitives that nest each other, found as the strongly
+        # connected components of the graph, with an iterative version of Tarjan's algorithm.
+        offsets, targets = self.offsets, self.targets
+        indexes = [-1] * len(self.nodes)
+        lowlinks = [0] * len(self.nodes)
+        on_stack = [False] * len(self.nodes)
+        stack = []
+        cycles = []
+        counter = 0
+        for root in range(len(self.nodes)):
+            if indexes[root] != -1:
+                continue
+            work = [(root, offsets[root])]
+            indexes[root] = lowlinks[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            while work:
+                node, position = work[-1]
+                if position < offsets[node + 1]:
+                    work[-1] = (node, position + 1)
+                    target = targets[position]
+                    if indexes[target] == -1:
+                        indexes[target] = lowlinks[target] = counter
+                        counter += 1
+                        stack.append(target)
+                        on_stack[target] = True
+                        work.append((target, offsets[target]))
+                    elif on_stack[target]:
+                        lowlinks[node] = min(lowlinks[node], indexes[target])
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlinks[parent] = min(lowlinks[parent], lowlinks[node])
+                if lowlinks[node] == indexes[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in targets[offsets[node]:offsets[node + 1]]:
+                        cycles.append([self.nodes[member] for member in reversed(component)])
+        return cycles
+
+    def reachable(self, element_type:str, element_id:str, target_type:str=None) -> Tuple[str]:
+        # The ids of the elements that the element refers to, directly or through others, optionally of one type.
+        # The nodes reachable from each node are cached.
+        node = self.node(element_type, element_id)
+        reachable = self._reachable.get(node)
+        if reachable is None:
+            seen = set()
+            pending = [node]
+            while pending:
+                current = pending.pop()
+                for target in self.targets[self.offsets[current]:self.offsets[current + 1]]:
+                    if target not in seen:
+                        seen.add(target)
+                        pending.append(target)
+            reachable = self._reachable[node] = frozenset(seen)
+        return tuple(
+            self.nodes[target][1] for target in sorted(reachable)
+            if target_type is None or self.nodes[target][0] == target_type
+        )
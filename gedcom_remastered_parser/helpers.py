@@ -1,12 +1,64 @@
+import gc
+import hashlib
+import threading
+from contextlib import contextmanager
 from functools import update_wrapper
 class reify(object):
+    # Instances with a `__dict__` cache the value under the same name, which then shadows this descriptor.
+    # Slotted instances have no `__dict__`, so they must declare a `_cached_<name>` slot to cache the value in.
     def __init__(self, wrapped):
         self.wrapped = wrapped
+        self.slot = "_cached_" + wrapped.__name__
         update_wrapper(self, wrapped)
     def __get__(self, inst, objtype=None):
         if inst is None:
             return self
+        try:
+            return getattr(inst, self.slot)
+        except AttributeError:
+            pass
         val = self.wrapped(inst)
-        setattr(inst, self.wrapped.__name__, val)
+        if hasattr(inst, '__dict__'):
+            setattr(inst, self.wrapped.__name__, val)
+        else:
+            setattr(inst, self.slot, val)
         return val
-cached_property = reify
\ No newline at end of file
+cached_property = reify
+
+def clear_cached(inst, *names):
+    # Discard the values that reify has cached on the instance, so they are computed again on next access.
+    for name in names:
+        if hasattr(inst, '__dict__'):
+            inst.__dict__.pop(name, None)
+        elif hasattr(inst, "_cached_" + name):
+            delattr(inst, "_cached_" + name)
+
+# Overlapping pauses, such as from several threads, are counted, so that collection resumes once the last one ends.
+_gc_pause_lock = threading.Lock()
+_gc_pauses = 0
+_gc_was_enabled = False
+
+@contextmanager
+def gc_paused(pause:bool=True):
+    # Building a schema allocates many small objects at once, which would otherwise trigger repeated collections. The
+    # collector is process wide, so callers only pause it when the application opts in.
+    global _gc_pauses, _gc_was_enabled
+    if not pause:
+        yield
+        return
+    with _gc_pause_lock:
+        if not _gc_pauses:
+            _gc_was_enabled = gc.isenabled()
+            gc.disable()
+        _gc_pauses += 1
+    try:
+        yield
+    finally:
+        with _gc_pause_lock:
+            _gc_pauses -= 1
+            if not _gc_pauses and _gc_was_enabled:
+                gc.enable()
+
+def content_hash(text:str) -> str:
+    # A short, stable digest of a text definition, which is the same across processes and Python versions.
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
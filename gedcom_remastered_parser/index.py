@@ -0,0 +1,49 @@
+from collections import defaultdict
+from typing import Dict, Tuple
+
+from .structure import NewRecordWithValueRow, PrimitiveValueRow, Row, RowWithTags, Structure, SubstructureRow
+
+class SchemaIndex(object):
+    # Reverse lookups over every row of every Structure, built in a single pass.
+
+    def __init__(self, schema):
+        rows_by_tag = defaultdict(list)
+        structures_by_tag = defaultdict(list)
+        rows_by_primitive = defaultdict(list)
+        parents_by_structure = defaultdict(list)
+        for structure in schema.structures.values():
+            for rows in structure.definitions:
+                for row in rows:
+                    if isinstance(row, SubstructureRow):
+                        parents = parents_by_structure[row.value]
+                        if not parents or parents[-1] is not structure:
+                            parents.append(structure)
+                        continue
+                    if isinstance(row, RowWithTags):
+                        for tag in row.tags:
+                            rows_by_tag[tag].append(row)
+                            structures = structures_by_tag[tag]
+                            if not structures or structures[-1] is not structure:
+                                structures.append(structure)
+                    if isinstance(row, (PrimitiveValueRow, NewRecordWithValueRow)):
+                        rows_by_primitive[row.primitive].append(row)
+        self._rows_by_tag = self._freeze(rows_by_tag)
+        self._structures_by_tag = self._freeze(structures_by_tag)
+        self._rows_by_primitive = self._freeze(rows_by_primitive)
+        self._parents_by_structure = self._freeze(parents_by_structure)
+
+    @staticmethod
+    def _freeze(index:Dict[str, list]) -> Dict[str, tuple]:
+        return {key: tuple(values) for key, values in index.items()}
+
+    def rows_with_tag(self, tag:str) -> Tuple[Row, ...]:
+        return self._rows_by_tag.get(tag, ())
+
+    def structures_with_tag(self, tag:str) -> Tuple[Structure, ...]:
+        return self._structures_by_tag.get(tag, ())
+
+    def rows_with_primitive(self, label:str) -> Tuple[Row, ...]:
+        return self._rows_by_primitive.get(label, ())
+
+    def parents_of(self, label:str) -> Tuple[Structure, ...]:
+        return self._parents_by_structure.get(label, ())
@@ -0,0 +1,65 @@
+from collections import defaultdict
+from typing import Dict
+
+# The phases a load is split into, each timed in seconds:
+#   read                 Reading the lines of a file.
+#   tokenize             Classifying each line by the element it defines or belongs to, and splitting headers, rows,
+#                        options and terms into their parts, which is where the regular expressions are matched.
+#   <type>.build         Making the elements of the element type from their tokens, eg `primitives.build`.
+#   structures.rows      Making the Row objects of the structures from their tokens.
+#   snapshot.load        Loading a snapshot in place of the text definitions.
+#   snapshot.save        Writing a snapshot after the text definitions were parsed.
+# And the counters:
+#   files, lines         The files read, and all of their lines.
+#   <type>               The elements of the element type, eg `primitives`.
+#   rows.<class>         The rows of each Row class, eg `rows.SubstructureRow`.
+
+class LoadObserver(object):
+    # Receives the timings and counts of a schema load. Subclass it to export them elsewhere.
+
+    def phase(self, name:str, seconds:float) -> None:
+        pass
+
+    def count(self, name:str, amount:int=1) -> None:
+        pass
+
+class LoadProfile(LoadObserver):
+    # An observer that totals the timings and counts, for a report once the load is complete.
+
+    def __init__(self):
+        self.phases:Dict[str, float] = defaultdict(float)
+        self.counters:Dict[str, int] = defaultdict(int)
+
+    def phase(self, name:str, seconds:float) -> None:
+        self.phases[name] += seconds
+
+    def count(self, name:str, amount:int=1) -> None:
+        self.counters[name] += amount
+
+    def replay(self, observer:LoadObserver) -> None:
+        # Pass the totals on to another observer, such as from a worker of a parallel load.
+        for name, seconds in self.phases.items():
+            observer.phase(name, seconds)
+        for name, amount in self.counters.items():
+            observer.count(name, amount)
+
+    @property
+    def total(self) -> float:
+        return sum(self.phases.values())
+
+    def report(self) -> dict:
+        return {
+            'total': self.total,
+            'phases': dict(sorted(self.phases.items())),
+            'counters': dict(sorted(self.counters.items())),
+        }
+
+    def __str__(self):
+        total = self.total
+        lines = [f"{'total':24} {total * 1000:10.2f} ms"]
+        for name, seconds in sorted(self.phases.items(), key=lambda item: -item[1]):
+            share = seconds / total * 100 if total else 0
+            lines.append(f"{name:24} {seconds * 1000:10.2f} ms {share:5.1f}%")
+        for name, amount in sorted(self.counters.items()):
+            lines.append(f"{name:24} {amount:10d}")
+        return "\n".join(lines)
@@ -0,0 +1,135 @@
+import locale
+import mmap
+from collections import OrderedDict
+from collections.abc import ItemsView, ValuesView
+from typing import List
+
+from .lexer import DefinitionError, Diagnostic, parse_element
+
+# A lazily loaded file is only scanned for its header lines at first. Each element is recorded by its kind, id, and
+# the byte offsets of its definition, and is parsed from the memory-mapped file when it is first looked up.
+# The file must not be edited in place while the schema is in use, as the unparsed definitions are read from it.
+
+class LazySource(object):
+    # A memory-mapped definition file, which the lazy elements of the file are parsed from.
+
+    def __init__(self, filepath:str, schema):
+        self.filepath = filepath
+        self.schema = schema
+        # The encoding that the text definitions are opened with when they are loaded eagerly.
+        self.encoding = locale.getpreferredencoding(False)
+        with open(filepath, 'rb') as file_reader:
+            try:
+                self.data = mmap.mmap(file_reader.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                self.data = b"" # An empty file cannot be mapped, and has no elements.
+
+    def scan(self, element_classes) -> List['LazyElement']:
+        # Find the header lines, without parsing them or the lines that follow.
+        data = self.data
+        elements = []
+        position = 0
+        number = 0
+        size = len(data)
+        while position < size:
+            number += 1
+            end = data.find(b"\n", position)
+            end = size if end == -1 else end + 1
+            line = data[position:end]
+            if b":=" in line:
+                header = line.decode(self.encoding).rstrip("\n\r")
+                if header.endswith("}"):
+                    element_type = 'primitives'
+                    element_id = header.partition(":=")[0]
+                elif header.endswith("}:="):
+                    element_type = 'tags'
+                    element_id = header.partition(" ")[0]
+                else:
+                    element_type = 'structures'
+                    element_id = header[:-2]
+                if elements:
+                    elements[-1].end = position
+                elements.append(LazyElement(self, element_classes[element_type], element_type, element_id, position, size, number))
+            elif not elements:
+                raise DefinitionError([Diagnostic(self.filepath, number, "The file does not begin with a definition header.")])
+            position = end
+        return elements
+
+class LazyElement(object):
+    # The place of an element that has not been parsed yet.
+    __slots__ = ('source', 'element_class', 'element_type', 'id', 'start', 'end', 'line', 'element')
+
+    def __init__(self, source:LazySource, element_class, element_type:str, element_id:str, start:int, end:int, line:int=1):
+        self.source = source
+        self.element_class = element_class
+        self.element_type = element_type
+        self.id = element_id
+        self.start = start
+        self.end = end
+        # The line number of the header, so that the errors of the element are reported at their lines in the file.
+        self.line = line
+        self.element = None
+
+    def __repr__(self):
+        return f"LazyElement<{self.element_type} {self.id}>"
+
+    def __reduce__(self):
+        # Pickling parses the element, so a snapshot never refers to the file.
+        return (_identity, (self.resolve(),))
+
+    def resolve(self):
+        if self.element is None:
+            text = self.source.data[self.start:self.end].decode(self.source.encoding)
+            # Split the lines as a file opened in text mode would.
+            lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+            if lines[-1] == "":
+                lines.pop()
+            self.element = parse_element(lines, self.source.schema, self.source.filepath, self.line)
+        return self.element
+
+def _identity(value):
+    return value
+
+def unwrap(value):
+    # The element a lazy element was parsed into, or the value itself.
+    if isinstance(value, LazyElement) and value.element is not None:
+        return value.element
+    return value
+
+def is_unparsed(value) -> bool:
+    return isinstance(value, LazyElement) and value.element is None
+
+class LazyElementMixin(object):
+    # Parses lazy elements as they are looked up, and stores them in their place. Storing them does not count as a
+    # change to the mapping, as the element was already part of the schema.
+
+    def __getitem__(self, key):
+        value = OrderedDict.__getitem__(self, key)
+        if isinstance(value, LazyElement):
+            value = value.resolve()
+            OrderedDict.__setitem__(self, key, value)
+        return value
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def pop(self, key, *args):
+        value = super().pop(key, *args)
+        return value.resolve() if isinstance(value, LazyElement) else value
+
+    def popitem(self, last=True):
+        key, value = super().popitem(last)
+        return key, value.resolve() if isinstance(value, LazyElement) else value
+
+    def values(self):
+        return ValuesView(self)
+
+    def items(self):
+        return ItemsView(self)
+
+    @property
+    def unparsed(self) -> int:
+        # The number of elements that have not been looked up yet.
+        return sum(1 for value in OrderedDict.values(self) if isinstance(value, LazyElement))
@@ -0,0 +1,185 @@
+from collections import OrderedDict
+from time import perf_counter
+from typing import List, Tuple
+
+from .primitive import OptionalValue, OptionalValues, Primitive, regex_primitive_header
+from .schema_element import ContentDict
+from .structure import Structure, parse_row_definition
+from .tag import Tag, re_tag_header
+
+# Definition files are read in a single pass. Each line is classified once, by the kind of element it belongs to,
+# into a token of (kind, line number, values), with a header or row split into its parts there and then. The elements
+# are then built from the tokens, without reading the text again. A malformed line becomes a Diagnostic with its
+# file and line number, and the lines are read on to the end, so that a file reports all of its errors at once.
+
+# The kinds of token.
+STRUCTURE_HEADER = 0    # (label,)
+PRIMITIVE_HEADER = 1    # (label, size_min, size_max)
+TAG_HEADER = 2          # (tag, label)
+ROW = 3                 # (row class, row keyword arguments, line)
+ALTERNATIVE = 4         # () A `|` between the alternative definitions of a Structure.
+OPTIONS = 5             # (option definitions,) The `[A|B]` line of a Primitive.
+WHERE = 6               # () The `Where:` line of a Primitive.
+TERM = 7                # (key, value)
+TEXT = 8                # (text,) A line of a description.
+
+class Diagnostic(object):
+    __slots__ = ('filepath', 'line', 'message')
+
+    def __init__(self, filepath:str, line:int, message:str):
+        self.filepath = filepath
+        self.line = line
+        self.message = message
+
+    def __repr__(self):
+        return f"Diagnostic<{self}>"
+
+    def __str__(self):
+        return f"{self.filepath}:{self.line}: {self.message}"
+
+def sort_diagnostics(diagnostics:List[Diagnostic]) -> List[Diagnostic]:
+    # The diagnostics by line, within each file in the order the files were read. The lines of a file are read for
+    # its elements after they are classified, so the diagnostics of the two are found out of order.
+    files = {}
+    for diagnostic in diagnostics:
+        files.setdefault(diagnostic.filepath, len(files))
+    return sorted(diagnostics, key=lambda diagnostic: (files[diagnostic.filepath], diagnostic.line))
+
+class DefinitionError(ValueError):
+    # Every error found in one or more definition files.
+
+    def __init__(self, diagnostics:List[Diagnostic]):
+        diagnostics = sort_diagnostics(diagnostics)
+        super().__init__(diagnostics)
+        self.diagnostics = diagnostics
+
+    def __str__(self):
+        amount = len(self.diagnostics)
+        return f"{amount} error{'s' if amount != 1 else ''} in the definition files:\n" + "\n".join(str(d) for d in self.diagnostics)
+
+def tokenize(lines:List[str], filepath:str, diagnostics:List[Diagnostic], first_line:int=1) -> List[Tuple]:
+    tokens = []
+    append = tokens.append
+    # The kind of element the lines belong to, or None before the first header, and after a malformed header.
+    element_type = None
+    in_terms = False
+    skipping = False
+    for number, line in enumerate(lines, first_line):
+        line = line.rstrip("\n\r")
+        if ":=" in line:
+            in_terms = False
+            if line.endswith("}"):
+                match = regex_primitive_header.match(line)
+                if match:
+                    size_min, _, size_max = match[2].partition(":")
+                    append((PRIMITIVE_HEADER, number, match[1], size_min, size_max))
+                    element_type = 'primitives'
+                    continue
+                message = "The line is not a properly formed PRIMITIVE header."
+            elif line.endswith("}:="):
+                match = re_tag_header.match(line)
+                if match:
+                    append((TAG_HEADER, number, match[1], match[2]))
+                    element_type = 'tags'
+                    continue
+                message = "The line is not a properly formed TAG header."
+            elif line.endswith(":=") and " " not in line:
+                append((STRUCTURE_HEADER, number, line[:-2]))
+                element_type = 'structures'
+                continue
+            else:
+                message = "The line is not a properly formed STRUCTURE header."
+            # The lines of a malformed element are skipped, as each would only repeat the error.
+            diagnostics.append(Diagnostic(filepath, number, message))
+            element_type = None
+            skipping = True
+        elif element_type == 'structures':
+            if line.startswith(("n", "0", "+")):
+                try:
+                    append((ROW, number, *parse_row_definition(line), line))
+                except (ValueError, IndexError) as error:
+                    diagnostics.append(Diagnostic(filepath, number, f"The row `{line}` is not understood. {error}"))
+            elif line == "|":
+                append((ALTERNATIVE, number))
+            elif line not in ("[", "]"):
+                append((TEXT, number, line))
+        elif element_type == 'primitives':
+            if line.startswith("["):
+                # Safer than using strip("[]"), which can remove required brackets, eg [BC].
+                append((OPTIONS, number, line[1:-1].split("|")))
+            elif line == "Where:":
+                append((WHERE, number))
+                in_terms = True
+            elif in_terms:
+                key, _, value = line.partition(" = ")
+                append((TERM, number, key, value))
+            else:
+                append((TEXT, number, line))
+        elif element_type == 'tags':
+            append((TEXT, number, line))
+        elif not skipping:
+            diagnostics.append(Diagnostic(filepath, number, "The file does not begin with a definition header."))
+            skipping = True
+    return tokens
+
+def build_elements(tokens:List[Tuple], schema, filepath:str, diagnostics:List[Diagnostic], timings:dict=None) -> List[Tuple[str, object]]:
+    # The (element type, element) pairs of the tokens, in order. With timings, the time spent making the elements of
+    # each element type from their tokens is added up, with the rows of the structures timed apart.
+    defined = []
+    element = None
+    description = []
+    # The contents of an element are filled in directly, as an element that is still being built has nothing cached.
+    append_row = list.append
+    set_term = OrderedDict.__setitem__
+    for token in tokens:
+        if timings is not None:
+            mark = perf_counter()
+        kind = token[0]
+        if kind <= TAG_HEADER:
+            if description:
+                element.description = "\n".join(description)
+                description = []
+            if kind == STRUCTURE_HEADER:
+                element_type = 'structures'
+                element = Structure(label=token[2], schema=schema)
+            elif kind == PRIMITIVE_HEADER:
+                element_type = 'primitives'
+                element = Primitive(label=token[2], size_min=token[3], size_max=token[4], schema=schema)
+            else:
+                element_type = 'tags'
+                element = Tag(tag=token[2], label=token[3], schema=schema)
+            defined.append((element_type, element))
+            phase = build_phase = element_type + '.build'
+        elif kind == ROW:
+            phase = 'structures.rows'
+            try:
+                append_row(element.definitions[-1], token[2](structure=element, **token[3]))
+            except (ValueError, AttributeError) as error:
+                diagnostics.append(Diagnostic(filepath, token[1], f"The row `{token[4]}` is not understood. {error}"))
+        else:
+            phase = build_phase
+            if kind == TEXT:
+                # As a description that is empty so far does not begin with a blank line.
+                if description or token[2]:
+                    description.append(token[2])
+            elif kind == TERM:
+                set_term(element.terms, token[2], token[3])
+            elif kind == ALTERNATIVE:
+                element.add_definition()
+            elif kind == OPTIONS:
+                element.optional_values = OptionalValues((OptionalValue(definition, element) for definition in token[2]), element)
+            else:
+                element.terms = ContentDict(element=element)
+        if timings is not None:
+            timings[phase] = timings.get(phase, 0) + perf_counter() - mark
+    if description:
+        element.description = "\n".join(description)
+    return defined
+
+def parse_element(lines:List[str], schema, filepath:str, first_line:int=1):
+    # The one element that the lines define, such as the text definition of an element being parsed on its own.
+    diagnostics = []
+    defined = build_elements(tokenize(lines, filepath, diagnostics, first_line), schema, filepath, diagnostics)
+    if diagnostics:
+        raise DefinitionError(diagnostics)
+    return defined[0][1]
@@ -0,0 +1,211 @@
+from typing import Dict, Iterable, List, Tuple
+
+from .structure import MANY, PointerValueRow, Structure, SubstructureRow, count_max_add, count_max_larger, count_max_multiply, row_tree
+
+# A Structure is compiled into a tree of nodes, one per reachable (level, tag) position, with every
+# `<<SUBSTRUCTURE>>` inlined. Where several rows could produce the same tag at the same position (either
+# `|` alternatives, or `[A|B]` tag lists), they are merged into a single node that accepts the union of
+# their children, with effective bounds that are satisfied by any of the alternatives. This makes the
+# matcher deterministic, so each data line costs a constant number of dictionary operations.
+#
+# The union alone would lose the constraints that only hold within one alternative, so two more checks are made
+# when a line is closed, neither of which can reject data that fits the definitions:
+# - a group of tags, of which at least a number of lines is required, where every alternative of a required
+#   substructure, or every tag of a required `[A|B]` list, has a line of its own;
+# - the variants of a node merged from several rows, one of which the line must fit as a whole. A line given with
+#   its value also has to be a pointer exactly when its row is one.
+# Constraints that span several levels of alternatives are still only checked through the union.
+
+class MatcherVariant(object):
+    # The children that one of the rows merged into a node allows, as they were before the merge.
+
+    def __init__(self, node:'MatcherNode'):
+        self.bounds = {tag: (child.count_min, child.count_max) for tag, child in node.children.items()}
+        self.groups = list(node.groups)
+        pointers = {isinstance(row, PointerValueRow) for row in node.rows}
+        self.pointer = pointers.pop() if len(pointers) == 1 else None
+
+    def fits(self, counts:Dict[str, int], pointer) -> bool:
+        if pointer is not None and self.pointer is not None and pointer != self.pointer:
+            return False
+        bounds = self.bounds
+        for tag, count in counts.items():
+            bound = bounds.get(tag)
+            if bound is None or (bound[1] is not MANY and count > bound[1]):
+                return False
+        for tag, (count_min, _) in bounds.items():
+            if count_min and counts.get(tag, 0) < count_min:
+                return False
+        return all(sum(counts.get(tag, 0) for tag in tags) >= count_min for tags, count_min in self.groups)
+
+class MatcherNode(object):
+
+    def __init__(self, tag:str=None, count_min:int=1, count_max=1):
+        self.tag = tag
+        self.count_min = count_min
+        self.count_max = count_max
+        self.rows = []
+        self.children:Dict[str, MatcherNode] = {}
+        self.required:List[MatcherNode] = []
+        # (tags, count_min) pairs, and the variants of a merged node, both described above.
+        self.groups:List[Tuple[Tuple[str, ...], int]] = []
+        self.variants:List[MatcherVariant] = []
+
+    def __repr__(self):
+        return f"MatcherNode<{self.tag} {{{self.count_min}:{self.count_max}}}>"
+
+    def _finalise(self):
+        self.required = [child for child in self.children.values() if child.count_min > 0]
+        for child in self.children.values():
+            child._finalise()
+
+def _merge_children(children:Dict[str, MatcherNode], other:Dict[str, MatcherNode], alternative:bool) -> Dict[str, MatcherNode]:
+    # Siblings from the same definition add up, while alternatives only need to satisfy one of them.
+    for tag, node in other.items():
+        existing = children.get(tag)
+        if existing is None:
+            if alternative:
+                node.count_min = 0
+            children[tag] = node
+            continue
+        if alternative:
+            existing.count_min = min(existing.count_min, node.count_min)
+            existing.count_max = count_max_larger(existing.count_max, node.count_max)
+        else:
+            existing.count_min += node.count_min
+            existing.count_max = count_max_add(existing.count_max, node.count_max)
+        # A line with this tag is an instance of only one of the merged rows.
+        existing.variants = (existing.variants or [MatcherVariant(existing)]) + (node.variants or [MatcherVariant(node)])
+        existing.groups = []
+        existing.rows.extend(node.rows)
+        _merge_children(existing.children, node.children, alternative=True)
+    if alternative:
+        for tag, node in children.items():
+            if tag not in other:
+                node.count_min = 0
+    return children
+
+def _compile_structure(structure:Structure, stack:List[str]) -> Tuple[Dict[str, MatcherNode], list]:
+    if structure.label in stack:
+        raise ValueError(f"The structure {structure.label} includes itself through {' > '.join(stack)}.")
+    stack.append(structure.label)
+    alternatives = [_compile_rows(rows, structure, stack) for rows in structure.definitions]
+    stack.pop()
+    if not alternatives:
+        return {}, []
+    children, groups = alternatives[0]
+    if len(alternatives) > 1:
+        # Each occurrence is one of the alternatives, which has a line of its own if it requires one.
+        has_line = all(
+            any(node.count_min > 0 for node in alternative_children.values()) or alternative_groups
+            for alternative_children, alternative_groups in alternatives
+        )
+        for alternative_children, _ in alternatives[1:]:
+            _merge_children(children, alternative_children, alternative=True)
+        groups = [(tuple(children), 1)] if has_line else []
+    return children, groups
+
+def _compile_rows(rows, structure:Structure, stack:List[str]) -> Tuple[Dict[str, MatcherNode], list]:
+    return _compile_nodes(row_tree(rows), structure, stack)
+
+def _compile_nodes(nodes:list, structure:Structure, stack:List[str]) -> Tuple[Dict[str, MatcherNode], list]:
+    children = {}
+    groups = []
+    for row, below in nodes:
+        if isinstance(row, SubstructureRow):
+            row_children, row_groups = _compile_structure(structure.schema.structures[row.value], stack)
+            for node in row_children.values():
+                node.count_min *= row.count_min
+                node.count_max = count_max_multiply(node.count_max, row.count_max)
+            if row.count_min:
+                groups.extend((tags, count_min * row.count_min) for tags, count_min in row_groups)
+        else:
+            row_children = {}
+            for tag in row.tags:
+                # Only one tag of a `[A|B]` list is used, so none of them is individually required.
+                node = MatcherNode(tag, row.count_min if len(row.tags) == 1 else 0, row.count_max)
+                node.rows.append(row)
+                node.children, node.groups = _compile_nodes(below, structure, stack)
+                row_children[tag] = node
+            if len(row.tags) > 1 and row.count_min:
+                groups.append((tuple(row.tags), row.count_min))
+        _merge_children(children, row_children, alternative=False)
+    return children, groups
+
+class Violation(object):
+
+    def __init__(self, line:int, path:str, message:str):
+        self.line = line
+        self.path = path
+        self.message = message
+
+    def __repr__(self):
+        return f"Violation<{self.line} {self.path}: {self.message}>"
+
+    def __str__(self):
+        return f"line {self.line}: {self.path}: {self.message}"
+
+class StructureMatcher(object):
+
+    def __init__(self, structure:Structure):
+        self.structure = structure
+        self.root = MatcherNode(structure.label)
+        self.root.children, self.root.groups = _compile_structure(structure, [])
+        self.root._finalise()
+
+    def match(self, lines:Iterable[tuple]) -> List[Violation]:
+        # Match a stream of (level, tag) pairs, or (level, tag, value) triples, where level 0 lines are the top rows
+        # of the structure.
+        violations = []
+        # Each open line on the stack is [node, child counts, path, line]. A node of None ignores its whole subtree,
+        # because its parent has already been reported as unknown.
+        stack = [[self.root, {}, self.root.tag, None]]
+        index = -1
+        for index, line in enumerate(lines):
+            level = line[0]
+            tag = line[1]
+            while len(stack) > level + 1:
+                self._close(stack.pop(), index, violations)
+            parent, counts, path, _ = stack[-1]
+            if len(stack) < level + 1:
+                violations.append(Violation(index, path, f"The level {level} skips a level."))
+                while len(stack) < level + 1:
+                    stack.append([None, None, path, None])
+                parent = None
+            if parent is None:
+                stack.append([None, None, path, None])
+                continue
+            path = f"{path}/{tag}"
+            node = parent.children.get(tag)
+            if node is None:
+                violations.append(Violation(index, path, "The tag is not allowed here."))
+                stack.append([None, None, path, None])
+                continue
+            count = counts[tag] = counts.get(tag, 0) + 1
+            if node.count_max is not MANY and count > node.count_max:
+                violations.append(Violation(index, path, f"The tag occurs more than {node.count_max} times."))
+            stack.append([node, {}, path, line])
+        while stack:
+            self._close(stack.pop(), index + 1, violations)
+        return violations
+
+    def _close(self, state, index:int, violations:List[Violation]) -> None:
+        node, counts, path, line = state
+        if node is None:
+            return
+        reported = len(violations)
+        for child in node.required:
+            if counts.get(child.tag, 0) < child.count_min:
+                violations.append(Violation(index, f"{path}/{child.tag}", f"The tag occurs less than {child.count_min} times."))
+        for tags, count_min in node.groups:
+            if sum(counts.get(tag, 0) for tag in tags) < count_min:
+                violations.append(Violation(index, path, f"The tags {'|'.join(tags)} occur less than {count_min} times in all."))
+        if node.variants and len(violations) == reported:
+            # Lines over the bounds of the union were reported as they were read, so they fit no variant either.
+            children = node.children
+            if any(children[tag].count_max is not MANY and count > children[tag].count_max for tag, count in counts.items()):
+                return
+            value = line[2] if line is not None and len(line) > 2 else None
+            pointer = None if value is None else (len(value) > 2 and value[0] == "@" and value[-1] == "@")
+            if not any(variant.fits(counts, pointer) for variant in node.variants):
+                violations.append(Violation(index, path, "The line and the lines below it fit none of the definitions of the tag."))
@@ -1,39 +1,59 @@
 import re
-from collections import OrderedDict
+from sys import intern
+from types import MappingProxyType
 from typing import List
 
-from .helpers import cached_property
-from .schema_element import SchemaElement
+from .helpers import cached_property, clear_cached
+from .schema_element import ContentDict, ContentList, SchemaElement
 
 regex_primitive_header = re.compile('^([A-Z0-9_:]+?):= {Size=(\d+|\d+:\d+)}$')
 regex_optionalvalue_components = re.compile('<([^>]+)>|{([^}]+)}|%([^%]+)%|([^{<%]+)')
 
 class Component(object):
+    __slots__ = ('value',)
     _tag = "Component"
     _format = "{0}"
     def __init__(self, value:str):
-        self.value = value
+        self.value = intern(value)
     def __repr__(self):
         return "{0}<{1}>".format(self._tag, self.value)
     def __str__(self):
         return self._format.format(self.value)
 class PrimitiveComponent(Component):
+    __slots__ = ()
     _tag = "Primitive"
     _format = "<{0}>"
 class StringComponent(Component):
+    __slots__ = ()
     _tag = "String"
 class TermComponent(StringComponent):
+    __slots__ = ()
     _tag = "Term"
     _format = "{{{0}}}"
 class TagComponent(StringComponent):
+    __slots__ = ()
     _tag = "Tag"
     _format = "%{0}%"
 
 class OptionalValue(object):
+    __slots__ = ('definition', 'parent', '_cached_components',
+        '_cached_has_primitives', '_cached_has_terms', '_cached_has_tags', '_cached_has_strings')
 
     def __init__(self, definition:str, parent):
         self.definition = definition
         self.parent = parent
+
+    def __setattr__(self, name, value):
+        if name == 'definition' and '_frozen' in getattr(getattr(self, 'parent', None), '__dict__', ()):
+            raise TypeError(f"{self.parent.id} belongs to a frozen schema. Use thaw() for an editable copy.")
+        super().__setattr__(name, value)
+        if name == 'definition':
+            # A new definition discards the parsed components, and the rendering of the primitive.
+            clear_cached(self, 'components', 'has_primitives', 'has_terms', 'has_tags', 'has_strings')
+            parent = getattr(self, 'parent', None)
+            if parent is not None:
+                clear_cached(parent.optional_values, 'has_primitives', 'has_terms', 'has_tags', 'has_strings')
+                parent.invalidate()
     
     def __str__(self):
         return self.definition #todo, this shortcut is cheating
@@ -45,46 +65,51 @@ class OptionalValue(object):
     @cached_property
     def has_primitives(self):
         self.components
-        return self.__dict__['has_primitives']
+        return self._cached_has_primitives
     @cached_property
     def has_terms(self):
         self.components
-        return self.__dict__['has_terms']
+        return self._cached_has_terms
     @cached_property
     def has_tags(self):
         self.components
-        return self.__dict__['has_tags']
+        return self._cached_has_tags
     @cached_property
     def has_strings(self):
         self.components
-        return self.__dict__['has_strings']
+        return self._cached_has_strings
 
     @cached_property
     def components(self):
-        self.__dict__.update({key: False for key in ('has_primitives', 'has_terms', 'has_tags', 'has_strings')})
+        has_primitives = has_terms = has_tags = has_strings = False
         components = []
         for primitive, term, tag, string in regex_optionalvalue_components.findall(self.definition):
             if primitive:
                 components.append(PrimitiveComponent(primitive))
-                self.__dict__['has_primitives'] = True
+                has_primitives = True
             elif term:
                 components.append(TermComponent(term))
-                self.__dict__['has_terms'] = True
+                has_terms = True
             elif tag:
                 components.append(TagComponent(tag))
-                self.__dict__['has_tags'] = True
+                has_tags = True
             elif string:
                 components.append(StringComponent(string))
-                self.__dict__['has_strings'] = True
+                has_strings = True
             else:
                 # Should not have made it to this point.
                 raise ValueError("The definition string for the option was malformed.")
+        self._cached_has_primitives = has_primitives
+        self._cached_has_terms = has_terms
+        self._cached_has_tags = has_tags
+        self._cached_has_strings = has_strings
         return components
 
 DEFAULT_OPTIONS_DEFINITION = "<TEXT>"
 
-class OptionalValues(list):
-    
+class _OptionalValuesSummary(object):
+    __slots__ = ()
+
     @cached_property
     def has_primitives(self):
         return any(ov.has_primitives for ov in self)
@@ -98,18 +123,29 @@ class OptionalValues(list):
     def has_strings(self):
         return any(ov.has_strings for ov in self)
 
+class OptionalValues(_OptionalValuesSummary, ContentList):
+    __slots__ = ('_cached_has_primitives', '_cached_has_terms', '_cached_has_tags', '_cached_has_strings')
+
+    def _edited(self) -> None:
+        clear_cached(self, 'has_primitives', 'has_terms', 'has_tags', 'has_strings')
+        super()._edited()
+
+class FrozenOptionalValues(_OptionalValuesSummary, tuple):
+    # The optional values of a frozen Primitive. A tuple cannot have slots, so the summaries are cached in __dict__.
+    pass
+
 class Primitive(SchemaElement):
 
     def __init__(self, *, label:str, size_min:str, size_max:str=None, **kwargs):
         super().__init__(**kwargs)
-        self.label = label
+        self.label = intern(label)
         self.size_min = int(size_min)
         self.size_max = int(size_max) if size_max else self.size_min
         self.description = ""
+        # The terms, once a `Where:` line is found, and the optional values, report edits in place to the Primitive.
         self.terms = None
         # Create the default optional values definition, which may be overriden later.
-        self.optional_values = OptionalValues()
-        self.optional_values.append(OptionalValue(DEFAULT_OPTIONS_DEFINITION, self))
+        self.optional_values = OptionalValues((OptionalValue(DEFAULT_OPTIONS_DEFINITION, self),), self)
     
     @property
     def id(self) -> str:
@@ -125,16 +161,14 @@ class Primitive(SchemaElement):
         return cls(label=match[1], size_min=size_min, size_max=size_max, schema=schema)
 
     def append_line_definition(self, line:str) -> None:
+        self.invalidate()
         if line.startswith("["):
             # The line is optional values. Override the existing.
-            self.optional_values = OptionalValues()
             line_stripped = line[1:-1] # Safer than using strip("[]"), which can remove required brackets, eg [BC].
-            for option_definition in line_stripped.split("|"):
-                optional_value = OptionalValue(option_definition, self)
-                self.optional_values.append(optional_value)
+            self.optional_values = OptionalValues((OptionalValue(option_definition, self) for option_definition in line_stripped.split("|")), self)
         elif line == "Where:":
             # The line is the beginning of a term definition.
-            self.terms = OrderedDict()
+            self.terms = ContentDict(element=self)
         elif self.terms != None:
             # The line must be an additional term definition.
             key, val = line.partition(" = ")[::2]
@@ -147,22 +181,40 @@ class Primitive(SchemaElement):
     def __repr__(self):
         return str(self.__dict__)
 
-    @property
-    def txt_definition(self):
+    def __getstate__(self):
+        # A copy of a frozen Primitive is editable.
+        state = super().__getstate__()
+        if '_frozen' in self.__dict__:
+            state['optional_values'] = OptionalValues(self.optional_values, self)
+            if self.terms is not None:
+                state['terms'] = ContentDict(self.terms, self)
+        return state
+
+    def _freeze(self) -> None:
+        for optional_value in self.optional_values:
+            optional_value.components
+        optional_values = FrozenOptionalValues(self.optional_values)
+        optional_values.has_primitives, optional_values.has_terms, optional_values.has_tags, optional_values.has_strings
+        self.__dict__['optional_values'] = optional_values
+        if self.terms is not None:
+            self.__dict__['terms'] = MappingProxyType(self.terms)
+        super()._freeze()
+
+    def _render_txt_definition(self) -> str:
         # Create the header line, including the label and size.
         if self.size_max != self.size_min:
-            definition_text = f"{self.label}:= {{Size={self.size_min}:{self.size_max}}}"
+            lines = [f"{self.label}:= {{Size={self.size_min}:{self.size_max}}}"]
         else:
-            definition_text = f"{self.label}:= {{Size={self.size_min}}}"
+            lines = [f"{self.label}:= {{Size={self.size_min}}}"]
         # Optionally add the optional_value line.
         option_text = "|".join(str(o) for o in self.optional_values)
         if option_text != DEFAULT_OPTIONS_DEFINITION:
-            definition_text += "\n[" + option_text + "]"
+            lines.append(f"[{option_text}]")
         # Optionally add the description line(s).
         if self.description:
-            definition_text += "\n" + self.description
+            lines.append(self.description)
         # Optionally add the terms lines.
         if self.terms:
-            definition_text += "\nWhere:\n"
-            definition_text += "\n".join(f"{k} = {v}" for k,v in self.terms.items())
-        return definition_text
+            lines.append("Where:")
+            lines.extend(f"{k} = {v}" for k,v in self.terms.items())
+        return "\n".join(lines)
@@ -0,0 +1,229 @@
+import re
+from functools import lru_cache
+from typing import Dict, Tuple
+
+from .structure import NewRecordWithValueRow, PointerValueRow, PrimitiveValueRow, Row, RowWithTags, SubstructureRow, row_tree
+
+# Path queries over the rows of the Structures, such as `INDIVIDUAL_RECORD/BIRT/DATE` or `FAM_RECORD/CHIL`.
+#
+# A path starts with the label of a Structure, or `*` for every Structure, and continues with one step per level:
+#   TAG          The rows with the tag, including those of the substructures included at that level.
+#   [TAG|TAG]    The rows with any of the tags.
+#   *            Every row.
+#   **           Any number of levels, including none, so `FAM_RECORD/**/DATE` finds a DATE at any depth.
+#   <<LABEL>>    The rows of the substructure included at that level, and no others.
+# A path never names the top row of a Structure that is a single tag row, such as a record: after the Structure at
+# the start of the path, or a `<<LABEL>>` step, it continues from the rows below that row, so `FAM_RECORD/CHIL` and
+# `LINEAGE_LINKED_GEDCOM/<<HEADER>>/SOUR` both skip the top row. The top rows of any other Structure are named.
+# A TAG step does name the top rows of the substructures it looks into, as they are lines at that level.
+#
+# A path is compiled once into a plan of steps. The rows below each row, by tag, are built on first use and kept by
+# the index of the schema, which is discarded when the structures change, along with the results of every query.
+
+_regex_step = re.compile(r'(\*\*|\*|<<([A-Za-z0-9_:]+)>>|\[([A-Za-z0-9_]+(?:\|[A-Za-z0-9_]+)*)\]|([A-Za-z0-9_]+))\Z')
+
+class PathMatch(object):
+    __slots__ = ('path', 'row', 'level')
+
+    def __init__(self, path:str, row:Row, level:int):
+        self.path = path
+        self.row = row
+        # The level of the row, where the first row of the Structure at the start of the path is at level 0.
+        self.level = level
+
+    def __repr__(self):
+        return f"PathMatch<{self.path}: `{self.row.txt_definition}`>"
+
+    @property
+    def structure(self) -> str:
+        # The label of the Structure that defines the row.
+        return self.row._structure.label
+
+    @property
+    def tags(self) -> Tuple[str]:
+        return self.row.tags
+
+    @property
+    def count_min(self) -> int:
+        return self.row.count_min
+
+    @property
+    def count_max(self):
+        return self.row.count_max
+
+    @property
+    def primitive(self) -> str:
+        # The label of the Primitive of the row's value, or None.
+        if isinstance(self.row, (PrimitiveValueRow, NewRecordWithValueRow)):
+            return self.row.primitive
+        return None
+
+    @property
+    def pointer(self) -> str:
+        # The xref that the row's value points to, such as `XREF:INDI`, or None.
+        if isinstance(self.row, PointerValueRow):
+            return self.row.pointer
+        return None
+
+class PathScope(object):
+    # The rows at one level of a Structure, which a path step chooses among.
+    __slots__ = ('index', 'structure', 'nodes', '_children')
+
+    def __init__(self, index:'PathIndex', structure:str, nodes:list):
+        self.index = index
+        self.structure = structure
+        # The (row, rows below it) pairs at this level.
+        self.nodes = nodes
+        self._children = None
+
+    def __repr__(self):
+        return f"PathScope<{self.structure}, {len(self.nodes)} rows>"
+
+    def children(self, including:Tuple[str]=()) -> Dict[str, list]:
+        # The (row, scope of the rows below it) pairs by tag, including the rows of the included substructures, which
+        # are also listed by `<<LABEL>>`. A Structure that includes itself is not followed back into.
+        children = self._children
+        if children is not None:
+            return children
+        children = {}
+        including = including + (self.structure,)
+        for row, nodes in self.nodes:
+            if isinstance(row, SubstructureRow):
+                children.setdefault(f"<<{row.value}>>", []).append(row.value)
+                if row.value in including or row.value not in self.index.schema.structures:
+                    continue
+                for key, entries in self.index.contents(row.value).children(including).items():
+                    children.setdefault(key, []).extend(entries)
+            elif isinstance(row, RowWithTags):
+                scope = PathScope(self.index, self.structure, nodes)
+                for tag in row.tags:
+                    children.setdefault(tag, []).append((row, scope))
+        if len(including) == 1:
+            # Only a complete map is kept, as one built while inside a cycle leaves out the structures that enclose it.
+            self._children = children
+        return children
+
+class PathIndex(object):
+    # The scopes of each Structure, built on first use.
+
+    def __init__(self, schema):
+        self.schema = schema
+        self._contents:Dict[str, PathScope] = {}
+        self._starts:Dict[str, Tuple[PathScope, int]] = {}
+
+    def contents(self, label:str) -> PathScope:
+        # The top rows of every definition of the Structure.
+        scope = self._contents.get(label)
+        if scope is None:
+            nodes = []
+            for rows in self.schema.structures[label].definitions:
+                nodes.extend(row_tree(rows))
+            scope = self._contents[label] = PathScope(self, label, nodes)
+        return scope
+
+    def start(self, label:str) -> Tuple[PathScope, int]:
+        # The scope that a path starting at the Structure continues from, and how many levels below the start it is.
+        start = self._starts.get(label)
+        if start is None:
+            contents = self.contents(label)
+            if contents.nodes and all(isinstance(row, RowWithTags) for row, _ in contents.nodes) and \
+                    all(len(row_tree(rows)) == 1 for rows in self.schema.structures[label].definitions):
+                nodes = [node for _, below in contents.nodes for node in below]
+                start = (PathScope(self, label, nodes), 1)
+            else:
+                start = (contents, 0)
+            self._starts[label] = start
+        return start
+
+class PathQuery(object):
+    __slots__ = ('path', 'root', 'steps')
+
+    def __init__(self, path:str, root:str, steps:Tuple[Tuple[str, object]]):
+        self.path = path
+        self.root = root
+        self.steps = steps
+
+    def __repr__(self):
+        return f"PathQuery<{self.path}>"
+
+    def evaluate(self, index:PathIndex) -> Tuple[PathMatch]:
+        # Positions are (scope, level of its rows, path so far, row that was matched last).
+        labels = list(index.schema.structures) if self.root == "*" else [self.root]
+        positions = []
+        for label in labels:
+            scope, level = index.start(label)
+            positions.append((scope, level, label, None))
+        for kind, value in self.steps:
+            if kind == 'descendants':
+                positions = self._descendants(positions)
+                continue
+            next_positions = []
+            for scope, level, path, _ in positions:
+                children = scope.children()
+                if kind == 'structure':
+                    # An included Structure continues as at the start of a path, from the level it is included at.
+                    for label in children.get(f"<<{value}>>", ()):
+                        if label in index.schema.structures:
+                            scope, below = index.start(label)
+                            next_positions.append((scope, level + below, f"{path}/<<{label}>>", None))
+                    continue
+                tags = [key for key in children if not key.startswith("<<")] if kind == 'any' else value
+                for tag in tags:
+                    for row, below in children.get(tag, ()):
+                        next_positions.append((below, level + 1, f"{path}/{tag}", (row, level)))
+            positions = next_positions
+        matches = {}
+        for _, _, path, matched in positions:
+            if matched is not None:
+                row, level = matched
+                matches.setdefault((path, id(row)), PathMatch(path, row, level))
+        return tuple(matches.values())
+
+    @staticmethod
+    def _descendants(positions:list) -> list:
+        # Every position reachable through any number of rows. Each scope is visited once, so that a Structure that
+        # includes itself ends the search.
+        found = []
+        seen = set()
+        pending = list(reversed(positions))
+        while pending:
+            position = pending.pop()
+            if id(position[0]) in seen:
+                continue
+            seen.add(id(position[0]))
+            found.append(position)
+            scope, level, path, _ = position
+            for tag, entries in reversed(list(scope.children().items())):
+                if tag.startswith("<<"):
+                    continue
+                for row, below in reversed(entries):
+                    pending.append((below, level + 1, f"{path}/{tag}", (row, level)))
+        return found
+
+@lru_cache(maxsize=1024)
+def compile_path(path:str) -> PathQuery:
+    parts = path.strip("/").split("/")
+    if len(parts) < 2:
+        raise ValueError(f"The path `{path}` must have a Structure and at least one step.")
+    root = parts[0]
+    if root != "*" and not re.fullmatch(r'[A-Za-z0-9_:]+', root):
+        raise ValueError(f"The path `{path}` does not start with the label of a Structure.")
+    steps = []
+    for part in parts[1:]:
+        step_match = _regex_step.match(part)
+        if not step_match:
+            raise ValueError(f"The step `{part}` of the path `{path}` is not understood.")
+        if part == "**":
+            steps.append(('descendants', None))
+        elif part == "*":
+            steps.append(('any', None))
+        elif step_match[2]:
+            steps.append(('structure', step_match[2]))
+        else:
+            steps.append(('tags', tuple((step_match[3] or step_match[4]).split("|"))))
+    if steps[-1][0] == 'descendants':
+        # A path that ends in `**` finds every row below.
+        steps.append(('any', None))
+    if steps[-1][0] == 'structure':
+        raise ValueError(f"The path `{path}` must end with a step that matches rows.")
+    return PathQuery(path, root, tuple(steps))
@@ -0,0 +1,109 @@
+import mmap
+import re
+from typing import Iterator, List
+
+from .tag import Tag
+
+regex_gedcom_line = re.compile(r'\s*(\d+) +(?:(@[^@]+@) +)?([^ ]+)(?: (.*))?')
+
+CONTINUATION_TAGS = ("CONT", "CONC")
+
+class GedcomLine(object):
+    __slots__ = ('number', 'level', 'xref', 'tag', 'value', 'definition')
+
+    def __init__(self, number:int, level:int, xref:str, tag:str, value:str, definition:Tag=None):
+        self.number = number
+        self.level = level
+        self.xref = xref
+        self.tag = tag
+        self.value = value
+        # The Tag from the schema, or None for a tag the schema does not define, such as a custom `_TAG`.
+        self.definition = definition
+
+    def __repr__(self):
+        return f"GedcomLine<{self.number}: {' '.join(str(s) for s in (self.level, self.xref, self.tag, self.value) if s is not None)}>"
+
+class GedcomRecord(object):
+    __slots__ = ('lines',)
+
+    def __init__(self, lines:List[GedcomLine]):
+        self.lines = lines
+
+    def __repr__(self):
+        return f"GedcomRecord<{self.xref or ''} {self.tag}, {len(self.lines)} lines>"
+
+    @property
+    def xref(self) -> str:
+        return self.lines[0].xref
+
+    @property
+    def tag(self) -> str:
+        return self.lines[0].tag
+
+class GedcomReader(object):
+    # Reads GEDCOM data files one record (a level 0 line and the lines below it) at a time, so that memory use
+    # depends on the largest record rather than on the size of the file.
+
+    def __init__(self, schema, encoding:str="utf-8", join_continuations:bool=True):
+        self.schema = schema
+        self.encoding = encoding
+        self.join_continuations = join_continuations
+
+    def read_records(self, filepath:str) -> Iterator[GedcomRecord]:
+        lines = []
+        for line in self.read_lines(filepath):
+            if line.level == 0 and lines:
+                yield GedcomRecord(lines)
+                lines = []
+            lines.append(line)
+        if lines:
+            yield GedcomRecord(lines)
+
+    def read_lines(self, filepath:str) -> Iterator[GedcomLine]:
+        tags = self.schema.tags
+        encoding = self.encoding
+        join_continuations = self.join_continuations
+        match = regex_gedcom_line.match
+        # The most recent line at each level, which continuation lines one level below are joined onto.
+        parents:List[GedcomLine] = []
+        # A continuation line may be joined onto any open ancestor, so when joining, the lines of a record are only
+        # released once the next record starts.
+        pending:List[GedcomLine] = []
+        with open(filepath, 'rb') as file_reader:
+            try:
+                data = mmap.mmap(file_reader.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                return # An empty file cannot be mapped, and has no records.
+            with data:
+                if data[:3] == b"\xef\xbb\xbf":
+                    data.seek(3)
+                number = 0
+                for raw in iter(data.readline, b""):
+                    number += 1
+                    line_text = raw.decode(encoding).rstrip("\r\n")
+                    if not line_text:
+                        continue
+                    line_match = match(line_text)
+                    if not line_match:
+                        raise ValueError(f"Line {number} of {filepath} is not a properly formed GEDCOM line.")
+                    level = int(line_match[1])
+                    tag = line_match[3]
+                    value = line_match[4]
+                    if join_continuations and tag in CONTINUATION_TAGS and 0 < level <= len(parents):
+                        parent = parents[level - 1]
+                        if tag == "CONT":
+                            parent.value = f"{parent.value or ''}\n{value or ''}"
+                        else:
+                            parent.value = f"{parent.value or ''}{value or ''}"
+                        continue
+                    line = GedcomLine(number, level, line_match[2], tag, value, tags.get(tag))
+                    del parents[level:]
+                    parents.append(line)
+                    if not join_continuations:
+                        yield line
+                        continue
+                    if level == 0 and pending:
+                        yield from pending
+                        pending = []
+                    pending.append(line)
+        yield from pending
@@ -0,0 +1,159 @@
+import asyncio
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, List, Tuple
+
+from .helpers import content_hash
+from .snapshot import hash_file
+
+# A registry of built schemas, for a service that serves several GEDCOM dialects. Schemas are keyed by the content of
+# their definition files, in order, and a version, so file sets with the same content share one schema wherever they
+# live. The most recently used schemas are kept, up to a number of schemas and optionally an estimate of their size,
+# and a schema that several threads or tasks ask for at once is only built once.
+
+class RegistryStats(object):
+    __slots__ = ('hits', 'misses', 'builds', 'failures', 'evictions', 'schemas', 'size')
+
+    def __init__(self, hits:int=0, misses:int=0, builds:int=0, failures:int=0, evictions:int=0, schemas:int=0, size:int=0):
+        self.hits = hits
+        self.misses = misses
+        # Misses that built the schema, rather than waiting for another build of it.
+        self.builds = builds
+        self.failures = failures
+        self.evictions = evictions
+        self.schemas = schemas
+        self.size = size
+
+    def __repr__(self):
+        return (f"RegistryStats<{self.hits} hits, {self.misses} misses, {self.builds} builds, {self.failures} failures, "
+            f"{self.evictions} evictions, {self.schemas} schemas, {self.size} bytes>")
+
+    @property
+    def hit_rate(self) -> float:
+        requests = self.hits + self.misses
+        return self.hits / requests if requests else 0.0
+
+class SchemaRegistry(object):
+
+    def __init__(self, max_schemas:int=16, max_size:int=None, freeze:bool=True, cache_dir:str=None, **load_options):
+        # With a maximum size, each schema's size is estimated from its pickled length when it is built, and the
+        # least recently used schemas are evicted to keep within it. The most recently built schema is always kept.
+        # Schemas are frozen, so that they can be shared between threads, unless freeze is False.
+        # With a cache directory, each schema is also kept there as a snapshot, for the next process to load.
+        # Snapshots are pickles, which run code as they are loaded, so the directory must only be writable by trusted users.
+        # Any other options are passed on to Schema.generate_from_files.
+        if max_schemas < 1:
+            raise ValueError("The registry must be able to hold at least one schema.")
+        self.max_schemas = max_schemas
+        self.max_size = max_size
+        self.freeze = freeze
+        self.cache_dir = cache_dir
+        self.load_options = load_options
+        self._schemas:Dict[str, Tuple[object, int]] = OrderedDict()
+        self._building:Dict[str, Future] = {}
+        # The content hash of each file, while its modification time and size are unchanged.
+        self._file_hashes:Dict[str, Tuple[Tuple[int, int], str]] = {}
+        self._lock = threading.Lock()
+        self._stats = RegistryStats()
+
+    def __repr__(self):
+        return f"SchemaRegistry<{len(self._schemas)} of {self.max_schemas} schemas>"
+
+    def __len__(self):
+        return len(self._schemas)
+
+    def __contains__(self, key:str) -> bool:
+        return key in self._schemas
+
+    def _file_hash(self, filepath:str) -> str:
+        stat = os.stat(filepath)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._file_hashes.get(filepath)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        digest = hash_file(filepath)
+        self._file_hashes[filepath] = (signature, digest)
+        return digest
+
+    def key(self, file_paths:List[str], version:str=None) -> str:
+        # The key of a file set, from the content of its files. Files are only hashed again once they have changed.
+        digests = [self._file_hash(filepath) for filepath in file_paths]
+        return content_hash(f"{version}:{':'.join(digests)}")
+
+    def get(self, file_paths:List[str], version:str=None):
+        # The schema of the files, which is built if it is not held. Callers that ask for a schema that is being built
+        # wait for that build, and get its schema or its exception.
+        key = self.key(file_paths, version)
+        with self._lock:
+            entry = self._schemas.get(key)
+            if entry is not None:
+                self._schemas.move_to_end(key)
+                self._stats.hits += 1
+                return entry[0]
+            self._stats.misses += 1
+            future = self._building.get(key)
+            building = future is None
+            if building:
+                future = self._building[key] = Future()
+                self._stats.builds += 1
+        if not building:
+            return future.result()
+        try:
+            schema, size = self._build(key, file_paths)
+        except BaseException as error:
+            with self._lock:
+                del self._building[key]
+                self._stats.failures += 1
+            future.set_exception(error)
+            raise
+        with self._lock:
+            del self._building[key]
+            self._schemas[key] = (schema, size)
+            self._stats.size += size
+            self._evict()
+        future.set_result(schema)
+        return schema
+
+    async def get_async(self, file_paths:List[str], version:str=None):
+        # As get, without blocking the event loop. Tasks and threads that ask for the same schema share one build.
+        return await asyncio.get_running_loop().run_in_executor(None, self.get, file_paths, version)
+
+    def _build(self, key:str, file_paths:List[str]) -> Tuple[object, int]:
+        from .schema import Schema
+        cache_path = os.path.join(self.cache_dir, f"{key}.snapshot") if self.cache_dir else None
+        if cache_path:
+            os.makedirs(self.cache_dir, exist_ok=True)
+        schema = Schema.generate_from_files(list(file_paths), cache_path=cache_path, **self.load_options)
+        if self.freeze:
+            schema = schema.freeze()
+        size = len(pickle.dumps(schema, pickle.HIGHEST_PROTOCOL)) if self.max_size is not None else 0
+        return schema, size
+
+    def _evict(self) -> None:
+        # Called with the lock held, after a schema was added at the most recently used end.
+        while len(self._schemas) > 1 and (
+                len(self._schemas) > self.max_schemas or (self.max_size is not None and self._stats.size > self.max_size)):
+            _, (schema, size) = self._schemas.popitem(last=False)
+            self._stats.size -= size
+            self._stats.evictions += 1
+
+    def discard(self, key:str) -> None:
+        with self._lock:
+            entry = self._schemas.pop(key, None)
+            if entry is not None:
+                self._stats.size -= entry[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._schemas.clear()
+            self._stats.size = 0
+
+    @property
+    def stats(self) -> RegistryStats:
+        # A copy of the counters, which later requests do not change.
+        with self._lock:
+            stats = self._stats
+            return RegistryStats(stats.hits, stats.misses, stats.builds, stats.failures, stats.evictions, len(self._schemas), stats.size)
@@ -1,9 +1,126 @@
+import pickle
 from collections import OrderedDict
-from typing import List, Dict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from threading import RLock
+from types import ModuleType
+from time import perf_counter
+from typing import Iterator, List, Dict, TextIO, Tuple, Union
 
+from .cardinality import CardinalityChecker
+from .codegen import load_record_module
+from .diff import SchemaDiff, diff_schemas
+from .enumeration import EnumerationIndex
+from .graph import SchemaGraph
+from .helpers import gc_paused
+from .index import SchemaIndex
+from .instrumentation import LoadObserver, LoadProfile
+from .lexer import DefinitionError, Diagnostic, build_elements, sort_diagnostics, tokenize
+from .lazy import LazyElementMixin, LazySource, is_unparsed, unwrap
+from .matcher import StructureMatcher
 from .primitive import Primitive
+from .query import PathIndex, PathMatch, compile_path
+from .snapshot import hash_file, load_snapshot, save_snapshot
+from .sources import ELEMENT_TYPES, ChangeSet, FileSource
 from .structure import Structure
 from .tag import Tag
+from .template import StructureTemplate
+from .validator import PrimitiveValidator
+
+# The element types that each derived object is built from, so that a change only discards what it affects.
+_derived_dependencies = {
+    'cardinality_checkers': ('structures',),
+    # Updated one primitive at a time, rather than discarded.
+    'enumerations': (),
+    'graph': ELEMENT_TYPES,
+    'index': ('structures',),
+    'matchers': ('structures',),
+    'path_index': ('structures',),
+    'primitive_patterns': ('primitives',),
+    'queries': ('structures',),
+    'record_classes': ('structures',),
+    'templates': ('structures', 'primitives'),
+    'validators': ('primitives',),
+}
+
+class ElementDict(OrderedDict):
+    # An ordered mapping of ids to elements, which invalidates the derived objects of its schema when it changes.
+
+    def __init__(self, schema=None, element_type:str=None):
+        super().__init__()
+        self._schema = schema
+        self._element_type = element_type
+
+    def _changed(self, key=None):
+        # The schema may not be attached or restored yet while unpickling or copying the items.
+        schema = getattr(self, '_schema', None)
+        if schema is not None and getattr(schema, '_derived', None):
+            schema.invalidate(self._element_type)
+            schema._elements_changed(self._element_type, key)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._changed(key)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._changed(key)
+
+    def pop(self, key, *args):
+        value = super().pop(key, *args)
+        self._changed(key)
+        return value
+
+    def popitem(self, last=True):
+        item = super().popitem(last)
+        self._changed(item[0])
+        return item
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+class FrozenElementDict(ElementDict):
+    # The elements of a frozen schema, which cannot be added, replaced, or removed.
+
+    def _frozen(self, *args, **kwargs):
+        raise TypeError("The schema is frozen. Use thaw() for an editable copy.")
+
+    __setitem__ = __delitem__ = pop = popitem = clear = update = setdefault = move_to_end = _frozen
+
+    def __reduce__(self):
+        # A copy of a frozen schema is editable.
+        return (ElementDict, (), self.__dict__.copy(), None, iter(OrderedDict.items(self)))
+
+_element_classes = {
+    'structures': Structure,
+    'primitives': Primitive,
+    'tags': Tag,
+}
+
+class LazyElementDict(LazyElementMixin, ElementDict):
+    # An ElementDict whose elements may not have been parsed yet, which parses each one when it is first looked up.
+    pass
+
+_executor_classes = {
+    'thread': ThreadPoolExecutor,
+    'process': ProcessPoolExecutor,
+}
+
+def _parse_file_definition(filepath:str, pause_gc:bool=False) -> 'Schema':
+    # Parse a single file into a schema of its own, to be merged into the loading schema. This is a module level
+    # function so that process pools can pickle it.
+    schema = Schema()
+    with gc_paused(pause_gc):
+        schema.append_file_definition(filepath)
+    return schema
+
+def _parse_file_definition_profiled(filepath:str, pause_gc:bool=False) -> Tuple['Schema', LoadProfile]:
+    # As above, but also returning the profile of the load, as an observer cannot be shared with another process.
+    schema = Schema()
+    profile = LoadProfile()
+    with gc_paused(pause_gc):
+        schema.append_file_definition(filepath, profile)
+    return schema, profile
 
 class Schema(object):
 
@@ -12,38 +129,460 @@ class Schema(object):
         return cls.generate_from_files([file_path])
 
     @classmethod
-    def generate_from_files(cls, file_paths:List[str]) -> 'Schema':
+    def generate_from_files(cls, file_paths:List[str], cache_path:str=None, parallel:str=None, max_workers:int=None,
+            observer:LoadObserver=None, lazy:bool=False, check_references:bool=False, pause_gc:bool=False) -> 'Schema':
+        # When a cache path is given, a binary snapshot keyed by the content of the files is used if it is fresh,
+        # and is otherwise (re)written after parsing the text definitions.
+        # Pausing the garbage collector while the schema is built makes a large load faster, but the collector is
+        # process wide, so it is paused for every other thread too.
+        # An observer, such as a LoadProfile, is told how long each phase of the load took and how much it read.
+        # When lazy, each element is only parsed when it is first looked up.
+        # When checking references, a ValueError is raised if any are dangling or cyclic, once the files are loaded.
+        if lazy:
+            if cache_path or parallel:
+                raise ValueError("Lazy loading cannot be combined with a snapshot cache or parallel loading.")
+            if check_references:
+                raise ValueError("Lazy loading cannot be combined with checking references, which parses every element.")
+            schema = cls()
+            for file_path in file_paths:
+                schema.append_file_definition_lazily(file_path, observer)
+            return schema
+        if cache_path:
+            started = perf_counter()
+            source_hashes = [hash_file(file_path) for file_path in file_paths]
+            schema = load_snapshot(cache_path, file_paths, source_hashes, pause_gc)
+            if observer is not None:
+                observer.phase('snapshot.load', perf_counter() - started)
+            if schema is not None:
+                if check_references:
+                    schema.check_references(observer)
+                return schema
         schema = cls()
-        for file_path in file_paths:
-            schema.append_file_definition(file_path)
+        with gc_paused(pause_gc):
+            if parallel:
+                schema.append_file_definitions(file_paths, parallel, max_workers, observer, pause_gc)
+            else:
+                # Every file is read, so that the errors of all of them are raised together.
+                diagnostics = []
+                for file_path in file_paths:
+                    try:
+                        schema.append_file_definition(file_path, observer)
+                    except DefinitionError as error:
+                        diagnostics.extend(error.diagnostics)
+                if diagnostics:
+                    raise DefinitionError(diagnostics)
+        if cache_path:
+            # The sources reuse the hashes that keyed the snapshot, rather than reading the files again.
+            for source, digest in zip(schema._sources, source_hashes):
+                source.digest = digest
+            started = perf_counter()
+            try:
+                schema.save_snapshot(cache_path, source_hashes)
+            except OSError:
+                pass # The cache is only an optimisation, so an unwritable location is not an error.
+            if observer is not None:
+                observer.phase('snapshot.save', perf_counter() - started)
+        if check_references:
+            schema.check_references(observer)
         return schema
+
+    @classmethod
+    def load_snapshot(cls, snapshot_path:str, file_paths:List[str]=None, pause_gc:bool=False) -> 'Schema':
+        # Snapshots are pickles, so only load one from a location that untrusted users cannot write to.
+        schema = load_snapshot(snapshot_path, file_paths, pause_gc=pause_gc)
+        if schema is None:
+            raise ValueError("The snapshot is missing, stale, or was written by an incompatible version.")
+        return schema
+
+    def save_snapshot(self, snapshot_path:str, source_hashes:List[str]=None) -> None:
+        save_snapshot(self, snapshot_path, source_hashes)
     
     def __init__(self):
         self.filepaths:List[str] = []
-        self.structures:Dict[str, Structure] = OrderedDict()
-        self.primitives:Dict[str, Primitive] = OrderedDict()
-        self.tags:Dict[str, Tag] = OrderedDict()
-    
-    def append_file_definition(self, filepath) -> None:
+        self.structures:Dict[str, Structure] = ElementDict(self, 'structures')
+        self.primitives:Dict[str, Primitive] = ElementDict(self, 'primitives')
+        self.tags:Dict[str, Tag] = ElementDict(self, 'tags')
+        # The elements that each file defined, so that changed files can be reloaded on their own.
+        self._sources:List[FileSource] = []
+        # Compiled objects derived from the elements, which are rebuilt on demand rather than stored. They are built
+        # under the lock, so that threads sharing the schema build each of them once.
+        self._derived = {}
+        self._lock = RLock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_derived'] = {}
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = RLock()
+
+    def _derived_object(self, name:str, build):
+        derived = self._derived.get(name)
+        if derived is None:
+            with self._lock:
+                derived = self._derived.get(name)
+                if derived is None:
+                    derived = self._derived[name] = build()
+        return derived
+
+    def _derived_item(self, name:str, key:str, build):
+        # One of the derived objects that are built per element or per query, such as the matcher of a Structure.
+        derived = self._derived.get(name)
+        item = derived.get(key) if derived is not None else None
+        if item is None:
+            with self._lock:
+                derived = self._derived.setdefault(name, {})
+                item = derived.get(key)
+                if item is None:
+                    item = derived[key] = build()
+        return item
+
+    @property
+    def frozen(self) -> bool:
+        return isinstance(self.tags, FrozenElementDict)
+
+    def _check_not_frozen(self) -> None:
+        if self.frozen:
+            raise TypeError("The schema is frozen. Use thaw() for an editable copy.")
+
+    def freeze(self, pause_gc:bool=False) -> 'Schema':
+        # An immutable copy of the schema, which threads can share. Its elements never change, and the index, graph,
+        # enumerations and validators are built up front. The derived objects built per Structure or per query, such
+        # as matchers, templates and path queries, are still built on first use, under the schema's lock, so that each
+        # is built once. The caches inside the graph and the path index are filled by assigning complete values, so
+        # that a race between threads at most computes one of them twice.
+        # Editing the copy, including its rows, terms and optional values, raises a TypeError, and thaw() returns an
+        # editable copy of it in turn.
+        with gc_paused(pause_gc):
+            schema = pickle.loads(pickle.dumps(self, pickle.HIGHEST_PROTOCOL))
+            for element_type in ELEMENT_TYPES:
+                elements = getattr(schema, element_type)
+                frozen_elements = FrozenElementDict(schema, element_type)
+                for element_id, element in elements.items():
+                    element._freeze()
+                    OrderedDict.__setitem__(frozen_elements, element_id, element)
+                setattr(schema, element_type, frozen_elements)
+            schema.filepaths = tuple(schema.filepaths)
+            schema._sources = tuple(schema._sources)
+            schema.index
+            schema.graph
+            schema.enumerations.values_with_prefix("")
+            for label in schema.primitives:
+                schema.validator(label)
+        return schema
+
+    def thaw(self, pause_gc:bool=False) -> 'Schema':
+        # An editable copy of the schema, whether or not it is frozen. The copy is complete, made by pickling the whole
+        # schema, rather than copying elements on write, so it costs about as much as freezing.
+        with gc_paused(pause_gc):
+            schema = pickle.loads(pickle.dumps(self, pickle.HIGHEST_PROTOCOL))
+        schema.filepaths = list(schema.filepaths)
+        schema._sources = list(schema._sources)
+        return schema
+
+    def invalidate(self, *element_types:str) -> None:
+        # Discard the derived objects built from the given element types, or all of them.
+        # Adding, replacing, removing, or editing elements does this automatically.
+        if not self._derived:
+            return
+        if not element_types:
+            self._derived.clear()
+            return
+        for name in list(self._derived):
+            if any(element_type in _derived_dependencies[name] for element_type in element_types):
+                del self._derived[name]
+
+    def _elements_changed(self, element_type:str, element_id:str=None) -> None:
+        # Update the derived objects that track changes one element at a time. Without an id, they are discarded.
+        enumerations = self._derived.get('enumerations')
+        if enumerations is not None and element_type == 'primitives':
+            if element_id is None:
+                del self._derived['enumerations']
+            else:
+                enumerations.mark_changed(element_id)
+
+    def _element_edited(self, element) -> None:
+        # An element was edited in place, which discards the derived objects built from its element type, as replacing
+        # it would. An element that is not part of the schema, such as one still being built, changes nothing.
+        for element_type, element_class in _element_classes.items():
+            if isinstance(element, element_class):
+                break
+        # An element that is still being made may not have an id yet.
+        element_id = getattr(element, 'id', None)
+        if element_id is None or unwrap(OrderedDict.get(getattr(self, element_type), element_id)) is not element:
+            return
+        self.invalidate(element_type)
+        self._elements_changed(element_type, element_id)
+
+    @property
+    def enumerations(self) -> EnumerationIndex:
+        return self._derived_object('enumerations', lambda: EnumerationIndex(self))
+
+    @property
+    def graph(self) -> SchemaGraph:
+        return self._derived_object('graph', lambda: SchemaGraph(self))
+
+    def check_references(self, observer:LoadObserver=None) -> None:
+        # Raise a ValueError listing every reference to an element that is not defined, and every cycle of structures
+        # that include each other or primitives that nest each other.
+        started = perf_counter()
+        graph = self.graph
+        problems = [f"{reference.source_id} refers to the undefined {reference.target_type[:-1]} {reference.target_id}" for reference in graph.dangling()]
+        problems += [f"{' -> '.join(element_id for _, element_id in cycle)} form a cycle" for cycle in graph.cycles()]
+        if observer is not None:
+            observer.phase('references.check', perf_counter() - started)
+        if problems:
+            raise ValueError("The schema has invalid references:\n  " + "\n  ".join(problems))
+
+    @property
+    def index(self) -> SchemaIndex:
+        return self._derived_object('index', lambda: SchemaIndex(self))
+
+    def matcher(self, label:str) -> StructureMatcher:
+        return self._derived_item('matchers', label, lambda: StructureMatcher(self.structures[label]))
+
+    def template(self, label:str) -> StructureTemplate:
+        return self._derived_item('templates', label, lambda: StructureTemplate(self.structures[label]))
+
+    def query(self, path:str) -> Tuple[PathMatch, ...]:
+        # The rows at a path such as `INDIVIDUAL_RECORD/BIRT/DATE`. See query.py for the syntax.
+        return self._derived_item('queries', path, lambda: compile_path(path).evaluate(
+            self._derived_object('path_index', lambda: PathIndex(self))
+        ))
+
+    def cardinality_checker(self, label:str) -> CardinalityChecker:
+        return self._derived_item('cardinality_checkers', label, lambda: CardinalityChecker(self.structures[label]))
+
+    def validator(self, label:str) -> PrimitiveValidator:
+        return self._derived_item('validators', label, lambda: PrimitiveValidator(
+            self.primitives[label], self._derived.setdefault('primitive_patterns', {})
+        ))
+
+    def record_classes(self, cache_dir:str=None) -> ModuleType:
+        # A generated module with a slotted class for each Structure, to hold GEDCOM data. With a cache directory, the
+        # module is kept on disk and imported from there while the structures are unchanged.
+        return self._derived_object('record_classes', lambda: load_record_module(self, cache_dir))
+
+    def diff(self, other:'Schema') -> SchemaDiff:
+        # The elements that other adds, removes, or changes, compared with this schema.
+        return diff_schemas(self, other)
+
+    def write_to(self, file:Union[str, TextIO], element_type:str) -> None:
+        # Write the text definitions of one element type, to a path or an open text stream, in the format they are read
+        # in. The definitions are streamed to a buffered writer rather than joined into one string first.
+        if element_type not in ELEMENT_TYPES:
+            raise ValueError(f"The element type must be one of {', '.join(ELEMENT_TYPES)}.")
+        if isinstance(file, str):
+            with open(file, 'w', buffering=1 << 16) as file_writer:
+                file_writer.writelines(self._iter_txt_definitions(element_type))
+        else:
+            file.writelines(self._iter_txt_definitions(element_type))
+
+    def _iter_txt_definitions(self, element_type:str) -> Iterator[str]:
+        separator = ""
+        for element in getattr(self, element_type).values():
+            yield separator
+            yield element.txt_definition
+            separator = "\n"
+
+    def append_file_definitions(self, filepaths:List[str], parallel:str='process', max_workers:int=None,
+            observer:LoadObserver=None, pause_gc:bool=False) -> None:
+        # Parse the files concurrently in a 'thread' or 'process' pool. The results are merged in the order of the
+        # files, so the schema is identical to appending each file in turn. Parsing holds the GIL, so a thread pool
+        # is no faster than parsing the files one after another, and only overlaps reading them from slow storage.
+        self._check_not_frozen()
+        executor_class = _executor_classes.get(parallel)
+        if executor_class is None:
+            raise ValueError(f"The parallel mode must be one of {', '.join(_executor_classes)}.")
+        with executor_class(max_workers) as executor:
+            parse = _parse_file_definition if observer is None else _parse_file_definition_profiled
+            futures = [executor.submit(parse, filepath, pause_gc) for filepath in filepaths]
+            file_schemas = []
+            diagnostics = []
+            for future in futures:
+                try:
+                    result = future.result()
+                except DefinitionError as error:
+                    diagnostics.extend(error.diagnostics)
+                    continue
+                if observer is not None:
+                    result, profile = result
+                    profile.replay(observer)
+                file_schemas.append(result)
+        if diagnostics:
+            raise DefinitionError(diagnostics)
+        for filepath, file_schema in zip(filepaths, file_schemas):
+            self.filepaths.append(filepath)
+            self._sources.extend(file_schema._sources)
+            for element_type in ELEMENT_TYPES:
+                elements = getattr(self, element_type)
+                for element_id, element in getattr(file_schema, element_type).items():
+                    element.schema = self
+                    elements[element_id] = element
+
+    def append_file_definition_lazily(self, filepath:str, observer:LoadObserver=None) -> None:
+        # Only find where each element is defined in the file. The elements are parsed when they are looked up, and
+        # iterate in the same order, and render the same text definitions, as when they are loaded eagerly.
+        self._check_not_frozen()
+        started = perf_counter()
+        for element_type in ELEMENT_TYPES:
+            elements = getattr(self, element_type)
+            if not isinstance(elements, LazyElementDict):
+                lazy_elements = LazyElementDict(self, element_type)
+                for element_id, element in OrderedDict.items(elements):
+                    OrderedDict.__setitem__(lazy_elements, element_id, element)
+                setattr(self, element_type, lazy_elements)
         self.filepaths.append(filepath)
+        defined = []
+        source = LazySource(filepath, self)
+        for lazy_element in source.scan(_element_classes):
+            getattr(self, lazy_element.element_type)[lazy_element.id] = lazy_element
+            defined.append((lazy_element.element_type, lazy_element))
+        self._sources.append(FileSource(filepath, defined))
+        if observer is not None:
+            observer.phase('index', perf_counter() - started)
+            observer.count('files')
+            for element_type, _ in defined:
+                observer.count(element_type)
+
+    def append_file_definition(self, filepath, observer:LoadObserver=None) -> None:
+        # Each line is classified once, into a token that the elements are built from. A file with errors raises a
+        # DefinitionError listing all of them, by file and line, and none of its elements are added.
+        self._check_not_frozen()
+        # Without an observer, nothing is timed, so the only cost is checking for one.
+        timings = {} if observer is not None else None
+        started = perf_counter() if timings is not None else None
         with open(filepath, 'r') as file_reader:
-            current_element = None
-            for line_raw in file_reader:
-                line_text = line_raw.rstrip("\n\r")
-                
-                # Check if the line defines a new Structure, Primitive, or Tag.
-                # Otherwise, add the line to the last defined element.
-                if ":=" not in line_text:
-                     current_element.append_line_definition(line_text)
-                     continue
-                
-                # Create the appropriate element for the line.
-                if line_text.endswith("}"):
-                    current_element = Primitive.create_from_line_definition(line_text, self)
-                    self.primitives[current_element.id] = current_element
-                elif line_text.endswith("}:="):
-                    current_element = Tag.create_from_line_definition(line_text, self)
-                    self.tags[current_element.id] = current_element
-                else:
-                    current_element = Structure.create_from_line_definition(line_text, self)
-                    self.structures[current_element.id] = current_element
+            lines = file_reader.readlines()
+        if timings is not None:
+            timings['read'] = perf_counter() - started
+            started = perf_counter()
+        diagnostics = []
+        tokens = tokenize(lines, filepath, diagnostics)
+        if timings is not None:
+            timings['tokenize'] = perf_counter() - started
+        defined = build_elements(tokens, self, filepath, diagnostics, timings)
+        if diagnostics:
+            raise DefinitionError(diagnostics)
+        self.filepaths.append(filepath)
+        for element_type, element in defined:
+            getattr(self, element_type)[element.id] = element
+        if timings is not None:
+            self._report_load(observer, timings, lines, defined)
+        self._sources.append(FileSource(filepath, defined))
+
+    @staticmethod
+    def check_files(filepaths:List[str]) -> List[Diagnostic]:
+        # Every error in the definition files, by file and line, without building a schema from them.
+        diagnostics = []
+        for filepath in filepaths:
+            with open(filepath, 'r') as file_reader:
+                lines = file_reader.readlines()
+            build_elements(tokenize(lines, filepath, diagnostics), None, filepath, diagnostics)
+        return sort_diagnostics(diagnostics)
+
+    @staticmethod
+    def _report_load(observer:LoadObserver, timings:Dict[str, float], lines:List[str], defined) -> None:
+        for name, seconds in timings.items():
+            observer.phase(name, seconds)
+        observer.count('files')
+        observer.count('lines', len(lines))
+        for element_type, element in defined:
+            observer.count(element_type)
+            if element_type == 'structures':
+                for rows in element.definitions:
+                    for row in rows:
+                        observer.count('rows.' + type(row).__name__)
+
+    def reload(self) -> ChangeSet:
+        # Re-parse only the files that changed since they were loaded, and replace only the elements that they
+        # changed. Unchanged elements keep their identity, and so their cached state, and only the derived objects
+        # built from the changed element types are discarded.
+        self._check_not_frozen()
+        changes = ChangeSet()
+        # Every changed file is parsed before any of them is applied, so that an error leaves the schema as it was,
+        # and the files are found to have changed again on the next reload.
+        parsed = []
+        diagnostics = []
+        for index, source in enumerate(self._sources):
+            state = source.changed_state()
+            if state is None:
+                continue
+            try:
+                file_source = _parse_file_definition(source.filepath)._sources[0]
+            except DefinitionError as error:
+                diagnostics.extend(error.diagnostics)
+                continue
+            file_source.stat, file_source.digest = state
+            parsed.append((index, source, file_source))
+        if diagnostics:
+            raise DefinitionError(diagnostics)
+        try:
+            for index, source, file_source in parsed:
+                changes.files.append(source.filepath)
+                self._sources[index] = file_source
+                self._replace_file_elements(source.elements, file_source, changes)
+            # Editing an element replaced it in place, but a new element has to be moved to where its file defines it.
+            for element_type in ELEMENT_TYPES:
+                if changes.added[element_type]:
+                    self._reorder_added(element_type, changes.added[element_type])
+        finally:
+            # Whatever was applied is reflected in the derived objects, even if applying the rest failed.
+            self.invalidate(*changes.element_types)
+            for element_type in changes.element_types:
+                for element_ids in (changes.added, changes.removed, changes.changed):
+                    for element_id in element_ids[element_type]:
+                        self._elements_changed(element_type, element_id)
+        return changes
+
+    def _replace_file_elements(self, old_defined, file_source:FileSource, changes:ChangeSet) -> None:
+        # Lazy elements that were never parsed cannot be compared, as their file has changed, so they are replaced.
+        old_elements = {(element_type, element.id): unwrap(element) for element_type, element in old_defined}
+        for position, (element_type, element) in enumerate(file_source.elements):
+            old_element = old_elements.get((element_type, element.id))
+            if old_element is not None and not is_unparsed(old_element) and old_element.txt_definition == element.txt_definition:
+                # Keep the existing object, whether or not another definition currently overrides it.
+                file_source.elements[position] = (element_type, old_element)
+            else:
+                element.schema = self
+        # As in a fresh load, the last file to define an id wins, so removing an overriding definition restores the
+        # one from the file before it, and a new definition only replaces one from an earlier file.
+        winners = dict.fromkeys(old_elements)
+        winners.update(dict.fromkeys((element_type, element.id) for element_type, element in file_source.elements))
+        for source in self._sources:
+            for element_type, element in source.elements:
+                key = (element_type, element.id)
+                if key in winners:
+                    winners[key] = element
+        for (element_type, element_id), winner in winners.items():
+            elements = getattr(self, element_type)
+            current = OrderedDict.get(elements, element_id)
+            if winner is None:
+                if current is not None:
+                    OrderedDict.__delitem__(elements, element_id)
+                    changes.removed[element_type].append(element_id)
+            elif current is None:
+                OrderedDict.__setitem__(elements, element_id, winner)
+                changes.added[element_type].append(element_id)
+            elif unwrap(current) is not unwrap(winner):
+                OrderedDict.__setitem__(elements, element_id, winner)
+                changes.changed[element_type].append(element_id)
+
+    def _reorder_added(self, element_type:str, added_ids:List[str]) -> None:
+        # Place each added element after the element that precedes it in the files, as a full reload would.
+        elements = getattr(self, element_type)
+        order = [
+            element.id for source in self._sources for defined_type, element in source.elements
+            if defined_type == element_type and element.id in elements
+        ]
+        added = set(added_ids)
+        keys = [key for key in elements if key not in added]
+        for previous_id, element_id in zip([None] + order, order):
+            if element_id in added:
+                added.discard(element_id)
+                keys.insert(0 if previous_id is None else keys.index(previous_id) + 1, element_id)
+        for key in keys:
+            elements.move_to_end(key)
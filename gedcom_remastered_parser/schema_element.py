@@ -1,4 +1,8 @@
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from .helpers import content_hash
 
 class SchemaElement(ABC):
 
@@ -19,7 +23,101 @@ class SchemaElement(ABC):
     def id(self) -> str:
         raise NotImplementedError
 
+    def __setattr__(self, name, value):
+        if '_frozen' in self.__dict__:
+            raise TypeError(f"{self.id} belongs to a frozen schema. Use thaw() for an editable copy.")
+        super().__setattr__(name, value)
+        self._edited()
+
+    def __getstate__(self):
+        # A copy of a frozen element is editable.
+        state = self.__dict__.copy()
+        state.pop('_frozen', None)
+        return state
+
+    def invalidate(self) -> None:
+        # Discard the cached rendering and fingerprint. Setting an attribute, or editing the rows, terms or optional
+        # values of the element in place, does this automatically.
+        if '_frozen' in self.__dict__:
+            raise TypeError(f"{self.id} belongs to a frozen schema. Use thaw() for an editable copy.")
+        self._edited()
+
+    def _edited(self) -> None:
+        # Any change to the element discards its cached rendering and fingerprint, and tells its schema, which discards
+        # the derived objects built from it. A schema that has built nothing yet, such as one being loaded, is not told.
+        state = self.__dict__
+        state.pop('_txt_definition', None)
+        state.pop('_fingerprint', None)
+        schema = state.get('schema')
+        if schema is not None and getattr(schema, '_derived', None):
+            schema._element_edited(self)
+
+    def _freeze(self) -> None:
+        # Compute everything that is otherwise cached on first use, so that a frozen element is never written to.
+        self.txt_definition
+        self.fingerprint
+        self.__dict__['_frozen'] = True
+
     @property
-    @abstractmethod
     def txt_definition(self) -> str:
+        txt_definition = self.__dict__.get('_txt_definition')
+        if txt_definition is None:
+            txt_definition = self.__dict__['_txt_definition'] = self._render_txt_definition()
+        return txt_definition
+
+    @property
+    def fingerprint(self) -> str:
+        # A hash of the content of the element, so that equal elements from different schemas compare in O(1).
+        fingerprint = self.__dict__.get('_fingerprint')
+        if fingerprint is None:
+            fingerprint = self.__dict__['_fingerprint'] = content_hash(self.txt_definition)
+        return fingerprint
+
+    @abstractmethod
+    def _render_txt_definition(self) -> str:
         raise NotImplementedError
+
+# The editable contents of an element, such as the rows of a Structure or the terms of a Primitive, which report an
+# edit in place to the element. They are made, and unpickled, with all of their items at once, which is not an edit.
+
+class ContentList(list):
+    __slots__ = ('element',)
+
+    def __init__(self, items=(), element:SchemaElement=None):
+        list.__init__(self, items)
+        self.element = element
+
+    def __reduce__(self):
+        return (type(self), (list(self), self.element))
+
+    def _edited(self) -> None:
+        if self.element is not None:
+            self.element.invalidate()
+
+class ContentDict(OrderedDict):
+
+    def __init__(self, items=(), element:SchemaElement=None):
+        OrderedDict.__init__(self)
+        for key, value in (items.items() if isinstance(items, Mapping) else items):
+            OrderedDict.__setitem__(self, key, value)
+        self.element = element
+
+    def __reduce__(self):
+        return (type(self), (list(OrderedDict.items(self)), self.element))
+
+    def _edited(self) -> None:
+        if self.element is not None:
+            self.element.invalidate()
+
+def _reporting(method):
+    def edit(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        self._edited()
+        return result
+    edit.__name__ = method.__name__
+    return edit
+
+for _name in ('__setitem__', '__delitem__', '__iadd__', '__imul__', 'append', 'extend', 'insert', 'pop', 'remove', 'clear', 'sort', 'reverse'):
+    setattr(ContentList, _name, _reporting(getattr(list, _name)))
+for _name in ('__setitem__', '__delitem__', 'pop', 'popitem', 'clear', 'update', 'setdefault', 'move_to_end'):
+    setattr(ContentDict, _name, _reporting(getattr(OrderedDict, _name)))
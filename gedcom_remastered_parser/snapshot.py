@@ -0,0 +1,68 @@
+import hashlib
+import io
+import os
+import pickle
+import struct
+from typing import List
+
+from .helpers import gc_paused
+
+# Snapshots start with a magic marker and a format version, so that files written by an incompatible
+# version of this package are treated as stale instead of being unpickled into the wrong object model.
+# The header also holds a digest of the rest of the file, so a corrupted snapshot is never unpickled.
+# The digest only detects damage, not tampering: a snapshot is a pickle, which can run any code as it is loaded, so
+# snapshots must only be loaded from locations that untrusted users cannot write to.
+SNAPSHOT_MAGIC = b"GRPSNAP"
+SNAPSHOT_VERSION = 4
+_snapshot_header = struct.Struct(f">{len(SNAPSHOT_MAGIC)}sH32s")
+
+def hash_file(filepath:str) -> str:
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as file_reader:
+        for chunk in iter(lambda: file_reader.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def save_snapshot(schema, snapshot_path:str, source_hashes:List[str]=None) -> None:
+    if source_hashes is None:
+        source_hashes = [hash_file(filepath) for filepath in schema.filepaths]
+    # Write to a temporary file first, so concurrent readers never see a partial snapshot.
+    temp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    payload = io.BytesIO()
+    # The source hashes are pickled separately, so a stale snapshot can be rejected without loading the schema.
+    pickle.dump(source_hashes, payload, protocol=pickle.HIGHEST_PROTOCOL)
+    pickle.dump(schema, payload, protocol=pickle.HIGHEST_PROTOCOL)
+    payload = payload.getbuffer()
+    with open(temp_path, 'wb') as file_writer:
+        file_writer.write(_snapshot_header.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, hashlib.sha256(payload).digest()))
+        file_writer.write(payload)
+    os.replace(temp_path, snapshot_path)
+
+def load_snapshot(snapshot_path:str, file_paths:List[str]=None, source_hashes:List[str]=None, pause_gc:bool=False):
+    # Returns None when the snapshot is missing, written by another format version, corrupted, or stale. Only load
+    # snapshots from a trusted location, as unpickling one can run arbitrary code.
+    # When the source files are given, the snapshot is only used if their content hashes match.
+    if source_hashes is None and file_paths is not None:
+        source_hashes = [hash_file(filepath) for filepath in file_paths]
+    try:
+        with open(snapshot_path, 'rb') as file_reader:
+            magic, version, digest = _snapshot_header.unpack(file_reader.read(_snapshot_header.size))
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                return None
+            payload = file_reader.read()
+        if hashlib.sha256(payload).digest() != digest:
+            return None
+        payload = io.BytesIO(payload)
+        stored_hashes = pickle.load(payload)
+        if source_hashes is not None and stored_hashes != source_hashes:
+            return None
+        with gc_paused(pause_gc):
+            schema = pickle.load(payload)
+    except (OSError, EOFError, struct.error, pickle.UnpicklingError, AttributeError, ImportError):
+        return None
+    if file_paths is not None:
+        # The snapshot is keyed by content, so record where the sources live for this process.
+        schema.filepaths = list(file_paths)
+        for source, filepath in zip(schema._sources, file_paths):
+            source.filepath = filepath
+    return schema
@@ -0,0 +1,67 @@
+import os
+from typing import Dict, List, Optional, Tuple
+
+from .snapshot import hash_file
+
+ELEMENT_TYPES = ('structures', 'primitives', 'tags')
+
+class FileSource(object):
+    # A loaded definition file, with its state when it was read and the (element type, element) pairs it defined.
+
+    def __init__(self, filepath:str, elements:List[Tuple[str, object]], digest:str=None):
+        self.filepath = filepath
+        self.elements = elements
+        self.stat = self._read_stat()
+        # The content hash of the file, which is only computed once its stat changes, unless it is already known.
+        self.digest = digest
+
+    def __repr__(self):
+        return f"FileSource<{self.filepath}, {len(self.elements)} elements>"
+
+    def _read_stat(self) -> Tuple[int, int]:
+        stat = os.stat(self.filepath)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def changed_state(self) -> Optional[Tuple[Tuple[int, int], str]]:
+        # The (stat, digest) of the file when its content has changed since it was read, or None. The modification time
+        # and size are checked first, so that untouched files are not read again. The new state is not recorded here,
+        # as the source is replaced once the file has been parsed and its elements applied.
+        stat = self._read_stat()
+        if stat == self.stat:
+            return None
+        # Without a digest from when the file was read, a changed stat is taken as a changed file. Reloading it is then
+        # only wasted work, as its unchanged elements are kept.
+        digest = hash_file(self.filepath)
+        if digest == self.digest:
+            self.stat = stat
+            return None
+        return stat, digest
+
+    def has_changed(self) -> bool:
+        return self.changed_state() is not None
+
+class ChangeSet(object):
+    # The element ids that a reload added, removed, or replaced, by element type.
+
+    def __init__(self):
+        self.files:List[str] = []
+        self.added:Dict[str, List[str]] = {element_type: [] for element_type in ELEMENT_TYPES}
+        self.removed:Dict[str, List[str]] = {element_type: [] for element_type in ELEMENT_TYPES}
+        self.changed:Dict[str, List[str]] = {element_type: [] for element_type in ELEMENT_TYPES}
+
+    def __bool__(self):
+        return bool(self.element_types)
+
+    def __repr__(self):
+        counts = ", ".join(
+            f"{element_type}: +{len(self.added[element_type])} -{len(self.removed[element_type])} ~{len(self.changed[element_type])}"
+            for element_type in ELEMENT_TYPES
+        )
+        return f"ChangeSet<{counts}>"
+
+    @property
+    def element_types(self) -> List[str]:
+        return [
+            element_type for element_type in ELEMENT_TYPES
+            if self.added[element_type] or self.removed[element_type] or self.changed[element_type]
+        ]
@@ -1,16 +1,19 @@
 from collections import OrderedDict
-from typing import List, Union
+from operator import attrgetter
+from sys import intern
+from typing import List, Tuple, Union
 
-from .schema_element import SchemaElement
+from .helpers import content_hash
+from .schema_element import ContentList, SchemaElement
 
 class Structure(SchemaElement):
 
     def __init__(self, label:str, **kwargs):
         super().__init__(**kwargs)
-        self.label = label
+        self.label = intern(label)
         self.description = ""
-        self.definitions:List[List[Row]] = []
-        self.add_definition()
+        # The rows of each alternative definition, which report edits in place to the Structure.
+        self.definitions:List[List[Row]] = ContentList((ContentList(element=self),), self)
 
     @property
     def id(self) -> str:
@@ -24,6 +27,7 @@ class Structure(SchemaElement):
         return cls(label=line[:-2], schema=schema)
 
     def append_line_definition(self, line:str) -> None:
+        self.invalidate()
         if line.startswith(("n", "0", "+")):
             self._add_row_from_line_definition(line)
         elif line in ("[","]"):
@@ -35,57 +39,24 @@ class Structure(SchemaElement):
             if self.description: self.description += "\n"
             self.description += line
 
+    def __getstate__(self):
+        state = super().__getstate__()
+        if '_frozen' in self.__dict__:
+            state['definitions'] = ContentList((ContentList(rows, self) for rows in self.definitions), self)
+        return state
+
+    def _freeze(self) -> None:
+        for rows in self.definitions:
+            for row in rows:
+                row.__class__ = _frozen_row_class(type(row))
+        self.__dict__['definitions'] = tuple(tuple(rows) for rows in self.definitions)
+        super()._freeze()
+
     def add_definition(self):
-        self.definitions.append([])
+        self.definitions.append(ContentList(element=self))
 
     def _add_row_from_line_definition(self, line):
-        cls = None
-        kwargs = {}
-
-        line_items = line.split(" ")
-
-        kwargs['level'] = line_items[0]
-        kwargs['count_min'], kwargs['count_max'] = line_items[-1].strip("{}").split(":")
-        
-        sub_line_items = line_items[1:-1]
-        
-        if sub_line_items[0].startswith("<<"):
-            # This row should be a container that holds another structure.
-            if len(sub_line_items) != 1:
-                raise ValueError("This row has a conflicting defintion, making it's format unknown.")
-            cls = SubstructureRow
-            kwargs['value'] = sub_line_items[0].strip("<>")
-        else:
-            i = 0
-            if sub_line_items[0].startswith("@"):
-                # This row is for a new record. It may optionally have a primitive value, determined later.
-                cls = NewRecordRow
-                kwargs['xref'] = sub_line_items[0].strip("@<>")
-                i = 1
-            for sub_spec_item in sub_line_items[i:]:
-                # Check if the item is for a primitive value.
-                if sub_spec_item.startswith("<"):
-                    if not cls:
-                        cls = PrimitiveValueRow
-                    elif cls == NewRecordRow:
-                        # Upgrade this row class when the row has both an xref id and a primitive value.
-                        cls = NewRecordWithValueRow
-                    else:
-                        raise ValueError("This row has a conflicting defintion, making it's format unknown.")
-                    kwargs['value'] = sub_spec_item.strip("<>")
-                # Check if the item is for a xref pointer value.
-                elif sub_spec_item.startswith("@"):
-                    if not cls:
-                        cls = PointerValueRow
-                    else:
-                        raise ValueError("This row has a conflicting defintion, making it's format unknown.")
-                    kwargs['value'] = sub_spec_item.strip("@<>")
-                else:
-                    # This item must be a tag, or list of tags.
-                    kwargs['tags'] = sub_spec_item.strip("[]").split("|")
-            # If a row type has not been determined by this stage, it is because the row does not have a value definition.
-            if not cls:
-                cls = NoValueRow
+        cls, kwargs = parse_row_definition(line)
 
         # Make the new row.
         row = cls(structure=self, **kwargs)
@@ -93,23 +64,26 @@ class Structure(SchemaElement):
         # The row spec get's added to the current working definition, which is the last definition.
         self.definitions[-1].append(row)
 
-    @property
-    def txt_definition(self) -> str:
+    def _render_txt_definition(self) -> str:
         # Create the header line.
-        definition_str = f"{self.label}:="
+        lines = [f"{self.label}:="]
         # Optionally add the description line(s).
         if self.description:
-            definition_str += "\n" + self.description
+            lines.append(self.description)
         # Add the definitions, with wrappers if more than one.
         amount = len(self.definitions)
-        if amount:
-            definition_str += "\n"
         if amount > 1:
-            definition_str += "[\n"
-        definition_str += "\n|\n".join("\n".join(row.txt_definition for row in rows) for rows in self.definitions)
+            lines.append("[")
+        for i, rows in enumerate(self.definitions):
+            if i:
+                lines.append("|")
+            if rows:
+                lines.extend(row.txt_definition for row in rows)
+            else:
+                lines.append("")
         if amount > 1:
-            definition_str += "\n]"
-        return definition_str
+            lines.append("]")
+        return "\n".join(lines)
 
 class Unlimited(object):
     def __le__(self, other):
@@ -120,10 +94,44 @@ class Unlimited(object):
         return "Unlimited"
     def __str__(self):
         return "M"
+    def __reduce__(self):
+        # Unpickle as the module singleton, so identity checks against MANY keep working.
+        return "MANY"
 
 MANY = Unlimited()
 
+# Arithmetic on the upper bound of a count, which may be MANY.
+def count_max_add(a, b):
+    return MANY if a is MANY or b is MANY else a + b
+
+def count_max_multiply(a, b):
+    if a == 0 or b == 0:
+        return 0
+    return MANY if a is MANY or b is MANY else a * b
+
+def count_max_larger(a, b):
+    return MANY if a is MANY or b is MANY else max(a, b)
+
+def _parse_level(txt_definition:str) -> Tuple[bool, int]:
+    # Whether a row's level is relative, and the level.
+    if txt_definition == "0":
+        return False, 0
+    if txt_definition == "n":
+        return True, 0
+    if txt_definition.startswith("+"):
+        return True, int(txt_definition[1:])
+    raise ValueError("Row level in a text format not understood.")
+
+def _row_field(slot:str) -> property:
+    # A field of a row, kept in a slot, which discards the cached rendering and fingerprint of its Structure when it is
+    # set. The slot itself is set when the row is made or unpickled, as its Structure has nothing cached yet.
+    def set_field(self, value):
+        setattr(self, slot, value)
+        self._structure.invalidate()
+    return property(attrgetter(slot), set_field)
+
 class Row(object):
+    __slots__ = ('_structure', '_level_relative', '_level_int', '_count_min', '_count_max')
 
     _syntax_xref = False
     _syntax_tags = False
@@ -131,6 +139,9 @@ class Row(object):
 
     __abstract__ = True
 
+    count_min = _row_field('_count_min')
+    count_max = _row_field('_count_max')
+
     def __new__(cls, *args, **kwargs):
         if cls.__abstract__ == True:
             raise TypeError("Cannot initialise this abstract ROW class. Use a specific sub-class that matches the ROW's intention.")
@@ -138,22 +149,22 @@ class Row(object):
 
     def __init__(self, structure:Structure, *, level:str, xref:str=None, tags:List[str]=None, value:str=None, count_min:str, count_max:str):
         self._structure = structure
-        self.level = level
-        self.count_min = int(count_min)
-        self.count_max = int(count_max) if count_max != "M" else MANY
+        self._level_relative, self._level_int = _parse_level(level)
+        self._count_min = int(count_min)
+        self._count_max = int(count_max) if count_max != "M" else MANY
         if self._syntax_xref:
             if not xref: raise AttributeError("This class requires an XREF to be specified.")
-            self.xref = xref
+            self._xref = intern(xref)
         elif xref:
             raise AttributeError("This class cannot have an XREF specified.")
         if self._syntax_tags:
             if not tags: raise AttributeError("This class requires a list of TAGS to be specified.")
-            self.tags = tags
+            self._tags = tuple(intern(tag) for tag in tags)
         elif tags:
             raise AttributeError("This class cannot have any TAGS specified.")
         if self._syntax_value:
             if not value: raise AttributeError("This class requires some type of VALUE to be specified.")
-            self.value = value
+            self._value = intern(value)
         elif value:
             raise AttributeError("This class cannot have any type of VALUE specified.")
 
@@ -163,17 +174,8 @@ class Row(object):
 
     @level.setter
     def level(self, txt_definition:str):
-        if txt_definition == "0":
-            self._level_relative = False
-            self._level_int = 0
-        elif txt_definition == "n":
-            self._level_relative = True
-            self._level_int = 0
-        elif txt_definition.startswith("+"):
-            self._level_relative = True
-            self._level_int = int(txt_definition[1:])
-        else:
-            raise ValueError("Row level in a text format not understood.")
+        self._level_relative, self._level_int = _parse_level(txt_definition)
+        self._structure.invalidate()
 
     @property
     def txt_definition(self):
@@ -184,6 +186,11 @@ class Row(object):
         size = f"{{{self.count_min}:{self.count_max}}}"
         return " ".join(s for s in [level, xref, tags, value, size] if s)
 
+    @property
+    def fingerprint(self) -> str:
+        # Not cached, as a row cannot tell when it is edited in place. Its structure caches its own fingerprint.
+        return content_hash(self.txt_definition)
+
     @property
     def _txt_definition_level (self):
         if self._level_relative == False:
@@ -206,6 +213,8 @@ class Row(object):
 
 class SubstructureRow(Row):
     """+1 <<NOTE_STRUCTURE>> {0:M}"""
+    __slots__ = ('_value',)
+    value = _row_field('_value')
     _syntax_value = True
     __abstract__ = False
 
@@ -219,6 +228,8 @@ class SubstructureRow(Row):
         return f"<<{substructure_label}>>"
 
 class RowWithTags(Row):
+    __slots__ = ('_tags',)
+    tags = _row_field('_tags')
     _syntax_tags = True
     __abstract__ = True
 
@@ -228,10 +239,13 @@ class RowWithTags(Row):
 
 class NoValueRow(RowWithTags):
     """+1 DATA {0:1}"""
+    __slots__ = ()
     __abstract__ = False
 
 class NewRecordRow(RowWithTags):
     """n @<XREF:OBJE>@ OBJE {1:1}"""
+    __slots__ = ('_xref',)
+    xref = _row_field('_xref')
     _syntax_xref = True
     __abstract__ = False
 
@@ -241,6 +255,8 @@ class NewRecordRow(RowWithTags):
 
 class NewRecordWithValueRow(NewRecordRow):
     """n @<XREF:NOTE>@ NOTE <SUBMITTER_TEXT> {1:1}"""
+    __slots__ = ('_value',)
+    value = _row_field('_value')
     _syntax_value = True
     __abstract__ = False
 
@@ -254,6 +270,8 @@ class NewRecordWithValueRow(NewRecordRow):
 
 class PointerValueRow(RowWithTags):
     """+1 HUSB @<XREF:INDI>@ {0:1}"""
+    __slots__ = ('_value',)
+    value = _row_field('_value')
     _syntax_value = True
     __abstract__ = False
 
@@ -267,6 +285,8 @@ class PointerValueRow(RowWithTags):
 
 class PrimitiveValueRow(RowWithTags):
     """+1 SEX <SEX_VALUE> {0:1}"""
+    __slots__ = ('_value',)
+    value = _row_field('_value')
     _syntax_value = True
     __abstract__ = False
 
@@ -277,3 +297,100 @@ class PrimitiveValueRow(RowWithTags):
     @property
     def _txt_definition_value (self):
         return f"<{self.primitive}>"
+
+# The rows of a frozen Structure are switched to a subclass of their own class, which cannot be edited, so that the
+# rows of an editable Structure pay nothing for the check. A copy of a frozen row is of its editable class.
+_frozen_row_classes = {}
+
+def _frozen_row_setattr(self, name, value=None):
+    raise TypeError(f"The row `{self.txt_definition}` of {self._structure.id} belongs to a frozen schema. Use thaw() for an editable copy.")
+
+def _frozen_row_reduce_ex(self, protocol):
+    return (_new_row, (self._thawed_class,), object.__reduce_ex__(self, protocol)[2])
+
+def _new_row(cls:type) -> 'Row':
+    return object.__new__(cls)
+
+def _frozen_row_class(cls:type) -> type:
+    frozen_cls = _frozen_row_classes.get(cls)
+    if frozen_cls is None:
+        if '_thawed_class' in cls.__dict__:
+            return cls
+        frozen_cls = _frozen_row_classes[cls] = type(cls.__name__, (cls,), {
+            '__slots__': (),
+            '__module__': cls.__module__,
+            '_thawed_class': cls,
+            '__setattr__': _frozen_row_setattr,
+            '__delattr__': _frozen_row_setattr,
+            '__reduce_ex__': _frozen_row_reduce_ex,
+        })
+    return frozen_cls
+
+def parse_row_definition(line:str):
+    # The Row class of a row's text definition, and the keyword arguments to make it with, other than its structure.
+    cls = None
+    kwargs = {}
+
+    line_items = line.split(" ")
+    if len(line_items) < 3 or not line_items[-1].startswith("{") or not line_items[-1].endswith("}"):
+        raise ValueError("The row must have a level, a definition, and a {min:max} size.")
+
+    kwargs['level'] = line_items[0]
+    kwargs['count_min'], kwargs['count_max'] = line_items[-1].strip("{}").split(":")
+    
+    sub_line_items = line_items[1:-1]
+    
+    if sub_line_items[0].startswith("<<"):
+        # This row should be a container that holds another structure.
+        if len(sub_line_items) != 1:
+            raise ValueError("This row has a conflicting defintion, making it's format unknown.")
+        cls = SubstructureRow
+        kwargs['value'] = sub_line_items[0].strip("<>")
+    else:
+        i = 0
+        if sub_line_items[0].startswith("@"):
+            # This row is for a new record. It may optionally have a primitive value, determined later.
+            cls = NewRecordRow
+            kwargs['xref'] = sub_line_items[0].strip("@<>")
+            i = 1
+        for sub_spec_item in sub_line_items[i:]:
+            # Check if the item is for a primitive value.
+            if sub_spec_item.startswith("<"):
+                if not cls:
+                    cls = PrimitiveValueRow
+                elif cls == NewRecordRow:
+                    # Upgrade this row class when the row has both an xref id and a primitive value.
+                    cls = NewRecordWithValueRow
+                else:
+                    raise ValueError("This row has a conflicting defintion, making it's format unknown.")
+                kwargs['value'] = sub_spec_item.strip("<>")
+            # Check if the item is for a xref pointer value.
+            elif sub_spec_item.startswith("@"):
+                if not cls:
+                    cls = PointerValueRow
+                else:
+                    raise ValueError("This row has a conflicting defintion, making it's format unknown.")
+                kwargs['value'] = sub_spec_item.strip("@<>")
+            else:
+                # This item must be a tag, or list of tags.
+                kwargs['tags'] = sub_spec_item.strip("[]").split("|")
+        # If a row type has not been determined by this stage, it is because the row does not have a value definition.
+        if not cls:
+            cls = NoValueRow
+    return cls, kwargs
+
+def row_tree(rows:List[Row]) -> List[Tuple[Row, list]]:
+    # Nest the rows of a definition under the row above them, by their relative levels, as (row, nodes below it) pairs.
+    tree = []
+    open_rows = {}
+    base_level = rows[0].level if rows else 0
+    for row in rows:
+        depth = row.level - base_level
+        siblings = tree if depth == 0 else open_rows[depth - 1][1] if depth - 1 in open_rows else None
+        if siblings is None:
+            raise ValueError(f"The row `{row.txt_definition}` in {row._structure.label} skips a level.")
+        for deeper in [d for d in open_rows if d >= depth]:
+            del open_rows[deeper]
+        node = open_rows[depth] = (row, [])
+        siblings.append(node)
+    return tree
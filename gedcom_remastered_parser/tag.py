@@ -1,4 +1,5 @@
 import re
+from sys import intern
 
 from .schema_element import SchemaElement
 
@@ -8,8 +9,8 @@ class Tag(SchemaElement):
 
     def __init__(self, *, tag:str, label:str, **kwargs):
         super().__init__(**kwargs)
-        self.tag = tag
-        self.label = label
+        self.tag = intern(tag)
+        self.label = intern(label)
         self.description = ""
 
     @property
@@ -29,11 +30,10 @@ class Tag(SchemaElement):
         if self.description: self.description += "\n"
         self.description += line
 
-    @property
-    def txt_definition(self) -> str:
+    def _render_txt_definition(self) -> str:
         # Create the header line.
-        definition_str = f"{self.tag} {{{self.label}}}:="
+        header = f"{self.tag} {{{self.label}}}:="
         # Optionally add the description line(s).
         if self.description:
-            definition_str += "\n" + self.description
-        return definition_str
+            return f"{header}\n{self.description}"
+        return header
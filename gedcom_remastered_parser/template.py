@@ -0,0 +1,101 @@
+from typing import Iterator, List, Union
+
+from .primitive import Primitive
+from .structure import NewRecordWithValueRow, PrimitiveValueRow, Row, Structure, SubstructureRow, count_max_multiply, row_tree
+
+# A template is the fully expanded tree of a Structure, with every `<<SUBSTRUCTURE>>` inlined at absolute levels.
+# A substructure with a single definition is flattened into its parent, with the bounds of its top rows multiplied
+# by the bounds of the inclusion. A substructure with alternative definitions becomes a TemplateChoice instead,
+# which carries the bounds of the inclusion, while the rows of each alternative keep their own bounds.
+
+class TemplateRow(object):
+    __slots__ = ('row', 'level', 'count_min', 'count_max', 'primitive', 'children')
+
+    def __init__(self, row:Row, level:int, primitive:Primitive=None):
+        self.row = row
+        self.level = level
+        self.count_min = row.count_min
+        self.count_max = row.count_max
+        self.primitive = primitive
+        self.children:List[TemplateEntry] = []
+
+    def __repr__(self):
+        return f"TemplateRow<{self.level} {'|'.join(self.tags)} {{{self.count_min}:{self.count_max}}}>"
+
+    @property
+    def tags(self):
+        return self.row.tags
+
+    @property
+    def structure(self) -> Structure:
+        # The Structure that defines the row.
+        return self.row._structure
+
+class TemplateChoice(object):
+    __slots__ = ('structure', 'level', 'count_min', 'count_max', 'definitions')
+
+    def __init__(self, structure:Structure, level:int, count_min:int, count_max, definitions):
+        self.structure = structure
+        self.level = level
+        self.count_min = count_min
+        self.count_max = count_max
+        self.definitions:List[List[TemplateEntry]] = definitions
+
+    def __repr__(self):
+        return f"TemplateChoice<{self.level} <<{self.structure.label}>> {{{self.count_min}:{self.count_max}}}>"
+
+TemplateEntry = Union[TemplateRow, TemplateChoice]
+
+def _expand_rows(rows:List[Row], level:int, stack:List[str]) -> List[TemplateEntry]:
+    return _expand_nodes(row_tree(rows), level, stack)
+
+def _expand_nodes(nodes:list, level:int, stack:List[str]) -> List[TemplateEntry]:
+    entries = []
+    for row, below in nodes:
+        if isinstance(row, SubstructureRow):
+            if below:
+                raise ValueError(f"The row `{below[0][0].txt_definition}` in {row._structure.label} is below a substructure.")
+            entries.extend(_expand_structure(row.structure, level, row.count_min, row.count_max, stack))
+            continue
+        primitive = None
+        if isinstance(row, (PrimitiveValueRow, NewRecordWithValueRow)):
+            primitive = row._structure.schema.primitives.get(row.primitive)
+        entry = TemplateRow(row, level, primitive)
+        entry.children = _expand_nodes(below, level + 1, stack)
+        entries.append(entry)
+    return entries
+
+def _expand_structure(structure:Structure, level:int, count_min:int, count_max, stack:List[str]) -> List[TemplateEntry]:
+    if structure.label in stack:
+        raise ValueError(f"The structure {structure.label} includes itself through {' > '.join(stack)}.")
+    stack.append(structure.label)
+    definitions = [_expand_rows(rows, level, stack) for rows in structure.definitions]
+    stack.pop()
+    if len(definitions) > 1:
+        return [TemplateChoice(structure, level, count_min, count_max, definitions)]
+    entries = definitions[0] if definitions else []
+    for entry in entries:
+        entry.count_min *= count_min
+        entry.count_max = count_max_multiply(entry.count_max, count_max)
+    return entries
+
+class StructureTemplate(object):
+
+    def __init__(self, structure:Structure):
+        self.structure = structure
+        stack = [structure.label]
+        self.definitions:List[List[TemplateEntry]] = [_expand_rows(rows, 0, stack) for rows in structure.definitions]
+
+    def __repr__(self):
+        return f"StructureTemplate<{self.structure.label}>"
+
+    def iter_rows(self) -> Iterator[TemplateRow]:
+        # Every row of the template depth first, including the rows of every alternative.
+        pending = [entry for entries in reversed(self.definitions) for entry in reversed(entries)]
+        while pending:
+            entry = pending.pop()
+            if isinstance(entry, TemplateChoice):
+                pending.extend(e for entries in reversed(entry.definitions) for e in reversed(entries))
+                continue
+            yield entry
+            pending.extend(reversed(entry.children))
@@ -0,0 +1,72 @@
+import re
+from typing import Dict, Iterable, List
+
+from .primitive import DEFAULT_OPTIONS_DEFINITION, Primitive, PrimitiveComponent
+
+def _free_text_pattern(primitive:Primitive) -> str:
+    # A primitive without a more specific format accepts any text within its size.
+    return f".{{{primitive.size_min},{primitive.size_max}}}"
+
+def primitive_pattern(primitive:Primitive, patterns:Dict[str, str], stack:List[str]=None) -> str:
+    # Build a regex for the values of the primitive, with nested `<PRIMITIVE>` components resolved through the schema.
+    # The patterns of resolved primitives are stored in `patterns`, so that shared primitives are only built once.
+    pattern = patterns.get(primitive.label)
+    if pattern is not None:
+        return pattern
+    if len(primitive.optional_values) == 1 and primitive.optional_values[0].definition == DEFAULT_OPTIONS_DEFINITION:
+        pattern = patterns[primitive.label] = _free_text_pattern(primitive)
+        return pattern
+    stack = [] if stack is None else stack
+    stack.append(primitive.label)
+    options = []
+    for optional_value in primitive.optional_values:
+        parts = []
+        for component in optional_value.components:
+            if not isinstance(component, PrimitiveComponent):
+                # Strings, terms and tags are all literal text in a value.
+                parts.append(re.escape(component.value))
+                continue
+            nested = primitive.schema.primitives.get(component.value)
+            if nested is None:
+                parts.append(".*")
+            elif nested.label in stack:
+                # A reference back to a primitive that is still being built can only be treated as free text.
+                parts.append(_free_text_pattern(nested))
+            else:
+                parts.append(f"(?:{primitive_pattern(nested, patterns, stack)})")
+        options.append("".join(parts))
+    stack.pop()
+    pattern = patterns[primitive.label] = "|".join(options)
+    return pattern
+
+class PrimitiveValidator(object):
+
+    def __init__(self, primitive:Primitive, patterns:Dict[str, str]=None):
+        self.primitive = primitive
+        self.size_min = primitive.size_min
+        self.size_max = primitive.size_max
+        self.pattern = primitive_pattern(primitive, {} if patterns is None else patterns)
+        # Joined CONT values contain line breaks, which free text should still accept.
+        self._fullmatch = re.compile(self.pattern, re.DOTALL).fullmatch
+
+    def __repr__(self):
+        return f"PrimitiveValidator<{self.primitive.label}>"
+
+    def validate(self, value:str) -> bool:
+        return self.size_min <= len(value) <= self.size_max and self._fullmatch(value) is not None
+
+    def validate_many(self, values:Iterable[str]) -> List[bool]:
+        # Columns of data values repeat a lot, so each distinct value is only checked once.
+        validate = self.validate
+        results = {}
+        mask = []
+        append = mask.append
+        for value in values:
+            result = results.get(value)
+            if result is None:
+                result = results[value] = isinstance(value, str) and validate(value)
+            append(result)
+        if type(values).__module__ == "numpy":
+            import numpy
+            return numpy.array(mask, dtype=bool)
+        return mask
@@ -0,0 +1,147 @@
+from typing import Callable, Dict, Iterable, List, TextIO, Tuple, Union
+
+from .reader import GedcomRecord
+
+# Writes GEDCOM data from the record classes that the schema generates (see Schema.record_classes). The fields of each
+# class are in the order of the rows of its Structure, so the lines are written in schema order.
+#
+# Each class is compiled once per level into a function that appends its lines, with the `level TAG ` prefix of each
+# row as a constant, much as the lines would be formatted by hand. A node is written as its own line, with its fields
+# one level below it, and a group (or an included Structure that is a group) writes its fields at the level it is
+# written at. A value that has line breaks, or that would make its line longer than the line length, is split into
+# CONT and CONC lines one level below.
+
+class GedcomWriter(object):
+
+    def __init__(self, encoding:str="utf-8", line_length:int=255, line_terminator:str="\n"):
+        self.encoding = encoding
+        self.line_length = line_length
+        self.line_terminator = line_terminator
+        self._writers:Dict[Tuple[type, int], Callable] = {}
+
+    def write(self, file:Union[str, TextIO], records:Iterable) -> None:
+        # Write the records, to a path or an open text stream. The lines of each record are written at once, to a
+        # buffered writer for a path.
+        if isinstance(file, str):
+            with open(file, 'w', encoding=self.encoding, newline="", buffering=1 << 16) as file_writer:
+                self._write_records(file_writer, records)
+        else:
+            self._write_records(file, records)
+
+    def _write_records(self, file:TextIO, records:Iterable) -> None:
+        writelines = file.writelines
+        for record in records:
+            lines = []
+            if isinstance(record, GedcomRecord):
+                self._add_gedcom_record(lines, record)
+            else:
+                self._add_object(lines, record, 0)
+            writelines(lines)
+
+    def lines(self, record, level:int=0) -> List[str]:
+        # The lines of a single record, each with its line terminator.
+        lines = []
+        self._add_object(lines, record, level)
+        return lines
+
+    def _writer(self, cls:type, level:int):
+        # The compiled function that adds the lines of a record of the class at the level.
+        function = self._writers.get((cls, level))
+        if function is None:
+            fields = getattr(cls, 'FIELDS', None)
+            if fields is None:
+                raise TypeError(f"{cls.__name__} is not a record class generated from a schema.")
+            namespace = {'_pointer': _pointer}
+            exec(compile(self._writer_source(cls, level), f"<gedcom writer {cls.__name__} {level}>", "exec"), namespace)
+            function = self._writers[(cls, level)] = namespace['write']
+        return function
+
+    def _writer_source(self, cls:type, level:int) -> str:
+        # The lines of each row are formatted from constant prefixes, and a value is only passed to _add_line when it
+        # has to be split. The fields of a node are one level below its own line.
+        terminator = self.line_terminator
+        source = ["def write(writer, lines, record):", "    append = lines.append"]
+        if cls.TAGS is not None:
+            source += [
+                "    xref = record.xref",
+                f"    prefix = f'{level} {{_pointer(xref)}} {{record.tag}}' if xref else f'{level} {{record.tag}}'",
+                f"    writer._add_line(lines, prefix, record.value, {level})",
+            ]
+            level += 1
+        for field in cls.FIELDS:
+            prefix = f"{level} {field.tag}"
+            source.append(f"    value = record.{field.name}")
+            source.append("    if value is not None:")
+            indent = "        "
+            if field.many:
+                source += [
+                    "        for value in (value if isinstance(value, (list, tuple)) else (value,)):",
+                ]
+                indent += "    "
+            if field.kind == 'primitive':
+                # The longest value that fits on the line of the row.
+                limit = self.line_length - len(prefix) - 1
+                source += [
+                    f"{indent}if type(value) is str and value and len(value) <= {limit} and '\\n' not in value:",
+                    f"{indent}    append({prefix + ' '!r} + value + {terminator!r})",
+                    f"{indent}else:",
+                    f"{indent}    writer._add_line(lines, {prefix!r}, value, {level})",
+                ]
+            elif field.kind == 'pointer':
+                source.append(f"{indent}append({prefix + ' '!r} + _pointer(value) + {terminator!r})")
+            elif field.kind == 'flag':
+                source += [f"{indent}if value:", f"{indent}    append({prefix + terminator!r})"]
+            else:
+                # A node of its own row, or an included Structure, at the level of the fields.
+                source.append(f"{indent}writer._add_object(lines, value, {level})")
+        return "\n".join(source) + "\n"
+
+    def _add_object(self, lines:List[str], record, level:int) -> None:
+        function = self._writers.get((type(record), level)) or self._writer(type(record), level)
+        function(self, lines, record)
+
+    def _add_line(self, lines:List[str], prefix:str, value, level:int) -> None:
+        terminator = self.line_terminator
+        if value is None or value == "":
+            lines.append(prefix + terminator)
+            return
+        value = str(value)
+        if "\n" not in value and len(prefix) + 1 + len(value) <= self.line_length:
+            lines.append(f"{prefix} {value}{terminator}")
+            return
+        # The first line of the value continues on the line itself, and each following line of it on a CONT line.
+        next_level = level + 1
+        for index, text in enumerate(value.split("\n")):
+            line_prefix = prefix if index == 0 else f"{next_level} CONT"
+            for chunk in self._chunks(text, self.line_length - len(line_prefix) - 1, self.line_length - len(f"{next_level} CONC") - 1):
+                if chunk:
+                    lines.append(f"{line_prefix} {chunk}{terminator}")
+                else:
+                    lines.append(line_prefix + terminator)
+                line_prefix = f"{next_level} CONC"
+
+    @staticmethod
+    def _chunks(text:str, first_length:int, length:int) -> List[str]:
+        # Split the text so that no line begins or ends with a space, which readers may strip, where possible.
+        chunks = []
+        limit = max(first_length, 1)
+        while len(text) > limit:
+            split = limit
+            while split > 1 and (text[split - 1] == " " or text[split] == " "):
+                split -= 1
+            if split == 1 and (text[0] == " " or text[1] == " "):
+                split = limit
+            chunks.append(text[:split])
+            text = text[split:]
+            limit = max(length, 1)
+        chunks.append(text)
+        return chunks
+
+    def _add_gedcom_record(self, lines:List[str], record:GedcomRecord) -> None:
+        # The lines of a record that was read by a GedcomReader, with joined values split again.
+        for line in record.lines:
+            prefix = f"{line.level} {line.xref} {line.tag}" if line.xref else f"{line.level} {line.tag}"
+            self._add_line(lines, prefix, line.value, line.level)
+
+def _pointer(xref:str) -> str:
+    return xref if xref.startswith("@") else f"@{xref}@"
@@ -7,6 +7,10 @@ setup(
     author_email='47620271+shaun-wilson@users.noreply.github.com',
     packages=['gedcom_remastered_parser'],
     install_requires=[],
+    extras_require={
+        # Optional, for checking batches of values and counts as arrays.
+        'numpy': ['numpy'],
+    },
     version='0.1.1',
     license='MIT',
     description='A Python 3 package that parses a GEDCOM Remastered Standard, and generates an object model.',
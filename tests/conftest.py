@@ -0,0 +1,35 @@
+import os
+import shutil
+
+import pytest
+
+from gedcom_remastered_parser import Schema
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+SAMPLE_FILES = ['sample-structures.txt', 'sample-primitives.txt', 'sample-tags.txt']
+
+@pytest.fixture
+def sample_files(tmp_path):
+    # Copies of the sample definition files, which a test may edit.
+    paths = []
+    for name in SAMPLE_FILES:
+        path = tmp_path / name
+        shutil.copy(os.path.join(DATA_DIR, name), path)
+        paths.append(str(path))
+    return paths
+
+@pytest.fixture
+def sample_schema(sample_files):
+    return Schema.generate_from_files(sample_files)
+
+def _replace_text(path, old, new):
+    with open(path) as file_reader:
+        text = file_reader.read()
+    assert old in text
+    with open(path, 'w') as file_writer:
+        file_writer.write(text.replace(old, new, 1))
+
+@pytest.fixture
+def replace_text():
+    # Replaces the first occurrence of a text in a file, which must contain it, such as to edit a sample file.
+    return _replace_text
@@ -0,0 +1,42 @@
+import random
+
+import pytest
+
+def _summary(violations):
+    return [(v.record, v.column, v.row.txt_definition, v.count, v.count_min, v.count_max) for v in violations]
+
+def _random_counts(checker, records:int, seed:int):
+    generator = random.Random(seed)
+    return [[generator.choice((0, 0, 1, 1, 2, 5)) for _ in checker.columns] for _ in range(records)]
+
+def test_bounds_of_a_record_with_unlimited_rows(sample_schema):
+    checker = sample_schema.cardinality_checker('FAM_RECORD')
+    assert [row.txt_definition for row in checker.columns] == [
+        "+1 <<FAMILY_EVENT_STRUCTURE>> {0:M}",
+        "+1 HUSB @<XREF:INDI>@ {0:1}",
+        "+1 WIFE @<XREF:INDI>@ {0:1}",
+        "+1 CHIL @<XREF:INDI>@ {0:M}",
+        "+1 <<NOTE_STRUCTURE>> {0:M}",
+    ]
+    assert checker.valid([[3, 1, 0, 12, 0], [0, 2, 0, 0, 0]]) == [True, False]
+    assert _summary(checker.check([[0, 2, 0, 0, 0]])) == [(0, 1, "+1 HUSB @<XREF:INDI>@ {0:1}", 2, 0, 1)]
+
+def test_a_record_fits_any_alternative(sample_schema):
+    checker = sample_schema.cardinality_checker('FAMILY_EVENT_STRUCTURE')
+    # The same row in both alternatives shares a column, and a row missing from one is absent from it.
+    assert [row.txt_definition for row in checker.columns] == ["+1 <<EVENT_DETAIL>> {0:1}", "+1 TYPE <EVENT_DESCRIPTOR> {0:1}"]
+    assert checker.definition_bounds == [[(0, 1), (0, 0)], [(0, 1), (0, 1)]]
+    assert checker.valid([[1, 0], [0, 1], [1, 1], [0, 2]]) == [True, True, True, False]
+    # A record that fits no alternative is reported against the first one it comes closest to.
+    assert _summary(checker.check([[0, 2]])) == [(0, 1, "+1 TYPE <EVENT_DESCRIPTOR> {0:1}", 2, 0, 0)]
+
+@pytest.mark.parametrize('label', ['FAM_RECORD', 'FAMILY_EVENT_STRUCTURE', 'INDIVIDUAL_EVENT_STRUCTURE', 'INDIVIDUAL_RECORD'])
+def test_lists_and_numpy_arrays_give_the_same_results(sample_schema, label):
+    numpy = pytest.importorskip('numpy')
+    checker = sample_schema.cardinality_checker(label)
+    counts = _random_counts(checker, 200, seed=len(label))
+    valid = checker.valid(numpy.array(counts))
+    assert isinstance(valid, numpy.ndarray)
+    assert valid.tolist() == checker.valid(counts)
+    assert 0 < sum(checker.valid(counts)) < len(counts)
+    assert _summary(checker.check(numpy.array(counts))) == _summary(checker.check(counts))
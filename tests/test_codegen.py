@@ -0,0 +1,81 @@
+import os
+import pickle
+import sys
+
+from gedcom_remastered_parser import Schema, codegen
+
+ALTERNATIVES = """\
+EXTRA_STRUCTURE:=
+[
+n EXTR {1:1}
++1 TYPE <EVENT_DESCRIPTOR> {0:1}
+|
+n EXTR {1:1}
++1 TYPE @<XREF:INDI>@ {0:M}
+]
+"""
+
+def _fields(record_class):
+    return [(field.name, field.tag, field.kind, field.type, field.count_min, field.count_max, field.many) for field in record_class.FIELDS]
+
+def test_each_kind_of_row_becomes_a_field(sample_schema):
+    records = sample_schema.record_classes()
+    assert records.CLASSES['LINEAGE_LINKED_GEDCOM'] is records.LineageLinkedGedcom
+    assert _fields(records.LineageLinkedGedcom) == [
+        ('header', None, 'structure', 'HEADER', 1, 1, False),
+        ('record', None, 'structure', 'RECORD', 1, None, True),
+        ('trlr', 'TRLR', 'flag', None, 1, 1, False),
+    ]
+    assert records.Header.TAGS == ('HEAD',)
+    assert _fields(records.Header)[:2] == [
+        ('sour', 'SOUR', 'node', 'HeaderSour', 1, 1, False),
+        ('date', 'DATE', 'primitive', 'TRANSMISSION_DATE', 0, 1, False),
+    ]
+    assert records.HeaderSour.VALUES == (('primitive', 'APPROVED_SYSTEM_ID'),)
+    assert records.FamRecord.XREF == 'XREF:FAM'
+    assert ('chil', 'CHIL', 'pointer', 'XREF:INDI', 0, None, True) in _fields(records.FamRecord)
+
+def test_alternative_tags_share_a_class_with_a_field_per_tag(sample_schema):
+    records = sample_schema.record_classes()
+    assert records.FamilyEventStructure.TAGS == ('ANUL', 'CENS', 'DIV', 'DIVF', 'EVEN')
+    assert [field.name for field in records.FamilyEventStructure.FIELDS] == ['event_detail', 'type']
+    assert [field.name for field in records.NoteRecord.FIELDS] == ['conc', 'cont']
+    assert records.NoteStructure.VALUES == (('pointer', 'XREF:NOTE'), ('primitive', 'SUBMITTER_TEXT'))
+
+def test_the_same_tag_with_another_meaning_gets_a_numbered_field(sample_files, tmp_path):
+    path = tmp_path / 'extra-structures.txt'
+    path.write_text(ALTERNATIVES)
+    records = Schema.generate_from_files(sample_files + [str(path)]).record_classes()
+    assert _fields(records.ExtraStructure) == [
+        ('type', 'TYPE', 'primitive', 'EVENT_DESCRIPTOR', 0, 1, False),
+        ('type_2', 'TYPE', 'pointer', 'XREF:INDI', 0, None, True),
+    ]
+
+def test_records_are_slotted_and_pickle(sample_schema, tmp_path):
+    records = sample_schema.record_classes(str(tmp_path))
+    family = records.FamRecord(xref='@F1@', chil=['@I1@', '@I2@'])
+    assert not hasattr(family, '__dict__')
+    assert (family.tag, family.husb) == ('FAM', None)
+    copy = pickle.loads(pickle.dumps(family))
+    assert (copy.xref, copy.chil) == ('@F1@', ['@I1@', '@I2@'])
+
+def test_a_cached_module_is_reused_without_generating_it_again(sample_files, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / 'records')
+    for name in [name for name in sys.modules if name.startswith('gedcom_records_')]:
+        monkeypatch.delitem(sys.modules, name)
+    module = Schema.generate_from_files(sample_files).record_classes(cache_dir)
+    (module_file,) = os.listdir(cache_dir)
+    assert module_file == module.__name__ + ".py"
+    # Another process has a module cache of its own, but finds the module on disk.
+    monkeypatch.delitem(sys.modules, module.__name__)
+    def generate(schema):
+        raise AssertionError("The cached module was generated again.")
+    monkeypatch.setattr(codegen, 'generate_record_source', generate)
+    reused = Schema.generate_from_files(sample_files).record_classes(cache_dir)
+    assert reused is not module and reused.__name__ == module.__name__
+    assert _fields(reused.FamRecord) == _fields(module.FamRecord)
+    # Edited structures are a different module.
+    edited = Schema.generate_from_files(sample_files)
+    edited.query('FAM_RECORD/CHIL')[0].row.count_max = 3
+    monkeypatch.undo()
+    assert edited.record_classes(cache_dir).__name__ != module.__name__
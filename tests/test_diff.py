@@ -0,0 +1,61 @@
+from gedcom_remastered_parser.diff import merge_schemas
+from gedcom_remastered_parser.tag import Tag
+
+def _summary(schema_diff):
+    return [(element_diff.element_type, element_diff.id, element_diff.kind) for element_diff in schema_diff]
+
+def _add_tag(schema, header):
+    schema.tags[header.split(" ")[0]] = Tag.create_from_line_definition(header, schema)
+
+def test_a_schema_has_no_differences_from_a_copy(sample_schema):
+    assert not sample_schema.diff(sample_schema.thaw())
+
+def test_added_removed_and_changed_elements_are_listed(sample_schema):
+    new = sample_schema.thaw()
+    _add_tag(new, "ZZZ {ZED}:=")
+    del new.tags['ABBR']
+    new.primitives['SEX_VALUE'].terms['U'] = "Unknown"
+    new.structures['FAM_RECORD'].definitions[0][4].count_max = 3
+    schema_diff = sample_schema.diff(new)
+    assert sorted(_summary(schema_diff)) == [
+        ('primitives', 'SEX_VALUE', 'changed'),
+        ('structures', 'FAM_RECORD', 'changed'),
+        ('tags', 'ABBR', 'removed'),
+        ('tags', 'ZZZ', 'added'),
+    ]
+    assert [d.id for d in schema_diff.of_kind('changed', 'primitives')] == ['SEX_VALUE']
+    (primitive_diff,) = schema_diff.of_kind('changed', 'primitives')
+    assert primitive_diff.fields == {'terms[U]': ("Undetermined", "Unknown")}
+    (structure_diff,) = schema_diff.of_kind('changed', 'structures')
+    assert not structure_diff.fields
+    assert [(change.operation, [row.txt_definition for row in change.new_rows]) for change in structure_diff.rows] == [
+        ('replace', ["+1 CHIL @<XREF:INDI>@ {0:3}"]),
+    ]
+
+def test_a_merge_takes_the_changes_of_both_sides(sample_schema):
+    ours = sample_schema.thaw()
+    theirs = sample_schema.thaw()
+    _add_tag(ours, "ZZZ {ZED}:=")
+    ours.structures['FAM_RECORD'].definitions[0][4].count_max = 3
+    del theirs.tags['ABBR']
+    theirs.primitives['SEX_VALUE'].terms['U'] = "Unknown"
+    merged, conflicts = merge_schemas(sample_schema, ours, theirs)
+    assert not conflicts
+    assert sorted(_summary(sample_schema.diff(merged))) == [
+        ('primitives', 'SEX_VALUE', 'changed'),
+        ('structures', 'FAM_RECORD', 'changed'),
+        ('tags', 'ABBR', 'removed'),
+        ('tags', 'ZZZ', 'added'),
+    ]
+    assert merged.query('FAM_RECORD/CHIL')[0].count_max == 3
+    assert merged.primitives['SEX_VALUE'].terms['U'] == "Unknown"
+    assert merged.structures['FAM_RECORD'] is not ours.structures['FAM_RECORD']
+
+def test_an_element_both_sides_changed_differently_is_a_conflict(sample_schema):
+    ours = sample_schema.thaw()
+    theirs = sample_schema.thaw()
+    ours.primitives['SEX_VALUE'].terms['U'] = "Unknown"
+    theirs.primitives['SEX_VALUE'].terms['U'] = "Unstated"
+    merged, conflicts = merge_schemas(sample_schema, ours, theirs)
+    assert [(conflict.element_type, conflict.id) for conflict in conflicts] == [('primitives', 'SEX_VALUE')]
+    assert merged.primitives['SEX_VALUE'].terms['U'] == "Unknown"
@@ -0,0 +1,52 @@
+import io
+
+from gedcom_remastered_parser import Schema
+from gedcom_remastered_parser.primitive import OptionalValue
+
+def _written(schema, element_type):
+    stream = io.StringIO()
+    schema.write_to(stream, element_type)
+    return stream.getvalue()
+
+def test_editing_a_row_discards_the_rendering_of_its_structure(sample_files, sample_schema):
+    structure = sample_schema.structures['FAM_RECORD']
+    fingerprint = structure.fingerprint
+    row = sample_schema.query('FAM_RECORD/CHIL')[0].row
+    row.count_max = 3
+    assert "+1 CHIL @<XREF:INDI>@ {0:3}" in structure.txt_definition
+    assert structure.fingerprint != fingerprint
+    assert "+1 CHIL @<XREF:INDI>@ {0:3}" in _written(sample_schema, 'structures')
+    changes = sample_schema.diff(Schema.generate_from_files(sample_files))
+    assert [(d.element_type, d.id, d.kind) for d in changes] == [('structures', 'FAM_RECORD', 'changed')]
+
+def test_editing_the_rows_of_a_structure_discards_its_rendering(sample_schema):
+    structure = sample_schema.structures['FAM_RECORD']
+    rows = structure.definitions[0]
+    removed = rows.pop()
+    assert removed.txt_definition not in structure.txt_definition
+    rows.append(removed)
+    assert structure.txt_definition.endswith(removed.txt_definition)
+    removed.level = "+2"
+    assert structure.txt_definition.endswith("+2 <<NOTE_STRUCTURE>> {0:M}")
+
+def test_editing_terms_and_optional_values_discards_the_rendering_of_the_primitive(sample_schema):
+    primitive = sample_schema.primitives['SEX_VALUE']
+    primitive.terms['X'] = "Unknown"
+    assert "X = Unknown" in _written(sample_schema, 'primitives')
+    primitive.optional_values.append(OptionalValue("X", primitive))
+    assert "[M|F|U|X]" in primitive.txt_definition
+
+def test_editing_an_element_in_place_discards_what_the_schema_built_from_it(sample_schema):
+    assert sample_schema.query('FAM_RECORD/CHIL')[0].count_max != 3
+    matcher = sample_schema.matcher('FAM_RECORD')
+    template = sample_schema.template('FAM_RECORD')
+    assert not sample_schema.validator('SEX_VALUE').validate('X')
+    assert not sample_schema.enumerations.accepts('SEX_VALUE', 'X')
+    sample_schema.structures['FAM_RECORD'].definitions[0][4].count_max = 3
+    primitive = sample_schema.primitives['SEX_VALUE']
+    primitive.optional_values.append(OptionalValue("X", primitive))
+    assert sample_schema.query('FAM_RECORD/CHIL')[0].count_max == 3
+    assert sample_schema.matcher('FAM_RECORD') is not matcher
+    assert sample_schema.template('FAM_RECORD') is not template
+    assert sample_schema.validator('SEX_VALUE').validate('X')
+    assert sample_schema.enumerations.accepts('SEX_VALUE', 'X')
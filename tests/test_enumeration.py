@@ -0,0 +1,45 @@
+from gedcom_remastered_parser.primitive import OptionalValue, Primitive
+
+def _fresh_trie(enumerations):
+    trie = {}
+    for value in enumerations._labels_by_value:
+        enumerations._trie_insert(trie, value)
+    return trie
+
+def test_values_are_looked_up_as_is_and_casefolded(sample_schema):
+    enumerations = sample_schema.enumerations
+    assert 'SEX_VALUE' in enumerations and 'DATE' not in enumerations
+    assert enumerations.values_of('RESTRICTION_NOTICE') == ('confidential', 'locked', 'privacy')
+    assert enumerations.accepts('SEX_VALUE', 'M')
+    assert not enumerations.accepts('SEX_VALUE', 'm')
+    assert enumerations.accepts('SEX_VALUE', 'm', casefold=True)
+    assert enumerations.primitives_accepting('MAY') == ('MONTH',)
+    assert enumerations.primitives_accepting('Locked', casefold=True) == ('RESTRICTION_NOTICE',)
+
+def test_values_are_completed_from_a_prefix(sample_schema):
+    enumerations = sample_schema.enumerations
+    assert enumerations.values_with_prefix('ju') == ['JUL', 'JUN']
+    assert enumerations.values_with_prefix('') == sorted(enumerations._labels_by_value)
+    assert enumerations.values_with_prefix('m', label='SEX_VALUE') == ['M']
+    assert enumerations.values_with_prefix('x') == []
+
+def test_the_trie_follows_replaced_edited_and_removed_primitives(sample_schema):
+    enumerations = sample_schema.enumerations
+    enumerations.values_with_prefix('')
+    trie = enumerations._trie
+    primitive = Primitive.create_from_line_definition("STATUS:= {Size=1:9}", sample_schema)
+    primitive.append_line_definition("[JUNE|MARRIED|M]")
+    sample_schema.primitives['STATUS'] = primitive
+    assert enumerations.values_with_prefix('jun') == ['JUN', 'JUNE']
+    assert enumerations.primitives_accepting('M') == ('SEX_VALUE', 'STATUS')
+    sex = sample_schema.primitives['SEX_VALUE']
+    sex.optional_values.append(OptionalValue("X", sex))
+    assert enumerations.values_with_prefix('x') == ['X']
+    del sample_schema.primitives['MONTH']
+    assert enumerations.values_with_prefix('ju') == ['JUNE']
+    assert sorted(enumerations.primitives_accepting('M')) == ['SEX_VALUE', 'STATUS']
+    del sample_schema.primitives['STATUS']
+    assert enumerations.values_with_prefix('ju') == []
+    # The trie was kept up to date rather than rebuilt, and holds nothing that a new one would not.
+    assert enumerations._trie is trie
+    assert trie == _fresh_trie(enumerations)
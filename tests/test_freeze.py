@@ -0,0 +1,59 @@
+import pickle
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from gedcom_remastered_parser import schema as schema_module
+
+def _primitive_with_terms(schema):
+    return next(primitive for primitive in schema.primitives.values() if primitive.terms)
+
+def test_a_frozen_row_cannot_be_edited(sample_schema):
+    frozen = sample_schema.freeze()
+    row = frozen.query('FAM_RECORD/CHIL')[0].row
+    with pytest.raises(TypeError):
+        row.count_max = 5
+    with pytest.raises(TypeError):
+        row.level = "+2"
+    assert row.txt_definition == "+1 CHIL @<XREF:INDI>@ {0:M}"
+
+def test_frozen_terms_and_optional_values_cannot_be_edited(sample_schema):
+    frozen = sample_schema.freeze()
+    primitive = _primitive_with_terms(frozen)
+    with pytest.raises(TypeError):
+        primitive.terms['X'] = "y"
+    with pytest.raises(AttributeError):
+        primitive.optional_values.append(primitive.optional_values[0])
+    with pytest.raises(TypeError):
+        primitive.optional_values[0].definition = "<TEXT>"
+
+def test_editing_a_thawed_copy_leaves_the_frozen_schema_unchanged(sample_schema):
+    frozen = sample_schema.freeze()
+    thawed = frozen.thaw()
+    thawed.query('FAM_RECORD/CHIL')[0].row.count_max = 5
+    primitive = _primitive_with_terms(thawed)
+    primitive.terms['X'] = "y"
+    primitive.optional_values.append(primitive.optional_values[0])
+    assert frozen.query('FAM_RECORD/CHIL')[0].count_max != 5
+    assert 'X' not in _primitive_with_terms(frozen).terms
+    assert frozen.structures['FAM_RECORD'].txt_definition == sample_schema.structures['FAM_RECORD'].txt_definition
+
+def test_a_frozen_schema_pickles_to_an_editable_copy(sample_schema):
+    copy = pickle.loads(pickle.dumps(sample_schema.freeze(), pickle.HIGHEST_PROTOCOL))
+    assert not copy.frozen
+    copy.query('FAM_RECORD/CHIL')[0].row.count_max = 5
+    _primitive_with_terms(copy).terms['X'] = "y"
+
+def test_threads_sharing_a_frozen_schema_build_each_derived_object_once(sample_schema, monkeypatch):
+    frozen = sample_schema.freeze()
+    built = []
+    def counting_matcher(structure):
+        built.append(structure.label)
+        time.sleep(0.01)
+        return object()
+    monkeypatch.setattr(schema_module, 'StructureMatcher', counting_matcher)
+    with ThreadPoolExecutor(8) as executor:
+        matchers = list(executor.map(lambda _: frozen.matcher('FAM_RECORD'), range(16)))
+    assert built == ['FAM_RECORD']
+    assert all(matcher is matchers[0] for matcher in matchers)
@@ -0,0 +1,18 @@
+from gedcom_remastered_parser import Schema
+
+def test_the_sample_schema_has_no_dangling_references(sample_schema):
+    assert sample_schema.graph.dangling() == []
+
+def test_the_default_option_is_not_a_reference_to_text(sample_schema):
+    del sample_schema.primitives['TEXT']
+    assert sample_schema.graph.dangling() == []
+    reachable = sample_schema.graph.reachable('primitives', 'VERSION_NUMBER', 'primitives')
+    assert 'TEXT' not in reachable
+
+def test_a_misspelt_substructure_is_dangling(sample_files):
+    with open(sample_files[0]) as file_reader:
+        text = file_reader.read()
+    with open(sample_files[0], 'w') as file_writer:
+        file_writer.write(text.replace("+1 <<NOTE_STRUCTURE>> {0:M}", "+1 <<NOTE_STRUCTUR>> {0:M}", 1))
+    schema = Schema.generate_from_files(sample_files)
+    assert [(d.source_id, d.target_type, d.target_id) for d in schema.graph.dangling()] == [('HEADER', 'structures', 'NOTE_STRUCTUR')]
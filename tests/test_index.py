@@ -0,0 +1,34 @@
+from gedcom_remastered_parser import Schema
+
+def _labels(structures):
+    return [structure.label for structure in structures]
+
+def test_rows_and_structures_are_found_by_tag_primitive_and_inclusion(sample_schema):
+    index = sample_schema.index
+    assert [row.txt_definition for row in index.rows_with_tag('FAMC')] == [
+        "+1 FAMC @<XREF:FAM>@ {0:M}",
+        "+1 FAMC @<XREF:FAM>@ {0:1}",
+    ]
+    assert _labels(index.structures_with_tag('TYPE')) == ['FAMILY_EVENT_STRUCTURE', 'EVENT_DETAIL']
+    assert [row.txt_definition for row in index.rows_with_primitive('SUBMITTER_TEXT')] == [
+        "n @<XREF:NOTE>@ NOTE <SUBMITTER_TEXT> {1:1}",
+        "+1 [CONC|CONT] <SUBMITTER_TEXT> {0:M}",
+        "n NOTE <SUBMITTER_TEXT> {1:1}",
+        "+1 [CONC|CONT] <SUBMITTER_TEXT> {0:M}",
+    ]
+    assert _labels(index.parents_of('NOTE_STRUCTURE')) == ['HEADER', 'FAM_RECORD', 'INDIVIDUAL_RECORD', 'EVENT_DETAIL']
+    assert index.rows_with_tag('ZZZ') == ()
+
+def test_the_index_is_dropped_when_a_structure_is_replaced(sample_files, sample_schema):
+    index = sample_schema.index
+    assert sample_schema.index is index
+    replacement = Schema.generate_from_files(sample_files).structures['FAM_RECORD']
+    replacement.schema = sample_schema
+    replacement.append_line_definition("+1 FAMC @<XREF:FAM>@ {0:1}")
+    sample_schema.structures['FAM_RECORD'] = replacement
+    assert sample_schema.index is not index
+    assert _labels(sample_schema.index.structures_with_tag('FAMC')) == ['FAM_RECORD', 'INDIVIDUAL_RECORD', 'INDIVIDUAL_EVENT_STRUCTURE']
+    # A change to another element type keeps it.
+    index = sample_schema.index
+    del sample_schema.tags['ABBR']
+    assert sample_schema.index is index
@@ -0,0 +1,46 @@
+from gedcom_remastered_parser import Schema
+from gedcom_remastered_parser.instrumentation import LoadObserver, LoadProfile
+
+class RecordingObserver(LoadObserver):
+
+    def __init__(self):
+        self.phases = []
+        self.counts = []
+
+    def phase(self, name, seconds):
+        self.phases.append(name)
+
+    def count(self, name, amount=1):
+        self.counts.append((name, amount))
+
+def test_a_profile_times_each_phase_and_counts_what_was_read(sample_files):
+    profile = LoadProfile()
+    Schema.generate_from_files(sample_files, observer=profile)
+    assert set(profile.phases) == {'read', 'tokenize', 'structures.build', 'structures.rows', 'primitives.build', 'tags.build'}
+    assert all(seconds >= 0 for seconds in profile.phases.values())
+    counters = profile.counters
+    assert counters['files'] == 3
+    assert counters['lines'] == sum(len(open(path).readlines()) for path in sample_files)
+    assert (counters['structures'], counters['primitives']) == (10, 21)
+    assert counters['rows.SubstructureRow'] == 15
+    report = profile.report()
+    assert report['total'] == profile.total
+    assert list(report['phases']) == sorted(profile.phases)
+    assert str(profile).startswith("total")
+
+def test_a_parallel_load_reports_the_same_counts(sample_files):
+    serial = LoadProfile()
+    Schema.generate_from_files(sample_files, observer=serial)
+    parallel = LoadProfile()
+    Schema.generate_from_files(sample_files, parallel='process', observer=parallel)
+    assert parallel.counters == serial.counters
+    assert set(parallel.phases) == set(serial.phases)
+
+def test_snapshot_phases_are_reported(sample_files, tmp_path):
+    cache_path = str(tmp_path / 'schema.snapshot')
+    observer = RecordingObserver()
+    Schema.generate_from_files(sample_files, cache_path=cache_path, observer=observer)
+    assert observer.phases[0] == 'snapshot.load' and observer.phases[-1] == 'snapshot.save'
+    observer = RecordingObserver()
+    Schema.generate_from_files(sample_files, cache_path=cache_path, observer=observer)
+    assert (observer.phases, observer.counts) == (['snapshot.load'], [])
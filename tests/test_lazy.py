@@ -0,0 +1,34 @@
+import pytest
+
+from gedcom_remastered_parser import Schema
+from gedcom_remastered_parser.schema import LazyElementDict
+from gedcom_remastered_parser.sources import ELEMENT_TYPES
+
+def test_a_lazy_load_gives_the_same_elements_as_an_eager_one(sample_files, sample_schema):
+    schema = Schema.generate_from_files(sample_files, lazy=True)
+    for element_type in ELEMENT_TYPES:
+        elements = getattr(schema, element_type)
+        assert isinstance(elements, LazyElementDict)
+        assert list(elements) == list(getattr(sample_schema, element_type))
+        assert [e.txt_definition for e in elements.values()] == [e.txt_definition for e in getattr(sample_schema, element_type).values()]
+        assert elements.unparsed == 0
+    assert not sample_schema.diff(schema)
+
+def test_elements_are_only_parsed_when_they_are_looked_up(sample_files):
+    schema = Schema.generate_from_files(sample_files, lazy=True)
+    total = len(schema.structures)
+    assert schema.structures.unparsed == total
+    assert 'FAM_RECORD' in schema.structures and len(schema.structures) == total
+    assert schema.structures.unparsed == total
+    family = schema.structures['FAM_RECORD']
+    assert schema.structures.unparsed == total - 1
+    assert schema.structures['FAM_RECORD'] is family
+    assert schema.structures.get('ZZZ') is None
+    # A query looks into the substructures that the record includes, and parses nothing else.
+    schema.query('FAM_RECORD/CHIL')
+    assert schema.structures.unparsed == total - 3
+    assert schema.primitives.unparsed == len(schema.primitives)
+
+def test_lazy_loading_cannot_be_combined_with_a_snapshot(sample_files, tmp_path):
+    with pytest.raises(ValueError):
+        Schema.generate_from_files(sample_files, lazy=True, cache_path=str(tmp_path / 'schema.snapshot'))
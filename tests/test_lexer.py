@@ -0,0 +1,38 @@
+import pickle
+
+import pytest
+
+from gedcom_remastered_parser import Schema
+from gedcom_remastered_parser.lexer import DefinitionError
+
+def _break_files(sample_files, replace_text):
+    # A row that only fails when its Row is made, before a line that fails when it is classified, in each of two files.
+    replace_text(sample_files[0], "+1 CHIL @<XREF:INDI>@ {0:M}", "+1 CHIL @<XREF:INDI>@ {0:x}")
+    replace_text(sample_files[0], "+1 SEX <SEX_VALUE> {0:1}", "+1 {0:1}")
+    replace_text(sample_files[1], "\nTEXT:= {Size=1:248}", "\nTEXT:= {Size=x}")
+
+def test_every_error_is_reported_in_file_and_line_order(sample_files, replace_text):
+    _break_files(sample_files, replace_text)
+    with pytest.raises(DefinitionError) as error:
+        Schema.generate_from_files(sample_files)
+    assert [(d.filepath, d.line) for d in error.value.diagnostics] == [(sample_files[0], 25), (sample_files[0], 33), (sample_files[1], 36)]
+    assert [(d.filepath, d.line) for d in Schema.check_files(sample_files)] == [(sample_files[0], 25), (sample_files[0], 33), (sample_files[1], 36)]
+
+def test_a_row_error_names_the_row(sample_files, replace_text):
+    _break_files(sample_files, replace_text)
+    diagnostics = Schema.check_files(sample_files)
+    assert "`+1 CHIL @<XREF:INDI>@ {0:x}`" in diagnostics[0].message
+    assert "`+1 {0:1}`" in diagnostics[1].message
+
+def test_a_lazy_element_reports_its_errors_at_their_lines(sample_files, replace_text):
+    _break_files(sample_files, replace_text)
+    schema = Schema.generate_from_files(sample_files[:1], lazy=True)
+    with pytest.raises(DefinitionError) as error:
+        schema.structures['INDIVIDUAL_RECORD']
+    assert [(d.filepath, d.line) for d in error.value.diagnostics] == [(sample_files[0], 33)]
+
+def test_a_definition_error_pickles(sample_files, replace_text):
+    _break_files(sample_files, replace_text)
+    diagnostics = Schema.check_files(sample_files)
+    error = pickle.loads(pickle.dumps(DefinitionError(diagnostics)))
+    assert str(error) == str(DefinitionError(diagnostics))
@@ -0,0 +1,40 @@
+VALID = [
+    (0, 'HEAD'), (1, 'SOUR'), (1, 'NOTE', '@N1@'),
+    (0, 'FAM', None), (1, 'DIV'), (2, 'DATE'), (1, 'CHIL', '@I1@'),
+    (0, 'NOTE', 'Text'), (1, 'CONT', 'more'),
+    (0, 'TRLR'),
+]
+
+def _messages(schema, label, lines):
+    return [(violation.path, violation.message) for violation in schema.matcher(label).match(lines)]
+
+def test_lines_that_fit_the_definitions_have_no_violations(sample_schema):
+    assert _messages(sample_schema, 'LINEAGE_LINKED_GEDCOM', VALID) == []
+    assert _messages(sample_schema, 'LINEAGE_LINKED_GEDCOM', [line[:2] for line in VALID]) == []
+
+def test_unknown_tags_counts_and_levels_are_reported(sample_schema):
+    assert _messages(sample_schema, 'FAM_RECORD', [(0, 'FAM'), (1, 'HUSB'), (1, 'HUSB'), (1, 'SEX'), (3, 'DATE')]) == [
+        ('FAM_RECORD/FAM/HUSB', "The tag occurs more than 1 times."),
+        ('FAM_RECORD/FAM/SEX', "The tag is not allowed here."),
+        ('FAM_RECORD/FAM/SEX', "The level 3 skips a level."),
+    ]
+    assert _messages(sample_schema, 'HEADER', [(0, 'HEAD')]) == [('HEADER/HEAD/SOUR', "The tag occurs less than 1 times.")]
+
+def test_a_required_substructure_with_alternatives_needs_one_of_them(sample_schema):
+    assert _messages(sample_schema, 'LINEAGE_LINKED_GEDCOM', [(0, 'HEAD'), (1, 'SOUR'), (0, 'TRLR')]) == [
+        ('LINEAGE_LINKED_GEDCOM', "The tags FAM|INDI|NOTE occur less than 1 times in all."),
+    ]
+
+def test_a_required_tag_list_needs_one_of_its_tags(sample_schema):
+    sample_schema.structures['FAM_RECORD'].append_line_definition("+1 [ANUL|DIV] {1:2}")
+    assert _messages(sample_schema, 'FAM_RECORD', [(0, 'FAM')]) == [('FAM_RECORD/FAM', "The tags ANUL|DIV occur less than 1 times in all.")]
+    assert _messages(sample_schema, 'FAM_RECORD', [(0, 'FAM'), (1, 'DIV')]) == []
+
+def test_a_line_must_fit_one_alternative_as_a_whole(sample_schema):
+    # A pointer note cannot be continued, which only the value of the line tells apart from a text note.
+    lines = [(0, 'FAM'), (1, 'NOTE', '@N1@'), (2, 'CONT', 'x')]
+    assert _messages(sample_schema, 'FAM_RECORD', lines) == [
+        ('FAM_RECORD/FAM/NOTE', "The line and the lines below it fit none of the definitions of the tag."),
+    ]
+    assert _messages(sample_schema, 'FAM_RECORD', [(0, 'FAM'), (1, 'NOTE', 'text'), (2, 'CONT', 'x')]) == []
+    assert _messages(sample_schema, 'FAM_RECORD', [(0, 'FAM'), (1, 'NOTE'), (2, 'CONT')]) == []
@@ -0,0 +1,50 @@
+import gc
+
+import pytest
+
+from gedcom_remastered_parser import Schema
+from gedcom_remastered_parser.helpers import gc_paused
+from gedcom_remastered_parser.lexer import DefinitionError
+from gedcom_remastered_parser.sources import ELEMENT_TYPES
+
+def _definitions(schema):
+    return {element_type: [element.txt_definition for element in getattr(schema, element_type).values()] for element_type in ELEMENT_TYPES}
+
+@pytest.mark.parametrize('parallel', ['process', 'thread'])
+def test_a_parallel_load_equals_a_serial_one(sample_files, sample_schema, parallel):
+    schema = Schema.generate_from_files(sample_files, parallel=parallel, max_workers=2)
+    assert _definitions(schema) == _definitions(sample_schema)
+    assert schema.filepaths == sample_schema.filepaths
+    assert all(element.schema is schema for element_type in ELEMENT_TYPES for element in getattr(schema, element_type).values())
+    # The files it was loaded from can be reloaded as usual.
+    assert not schema.reload()
+
+def test_a_parallel_load_reports_the_errors_of_every_file(sample_files):
+    with open(sample_files[1], 'a') as file_writer:
+        file_writer.write("BROKEN:= {Size=x}\n")
+    with open(sample_files[2], 'a') as file_writer:
+        file_writer.write("BROKEN {:=\n")
+    with pytest.raises(DefinitionError) as error:
+        Schema.generate_from_files(sample_files, parallel='process')
+    assert [diagnostic.filepath for diagnostic in error.value.diagnostics] == sample_files[1:]
+
+def test_an_unknown_parallel_mode_is_refused(sample_files):
+    with pytest.raises(ValueError):
+        Schema.generate_from_files(sample_files, parallel='fibre')
+
+def test_the_collector_is_only_paused_when_asked_and_resumes_after_the_last_pause(sample_files, monkeypatch):
+    states = []
+    parse = Schema.append_file_definition
+    def recording(schema, *args):
+        states.append(gc.isenabled())
+        return parse(schema, *args)
+    monkeypatch.setattr(Schema, 'append_file_definition', recording)
+    Schema.generate_from_files(sample_files)
+    Schema.generate_from_files(sample_files, pause_gc=True)
+    assert states == [True] * 3 + [False] * 3
+    assert gc.isenabled()
+    with gc_paused():
+        with gc_paused():
+            pass
+        assert not gc.isenabled()
+    assert gc.isenabled()
@@ -0,0 +1,22 @@
+def _paths(schema, path):
+    return sorted(match.path for match in schema.query(path))
+
+def test_a_tag_step_finds_the_rows_of_included_structures(sample_schema):
+    assert _paths(sample_schema, 'INDIVIDUAL_RECORD/BIRT/DATE') == ['INDIVIDUAL_RECORD/BIRT/DATE']
+    assert sample_schema.query('INDIVIDUAL_RECORD/BIRT/DATE')[0].primitive == 'DATE_VALUE'
+
+def test_an_inclusion_step_continues_as_the_start_of_a_path(sample_schema):
+    # Every definition of NOTE_STRUCTURE is a single NOTE row, which is not named, as for a record.
+    assert _paths(sample_schema, 'INDIVIDUAL_RECORD/<<NOTE_STRUCTURE>>/CONC') == ['INDIVIDUAL_RECORD/<<NOTE_STRUCTURE>>/CONC']
+    assert _paths(sample_schema, 'INDIVIDUAL_RECORD/<<NOTE_STRUCTURE>>/NOTE') == []
+    # The top rows of a Structure of sibling rows are named.
+    assert _paths(sample_schema, 'INDIVIDUAL_RECORD/BIRT/<<EVENT_DETAIL>>/DATE') == ['INDIVIDUAL_RECORD/BIRT/<<EVENT_DETAIL>>/DATE']
+
+def test_the_top_row_of_a_record_is_never_named(sample_schema):
+    for path in ('HEADER/SOUR', 'LINEAGE_LINKED_GEDCOM/<<HEADER>>/SOUR'):
+        matches = sample_schema.query(path)
+        assert [(match.tags, match.level) for match in matches] == [(('SOUR',), 1)], path
+    assert sample_schema.query('HEADER/HEAD/SOUR') == ()
+    assert sample_schema.query('LINEAGE_LINKED_GEDCOM/<<HEADER>>/HEAD/SOUR') == ()
+    # A tag step names the top rows of the substructures that it looks into.
+    assert [match.level for match in sample_schema.query('LINEAGE_LINKED_GEDCOM/HEAD/SOUR')] == [1]
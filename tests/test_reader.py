@@ -0,0 +1,26 @@
+from gedcom_remastered_parser import GedcomReader
+
+def _write(tmp_path, text):
+    path = tmp_path / 'family.ged'
+    path.write_text(text)
+    return str(path)
+
+def test_continuations_are_joined_onto_the_line_they_continue(tmp_path, sample_schema):
+    path = _write(tmp_path, "0 HEAD\n1 CHAR UTF-8\n0 @N1@ NOTE hi\n1 CONC  there\n1 CONT next\n0 TRLR\n")
+    records = list(GedcomReader(sample_schema).read_records(path))
+    assert [record.tag for record in records] == ['HEAD', 'NOTE', 'TRLR']
+    assert [line.value for line in records[1].lines] == ["hi there\nnext"]
+    assert records[1].xref == '@N1@'
+
+def test_continuations_after_a_substructure_reach_an_ancestor_already_read(tmp_path, sample_schema):
+    path = _write(tmp_path, "0 @N1@ NOTE hi\n1 SOUR @S1@\n1 CONT late\n0 TRLR\n")
+    lines = list(GedcomReader(sample_schema).read_lines(path))
+    assert [(line.number, line.tag, line.value) for line in lines] == [
+        (1, 'NOTE', "hi\nlate"), (2, 'SOUR', '@S1@'), (4, 'TRLR', None)
+    ]
+    assert lines[0].definition is sample_schema.tags['NOTE']
+
+def test_continuations_are_kept_when_not_joined(tmp_path, sample_schema):
+    path = _write(tmp_path, "0 @N1@ NOTE hi\n1 SOUR @S1@\n1 CONT late\n")
+    lines = list(GedcomReader(sample_schema, join_continuations=False).read_lines(path))
+    assert [line.tag for line in lines] == ['NOTE', 'SOUR', 'CONT']
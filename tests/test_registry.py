@@ -0,0 +1,89 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from gedcom_remastered_parser import SchemaRegistry
+
+def _counting_builds(registry, delay:float=0.0, error:Exception=None):
+    # Count the builds of the registry, each taking at least the delay, and failing with the error if there is one.
+    builds = []
+    build = registry._build
+    def counted(key, file_paths):
+        builds.append(key)
+        time.sleep(delay)
+        if error is not None:
+            raise error
+        return build(key, file_paths)
+    registry._build = counted
+    return builds
+
+def test_concurrent_requests_share_one_build(sample_files):
+    registry = SchemaRegistry()
+    builds = _counting_builds(registry, delay=0.05)
+    with ThreadPoolExecutor(8) as executor:
+        schemas = list(executor.map(lambda _: registry.get(sample_files, '5.5.1'), range(8)))
+    assert len(builds) == 1
+    assert all(schema is schemas[0] for schema in schemas)
+    assert schemas[0].frozen
+    stats = registry.stats
+    assert (stats.builds, stats.hits + stats.misses, stats.schemas) == (1, 8, 1)
+
+def test_a_failed_build_reaches_every_waiting_caller(sample_files):
+    registry = SchemaRegistry()
+    builds = _counting_builds(registry, delay=0.05, error=ValueError("broken"))
+    barrier = threading.Barrier(4)
+    def get(_):
+        barrier.wait()
+        try:
+            registry.get(sample_files)
+        except ValueError as error:
+            return error
+    with ThreadPoolExecutor(4) as executor:
+        errors = list(executor.map(get, range(4)))
+    assert len(builds) == 1
+    assert all(isinstance(error, ValueError) and str(error) == "broken" for error in errors)
+    assert registry.stats.failures == 1
+    assert len(registry) == 0
+
+def test_the_least_recently_used_schemas_are_evicted_beyond_max_schemas(sample_files):
+    registry = SchemaRegistry(max_schemas=2)
+    first = registry.get(sample_files, '1')
+    registry.get(sample_files, '2')
+    assert registry.get(sample_files, '1') is first
+    registry.get(sample_files, '3')
+    assert registry.key(sample_files, '1') in registry
+    assert registry.key(sample_files, '2') not in registry
+    assert registry.stats.evictions == 1
+
+def test_the_least_recently_used_schemas_are_evicted_beyond_max_size(sample_files):
+    size = SchemaRegistry(max_size=1 << 30)
+    size.get(sample_files)
+    schema_size = size.stats.size
+    registry = SchemaRegistry(max_size=schema_size * 5 // 2)
+    for version in '123':
+        registry.get(sample_files, version)
+    assert [registry.key(sample_files, version) in registry for version in '123'] == [False, True, True]
+    assert registry.stats.size == 2 * schema_size
+    # The most recently built schema is kept, even over the size.
+    tiny = SchemaRegistry(max_size=1)
+    tiny.get(sample_files)
+    assert len(tiny) == 1
+
+def test_discard_and_clear(sample_files):
+    registry = SchemaRegistry(max_size=1 << 30)
+    builds = _counting_builds(registry)
+    registry.get(sample_files, '1')
+    registry.get(sample_files, '2')
+    registry.discard(registry.key(sample_files, '1'))
+    assert len(registry) == 1
+    registry.get(sample_files, '1')
+    assert len(builds) == 3
+    registry.clear()
+    assert len(registry) == 0
+    assert registry.stats.size == 0
+
+def test_at_least_one_schema_is_held():
+    with pytest.raises(ValueError):
+        SchemaRegistry(max_schemas=0)
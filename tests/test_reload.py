@@ -0,0 +1,58 @@
+import pytest
+
+from gedcom_remastered_parser import Schema
+from gedcom_remastered_parser.lexer import DefinitionError
+
+def test_reload_applies_an_edited_file(sample_files, sample_schema, replace_text):
+    sample_schema.query('FAM_RECORD/CHIL')
+    replace_text(sample_files[0], "+1 CHIL @<XREF:INDI>@ {0:M}", "+1 CHIL @<XREF:INDI>@ {0:3}")
+    changes = sample_schema.reload()
+    assert changes.changed['structures'] == ['FAM_RECORD']
+    assert sample_schema.query('FAM_RECORD/CHIL')[0].count_max == 3
+    assert not sample_schema.reload()
+
+def test_failed_reload_leaves_the_schema_unchanged(sample_files, sample_schema, replace_text):
+    before = {label: structure.txt_definition for label, structure in sample_schema.structures.items()}
+    sample_schema.query('FAM_RECORD/CHIL')
+    sample_schema.index.rows_with_tag('CHIL')
+    replace_text(sample_files[0], "+1 CHIL @<XREF:INDI>@ {0:M}", "+1 CHIL @<XREF:INDI>@ {0:3}")
+    replace_text(sample_files[1], "\nTEXT:= {Size=1:248}", "\nTEXT:= {Size=x}")
+    with pytest.raises(DefinitionError) as error:
+        sample_schema.reload()
+    assert [d.filepath for d in error.value.diagnostics] == [sample_files[1]]
+    assert {label: structure.txt_definition for label, structure in sample_schema.structures.items()} == before
+    assert sample_schema.query('FAM_RECORD/CHIL')[0].count_max != 3
+    assert sample_schema.index.rows_with_tag('CHIL')[0].count_max != 3
+    # Once the error is undone, the edited file is still found to have changed.
+    replace_text(sample_files[1], "\nTEXT:= {Size=x}", "\nTEXT:= {Size=1:248}")
+    changes = sample_schema.reload()
+    assert sample_files[0] in changes.files
+    assert changes.changed == {'structures': ['FAM_RECORD'], 'primitives': [], 'tags': []}
+    assert sample_schema.query('FAM_RECORD/CHIL')[0].count_max == 3
+    assert sample_schema.index.rows_with_tag('CHIL')[0].count_max == 3
+
+def test_reload_matches_a_fresh_load(sample_files, sample_schema):
+    with open(sample_files[2], 'a') as file_writer:
+        file_writer.write("ZZZ {ZED}:=\nA new tag\n")
+    sample_schema.reload()
+    fresh = Schema.generate_from_files(sample_files)
+    assert list(sample_schema.tags) == list(fresh.tags)
+    assert sample_schema.tags['ZZZ'].txt_definition == fresh.tags['ZZZ'].txt_definition
+
+def test_removing_an_overriding_definition_restores_the_earlier_one(sample_files, tmp_path, replace_text):
+    override = str(tmp_path / 'override-primitives.txt')
+    with open(override, 'w') as file_writer:
+        file_writer.write("SEX_VALUE:= {Size=1:7}\n[M|F]\nAGE_OVERRIDE:= {Size=1:3}\n")
+    schema = Schema.generate_from_files(sample_files + [override])
+    assert schema.primitives['SEX_VALUE'].txt_definition == "SEX_VALUE:= {Size=1:7}\n[M|F]"
+    replace_text(override, "SEX_VALUE:= {Size=1:7}\n[M|F]\n", "")
+    changes = schema.reload()
+    assert changes.changed['primitives'] == ['SEX_VALUE']
+    assert not changes.removed['primitives']
+    fresh = Schema.generate_from_files(sample_files + [override])
+    assert list(schema.primitives) == list(fresh.primitives)
+    assert schema.primitives['SEX_VALUE'].txt_definition == fresh.primitives['SEX_VALUE'].txt_definition
+    # Defining it again overrides the earlier file's definition once more.
+    replace_text(override, "AGE_OVERRIDE", "SEX_VALUE:= {Size=1:7}\n[M|F]\nAGE_OVERRIDE")
+    assert schema.reload().changed['primitives'] == ['SEX_VALUE']
+    assert schema.primitives['SEX_VALUE'].txt_definition == "SEX_VALUE:= {Size=1:7}\n[M|F]"
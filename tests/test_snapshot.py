@@ -0,0 +1,39 @@
+import os
+
+from gedcom_remastered_parser import Schema
+from gedcom_remastered_parser.snapshot import load_snapshot
+
+def _definitions(schema):
+    return [element.txt_definition for element_type in ('structures', 'primitives', 'tags') for element in getattr(schema, element_type).values()]
+
+def test_a_snapshot_is_loaded_while_the_files_are_unchanged(sample_files, tmp_path):
+    cache_path = str(tmp_path / 'schema.snapshot')
+    schema = Schema.generate_from_files(sample_files, cache_path=cache_path)
+    assert os.path.exists(cache_path)
+    cached = load_snapshot(cache_path, sample_files)
+    assert cached is not None
+    assert _definitions(cached) == _definitions(schema)
+
+def test_a_corrupted_snapshot_is_rebuilt(sample_files, tmp_path):
+    cache_path = str(tmp_path / 'schema.snapshot')
+    schema = Schema.generate_from_files(sample_files, cache_path=cache_path)
+    with open(cache_path, 'rb') as file_reader:
+        data = bytearray(file_reader.read())
+    # A label that is no longer valid UTF-8, which fails to unpickle with a UnicodeDecodeError.
+    position = data.index(b"INDIVIDUAL_RECORD")
+    data[position:position + 17] = b"\xff" * 17
+    with open(cache_path, 'wb') as file_writer:
+        file_writer.write(data)
+    assert load_snapshot(cache_path, sample_files) is None
+    rebuilt = Schema.generate_from_files(sample_files, cache_path=cache_path)
+    assert _definitions(rebuilt) == _definitions(schema)
+    assert load_snapshot(cache_path, sample_files) is not None
+
+def test_a_truncated_snapshot_is_ignored(sample_files, tmp_path):
+    cache_path = str(tmp_path / 'schema.snapshot')
+    Schema.generate_from_files(sample_files, cache_path=cache_path)
+    with open(cache_path, 'rb') as file_reader:
+        data = file_reader.read()
+    with open(cache_path, 'wb') as file_writer:
+        file_writer.write(data[:len(data) // 2])
+    assert load_snapshot(cache_path, sample_files) is None
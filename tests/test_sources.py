@@ -0,0 +1,28 @@
+from gedcom_remastered_parser import Schema, schema as schema_module, sources
+
+def _count_hashes(monkeypatch):
+    calls = []
+    original = sources.hash_file
+    def hash_file(filepath):
+        calls.append(filepath)
+        return original(filepath)
+    monkeypatch.setattr(sources, 'hash_file', hash_file)
+    monkeypatch.setattr(schema_module, 'hash_file', hash_file)
+    return calls
+
+def test_loading_does_not_hash_the_files(monkeypatch, sample_files):
+    calls = _count_hashes(monkeypatch)
+    Schema.generate_from_files(sample_files)
+    assert calls == []
+
+def test_a_snapshot_miss_hashes_each_file_once(monkeypatch, sample_files, tmp_path):
+    calls = _count_hashes(monkeypatch)
+    schema = Schema.generate_from_files(sample_files, cache_path=str(tmp_path / 'schema.snapshot'))
+    assert sorted(calls) == sorted(sample_files)
+    assert [source.digest for source in schema._sources] == [sources.hash_file(path) for path in sample_files]
+
+def test_an_unhashed_file_is_reloaded_once_touched(sample_files, sample_schema):
+    with open(sample_files[2], 'a') as file_writer:
+        file_writer.write("ZZZ {ZED}:=\n")
+    assert sample_schema.reload().added['tags'] == ['ZZZ']
+    assert not sample_schema.reload()
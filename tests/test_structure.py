@@ -0,0 +1,21 @@
+import pytest
+
+from gedcom_remastered_parser.structure import row_tree
+
+def _shape(nodes):
+    return [(row.txt_definition, _shape(below)) for row, below in nodes]
+
+def test_row_tree_nests_rows_by_level(sample_schema):
+    rows = sample_schema.structures['HEADER'].definitions[0]
+    assert _shape(row_tree(rows)) == [
+        ("n HEAD {1:1}", [
+            ("+1 SOUR <APPROVED_SYSTEM_ID> {1:1}", [("+2 VERS <VERSION_NUMBER> {0:1}", [])]),
+            ("+1 DATE <TRANSMISSION_DATE> {0:1}", []),
+            ("+1 <<NOTE_STRUCTURE>> {0:M}", []),
+        ]),
+    ]
+
+def test_row_tree_rejects_a_row_that_skips_a_level(sample_schema):
+    rows = sample_schema.structures['HEADER'].definitions[0]
+    with pytest.raises(ValueError, match="skips a level"):
+        row_tree([rows[0], rows[2]])
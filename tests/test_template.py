@@ -0,0 +1,41 @@
+from gedcom_remastered_parser.structure import MANY
+from gedcom_remastered_parser.template import TemplateChoice, TemplateRow
+
+def _outline(entries):
+    outline = []
+    for entry in entries:
+        if isinstance(entry, TemplateChoice):
+            outline.append((entry.level, f"<<{entry.structure.label}>>", entry.count_min, entry.count_max, [_outline(d) for d in entry.definitions]))
+        else:
+            primitive = entry.primitive.label if entry.primitive is not None else None
+            outline.append((entry.level, "|".join(entry.tags), entry.count_min, entry.count_max, primitive, _outline(entry.children)))
+    return outline
+
+def test_substructures_are_inlined_at_absolute_levels(sample_schema):
+    (definition,) = sample_schema.template('INDIVIDUAL_EVENT_STRUCTURE').definitions[1:]
+    assert _outline(definition) == [
+        (0, 'DEAT', 1, 1, None, [
+            # EVENT_DETAIL has a single definition, so its rows are flattened with the bounds of the inclusion.
+            (1, 'TYPE', 0, 1, 'EVENT_DESCRIPTOR', []),
+            (1, 'DATE', 0, 1, 'DATE_VALUE', []),
+            (1, 'PLAC', 0, 1, 'PLACE_NAME', []),
+            (1, '<<NOTE_STRUCTURE>>', 0, MANY, [
+                [(1, 'NOTE', 1, 1, None, [])],
+                [(1, 'NOTE', 1, 1, 'SUBMITTER_TEXT', [(2, 'CONC|CONT', 0, MANY, 'SUBMITTER_TEXT', [])])],
+            ]),
+        ]),
+    ]
+
+def test_the_bounds_of_a_flattened_substructure_are_multiplied(sample_schema):
+    sample_schema.structures['LINEAGE_LINKED_GEDCOM'].definitions[0][0].count_max = 2
+    template = sample_schema.template('LINEAGE_LINKED_GEDCOM')
+    head = template.definitions[0][0]
+    assert (head.tags, head.count_min, head.count_max, head.structure.label) == (('HEAD',), 1, 2, 'HEADER')
+    assert [(row.level, row.tags[0]) for row in template.iter_rows()][:4] == [(0, 'HEAD'), (1, 'SOUR'), (2, 'VERS'), (1, 'DATE')]
+
+def test_templates_are_built_once_until_their_structures_change(sample_schema):
+    template = sample_schema.template('FAM_RECORD')
+    assert sample_schema.template('FAM_RECORD') is template
+    sample_schema.primitives['SEX_VALUE'].terms['X'] = "Unknown"
+    assert sample_schema.template('FAM_RECORD') is not template
+    assert all(isinstance(row, TemplateRow) for row in sample_schema.template('FAM_RECORD').iter_rows())
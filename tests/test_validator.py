@@ -0,0 +1,38 @@
+import pytest
+
+def test_a_closed_set_of_values(sample_schema):
+    validator = sample_schema.validator('SEX_VALUE')
+    assert validator.validate('M')
+    assert not validator.validate('X')
+    assert not validator.validate('MF')
+
+def test_nested_primitives_are_resolved(sample_schema):
+    validator = sample_schema.validator('DATE_VALUE')
+    assert validator.validate_many(['1 JAN 1900', 'BEF 1900', 'BET 1900 AND 1910', 'SOMEDAY SOON', '1 JUNE 1900']) == [True, True, True, False, False]
+
+def test_free_text_is_checked_by_size(sample_schema):
+    validator = sample_schema.validator('RESTRICTION_NOTICE')
+    assert validator.validate('locked')
+    assert not validator.validate('lock')
+    text = sample_schema.validator('TEXT')
+    assert text.validate("A joined\nCONT value")
+    assert not text.validate("")
+    assert not text.validate("x" * 249)
+
+def test_values_that_are_not_text_are_rejected(sample_schema):
+    assert sample_schema.validator('YEAR').validate_many(['1900', None, 1900, '1900']) == [True, False, False, True]
+
+def test_a_primitive_that_nests_itself_is_free_text_where_it_recurses(sample_schema):
+    sample_schema.validator('DATE')
+    sample_schema.primitives['DAY'].append_line_definition("[<DATE>|<YEAR>]")
+    validator = sample_schema.validator('DATE')
+    # DATE is free text of its own size inside DAY, rather than being expanded again.
+    assert ".{4,11}" in validator.pattern
+    assert validator.validate('1900')
+    assert validator.validate('JAN 1900')
+
+def test_a_column_is_checked_as_a_numpy_array(sample_schema):
+    numpy = pytest.importorskip('numpy')
+    mask = sample_schema.validator('SEX_VALUE').validate_many(numpy.array(['M', 'X', 'F']))
+    assert mask.dtype == bool
+    assert mask.tolist() == [True, False, True]
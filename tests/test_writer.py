@@ -0,0 +1,30 @@
+from gedcom_remastered_parser import Schema
+from gedcom_remastered_parser.sources import ELEMENT_TYPES
+
+def _write_and_load(schema, tmp_path):
+    paths = []
+    for element_type in ELEMENT_TYPES:
+        path = str(tmp_path / f"written-{element_type}.txt")
+        schema.write_to(path, element_type)
+        paths.append(path)
+    return Schema.generate_from_files(paths)
+
+def _definitions(schema):
+    return {element_type: [element.txt_definition for element in getattr(schema, element_type).values()] for element_type in ELEMENT_TYPES}
+
+def test_written_definitions_load_into_an_equal_schema(sample_files, sample_schema, tmp_path):
+    written = _write_and_load(sample_schema, tmp_path)
+    assert _definitions(written) == _definitions(sample_schema)
+    assert not sample_schema.diff(written)
+    for element_type, path in zip(ELEMENT_TYPES, sample_files):
+        with open(path) as file_reader:
+            assert "".join(sample_schema._iter_txt_definitions(element_type)) == file_reader.read().rstrip("\n")
+
+def test_written_definitions_include_edits_made_in_place(sample_schema, tmp_path):
+    _write_and_load(sample_schema, tmp_path)
+    sample_schema.query('FAM_RECORD/CHIL')[0].row.count_max = 3
+    sample_schema.primitives['SEX_VALUE'].terms['X'] = "Unknown"
+    written = _write_and_load(sample_schema, tmp_path)
+    assert _definitions(written) == _definitions(sample_schema)
+    assert written.query('FAM_RECORD/CHIL')[0].count_max == 3
+    assert written.primitives['SEX_VALUE'].terms['X'] == "Unknown"